@@ -1,56 +1,24 @@
-import pandas as pd
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.model_selection import train_test_split
-import joblib
 import os
+import sys
 
-# --- 1. SETTINGS ---
-FILENAME = 'training_data.csv'
-MODEL_NAME = 'signspeak.pkl'
-# 4 flex sensors + 3 accelerometer axes = 7 feature columns
-COLUMNS = ['f1', 'f2', 'f3', 'f4', 'ax', 'ay', 'az', 'label']
-
-print("--- Starting Training Process ---")
-
-# --- 2. CHECK IF FILE EXISTS ---
-if not os.path.exists(FILENAME):
-    print(f"CRITICAL ERROR: The file '{FILENAME}' was not found in this folder!")
-    print("Files currently in this folder:", os.listdir())
-    exit()
-
-# --- 3. LOAD DATA ---
-try:
-    print(f"Loading {FILENAME}...")
-    # Use header=None if your CSV doesn't have names at the top
-    df = pd.read_csv(FILENAME, header=None, names=COLUMNS)
-    
-    # Remove any empty or corrupt rows
-    df = df.dropna()
-    
-    print(f"Successfully loaded {len(df)} rows of data.")
-    print(f"Labels found: {df['label'].unique()}")
-    
-    # --- 4. PREPARE AI ---
-    X = df.drop('label', axis=1) # Features
-    y = df['label']              # Target (The word)
+# Same as train.py: both delegate to backend/scripts/train_custom.py
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend', 'scripts'))
 
-    # Split into 80% training and 20% testing
-    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+from train_custom import main
 
-    # --- 5. TRAIN ---
-    print("Training the Random Forest model... (Please wait)")
-    model = RandomForestClassifier(n_estimators=100, max_depth=15, random_state=42)
-    model.fit(X_train, y_train)
-
-    # --- 6. TEST & SAVE ---
-    accuracy = model.score(X_test, y_test)
-    print(f"Training Complete! Accuracy: {accuracy * 100:.2f}%")
-    
-    joblib.dump(model, MODEL_NAME)
-    print(f"Brain saved successfully as '{MODEL_NAME}'")
-    print("You can now run your detect.py script.")
-
-except Exception as e:
-    print(f"AN ERROR OCCURRED DURING TRAINING: {e}")
+FILENAME = 'training_data.csv'
+MODEL_NAME = 'signspeak.pkl'
 
-print("--- Script Finished ---")
\ No newline at end of file
+if __name__ == "__main__":
+    if not os.path.exists(FILENAME):
+        print(f"CRITICAL ERROR: The file '{FILENAME}' was not found in this folder!")
+        print("Files currently in this folder:", os.listdir())
+        sys.exit(1)
+    try:
+        main(["--data", FILENAME, "--pickle", MODEL_NAME, "--no-publish"] + sys.argv[1:])
+        print(f"Brain saved successfully as '{MODEL_NAME}'")
+        print("You can now run your detect.py script.")
+    except Exception as e:
+        print(f"AN ERROR OCCURRED DURING TRAINING: {e}")
+
+    print("--- Script Finished ---")
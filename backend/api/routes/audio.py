@@ -71,6 +71,7 @@
 
 
 from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
 import logging
 from services.tts_service import tts_service
 
@@ -93,6 +94,29 @@ VOICE_MAP = {
     "default": "en-US-ChristopherNeural"
 }
 
+@router.get("/speak")
+async def speak_stream(text: str = Query(...), lang: str = Query("en")):
+    """Streams the MP3 to the client while it is still being synthesized."""
+    if not text.strip():
+        raise HTTPException(status_code=400, detail="Text is required")
+
+    # Pull the first chunk here, so failures still get a proper status code
+    chunks = tts_service.stream(text, lang)
+    try:
+        first = await chunks.__anext__()
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"❌ TTS Stream Error: {e}")
+        raise HTTPException(status_code=502, detail=str(e) or "No audio")
+
+    async def audio():
+        yield first
+        async for chunk in chunks:
+            yield chunk
+
+    return StreamingResponse(audio(), media_type="audio/mpeg")
+
 @router.post("/speak/stop")
 async def stop_server_audio():
     """Forcefully stops the audio playback on the laptop."""
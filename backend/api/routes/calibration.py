@@ -0,0 +1,79 @@
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException
+from pydantic import BaseModel
+from services.calibration import CalibrationCapture, profile_store
+from services.session_manager import session_manager
+
+router = APIRouter()
+
+
+class CalibrationStart(BaseModel):
+    name: str
+    device: Optional[str] = None
+
+
+class CalibrationFinish(BaseModel):
+    device: Optional[str] = None
+    assign: bool = True
+
+
+class CalibrationAssign(BaseModel):
+    device: Optional[str] = None
+    name: Optional[str] = None  # None removes the glove's profile
+
+
+def _capturing():
+    with session_manager.lock:
+        sessions = list(session_manager.sessions.values())
+    captures = [(s.key, s.capture) for s in sessions]
+    return {key: capture.stats() for key, capture in captures if capture is not None}
+
+
+@router.get("/")
+def get_calibration():
+    return {"profiles": profile_store.names(), "devices": profile_store.devices(), "capturing": _capturing()}
+
+
+@router.get("/profiles/{name}")
+def get_profile(name: str):
+    try:
+        return profile_store.load(name).to_dict()
+    except (OSError, ValueError):
+        raise HTTPException(status_code=404, detail=f"No calibration profile {name!r}")
+
+
+@router.post("/start")
+def start_calibration(request: CalibrationStart):
+    # Open and close the hand a few times, then turn it palm up, palm down
+    # and on its side; every frame of the glove is captured until /finish
+    session = session_manager.get(request.device)
+    capture = session.capture = CalibrationCapture(request.name)
+    return capture.stats()
+
+
+@router.post("/finish")
+def finish_calibration(request: CalibrationFinish):
+    session = session_manager.get(request.device)
+    capture, session.capture = session.capture, None
+    if capture is None:
+        raise HTTPException(status_code=404, detail=f"No calibration running for {session.key}")
+    try:
+        profile = capture.finish()
+        name = profile_store.save(profile)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if request.assign:
+        profile_store.assign(session.key, name)
+    return profile.to_dict()
+
+
+@router.post("/assign")
+def assign_profile(request: CalibrationAssign):
+    key = session_manager.get(request.device).key
+    try:
+        profile_store.assign(key, request.name)
+    except (OSError, ValueError):
+        raise HTTPException(status_code=404, detail=f"No calibration profile {request.name!r}")
+    return {"device": key, "name": request.name}
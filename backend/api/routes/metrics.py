@@ -0,0 +1,51 @@
+from fastapi import APIRouter
+from fastapi.responses import Response
+from services.gemini_service import gemini_service
+from services.metrics import CONTENT_TYPE, metrics
+from services.ml_service import ml_service
+from services.sensor_recorder import sensor_recorder
+from services.session_manager import session_manager
+from services.tts_service import tts_service
+from services.udp_service import udp_service
+
+router = APIRouter()
+
+# Service counters that already exist are read at scrape time only
+metrics.collect("counter", "signspeak_udp_packets_total", "UDP datagrams received",
+                lambda: udp_service.received)
+metrics.collect("counter", "signspeak_udp_corrupt_total", "UDP datagrams that could not be decoded",
+                lambda: udp_service.corrupt)
+metrics.collect("counter", "signspeak_udp_dropped_total", "Frames dropped by the UDP inference queue",
+                lambda: udp_service.dropped)
+metrics.collect("counter", "signspeak_ml_dropped_total", "Frames dropped by the inference shard queues",
+                lambda: ml_service.stats()["dropped"])
+metrics.collect("gauge", "signspeak_ml_queued", "Frames waiting in the inference shard queues",
+                lambda: ml_service.stats()["queued"])
+metrics.collect("gauge", "signspeak_sessions", "Connected glove sessions",
+                lambda: len(session_manager.sessions))
+metrics.collect("counter", "signspeak_recorder_dropped_total", "Frames the recorder dropped under disk pressure",
+                lambda: sensor_recorder.frames_dropped)
+
+metrics.collect("counter", "signspeak_tts_cache_hits_total", "Utterances played from the TTS cache",
+                lambda: tts_service.cache.hits)
+metrics.collect("counter", "signspeak_tts_cache_misses_total", "Utterances that had to be synthesized",
+                lambda: tts_service.cache.misses)
+metrics.collect("gauge", "signspeak_tts_cache_bytes", "Size of the on-disk TTS cache",
+                lambda: tts_service.cache.disk_bytes)
+metrics.collect("gauge", "signspeak_tts_queued", "Utterances waiting for the TTS worker",
+                tts_service.queued)
+metrics.collect("counter", "signspeak_tts_superseded_total", "Utterances replaced by a newer one with the same key",
+                lambda: tts_service.superseded)
+metrics.collect("counter", "signspeak_tts_dropped_total", "Utterances dropped because the TTS queue was full",
+                lambda: tts_service.dropped)
+
+metrics.collect("gauge", "signspeak_llm_circuit_open", "1 while Gemini is skipped after repeated failures",
+                lambda: int(gemini_service.circuit_open))
+metrics.collect("gauge", "signspeak_llm_cache_entries", "Gemini sentences cached by word sequence",
+                lambda: len(gemini_service.cache))
+
+
+@router.get("/metrics")
+def get_metrics():
+    # Prometheus text format
+    return Response(metrics.render(), media_type=CONTENT_TYPE)
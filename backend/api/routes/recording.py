@@ -0,0 +1,47 @@
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException
+from pydantic import BaseModel
+from services.sensor_recorder import sensor_recorder
+
+router = APIRouter()
+
+
+class RecordingStart(BaseModel):
+    name: Optional[str] = None
+    label: Optional[str] = None
+
+
+class RecordingLabel(BaseModel):
+    label: Optional[str] = None
+    device: Optional[str] = None
+
+
+@router.get("/")
+def get_recording():
+    return sensor_recorder.stats()
+
+
+@router.post("/start")
+def start_recording(request: RecordingStart):
+    # Tees every transport's frames into <backend>/recordings/<name>
+    try:
+        sensor_recorder.start(request.name, request.label)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return sensor_recorder.stats()
+
+
+@router.post("/label")
+def set_recording_label(request: RecordingLabel):
+    sensor_recorder.set_label(request.label, request.device)
+    return sensor_recorder.stats()
+
+
+@router.post("/stop")
+def stop_recording():
+    stats = sensor_recorder.stop()
+    if stats["error"]:
+        # The writer died before /stop: the recording is incomplete
+        raise HTTPException(status_code=500, detail=f"Recording failed: {stats['error']}")
+    return stats
@@ -1,19 +1,142 @@
-from fastapi import APIRouter, Query
+import asyncio
+import json
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Query, WebSocket, status
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
 from services.data_store import data_store
+from services.sensor_stream import SensorStream
+from services.session_manager import session_manager
 
 router = APIRouter()
 
+CONFIG_FIELDS = ("use_gemini", "lang", "auto_speak")
+
+
+class ConfigUpdate(BaseModel):
+    use_gemini: Optional[bool] = None
+    lang: Optional[str] = None
+    auto_speak: Optional[bool] = None
+
+
+def _store_for(device):
+    # One glove's snapshot, or the global store (latest of any glove).
+    # Unknown devices are not created here: only ingest adds sessions
+    if not device:
+        return data_store
+    session = session_manager.find(device)
+    if session is None:
+        raise HTTPException(status_code=404, detail=f"No glove session {device!r}")
+    return session.store
+
+
 @router.get("/sensors")
 def get_sensors(
-    use_gemini: bool = Query(True), 
-    lang: str = Query("en"),
-    auto_speak: bool = Query(False)
+    use_gemini: Optional[bool] = Query(None),
+    lang: Optional[str] = Query(None),
+    auto_speak: Optional[bool] = Query(None)
 ):
-    # Update global config from frontend
-    data_store.update_config({
-        "use_gemini": use_gemini,
-        "lang": lang,
-        "auto_speak": auto_speak
-    })
-    
+    # Legacy clients still send their config with every poll; only write it
+    # when they actually do (new clients use POST /config)
+    updates = {"use_gemini": use_gemini, "lang": lang, "auto_speak": auto_speak}
+    updates = {k: v for k, v in updates.items() if v is not None}
+    if updates:
+        data_store.update_config(updates)
+
     return data_store.get()
+
+
+@router.get("/sensors/changes")
+def get_sensor_changes(since: Optional[int] = Query(None, ge=0)):
+    # Only the keys written after version `since` (everything if omitted)
+    version, changes = data_store.changes_since(since)
+    return {"version": version, "changes": changes}
+
+
+@router.get("/config")
+def get_config():
+    return data_store.get_config()
+
+
+@router.post("/config")
+def set_config(config: ConfigUpdate):
+    updates = {k: getattr(config, k) for k in CONFIG_FIELDS if getattr(config, k) is not None}
+    if updates:
+        data_store.update_config(updates)
+    return data_store.get_config()
+
+
+async def _push(websocket, stream):
+    async for delta in stream.deltas():
+        if delta is None:
+            # Writing is what finds a connection that died without a close
+            await websocket.send_json({"heartbeat": True})
+        elif delta:
+            await websocket.send_json(delta)
+
+
+async def _answer(websocket):
+    # {"ping": t} -> {"pong": t}, so clients can time round trips on their own clock
+    while True:
+        try:
+            message = json.loads(await websocket.receive_text())
+        except ValueError:
+            continue
+        if isinstance(message, dict) and "ping" in message:
+            await websocket.send_json({"pong": message["ping"]})
+
+
+@router.websocket("/ws/sensors")
+async def sensors_ws(
+    websocket: WebSocket,
+    max_hz: float = Query(20.0, gt=0, le=100),
+    device: Optional[str] = Query(None)
+):
+    """
+    Pushes sensor/prediction deltas as JSON messages. The client side is
+    read too, so a close is noticed at once rather than on the next push.
+    """
+    try:
+        store = _store_for(device)
+    except HTTPException as e:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason=e.detail)
+        return
+    await websocket.accept()
+    stream = SensorStream(store, max_hz=max_hz)
+    tasks = [asyncio.create_task(_push(websocket, stream)), asyncio.create_task(_answer(websocket))]
+    try:
+        # Either side ending (disconnect, failed send) ends the connection
+        await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+@router.get("/sensors/stream")
+async def sensors_sse(
+    max_hz: float = Query(20.0, gt=0, le=100),
+    device: Optional[str] = Query(None)
+):
+    """Server-Sent Events version of /ws/sensors."""
+    stream = SensorStream(_store_for(device), max_hz=max_hz)
+
+    async def events():
+        async for delta in stream.deltas():
+            if delta is None:
+                yield ": keep-alive\n\n"
+            else:
+                yield f"data: {json.dumps(delta)}\n\n"
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/sessions")
+def get_sessions():
+    # One snapshot per connected glove, keyed by device id / source address
+    return session_manager.snapshot()
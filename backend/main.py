@@ -1,12 +1,16 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from api.routes import audio, sensors
+from api.routes import audio, calibration, metrics, recording, sensors
 
 from services.udp_service import udp_service
 from services.serial_service import serial_service
-from services.ml_service import ml_service
-from services.tts_service import tts_service
+from services.ml_service import FINAL_SENTENCE, WORDS, ml_service
+from services.tts_service import PRIORITY_SENTENCE, tts_service
 from services.data_store import data_store
+from services.gemini_service import gemini_service
+from services.session_manager import session_manager
+from services.sensor_recorder import sensor_recorder
+from services.frame_ring import frame_rings
 
 import logging
 import asyncio
@@ -32,7 +36,7 @@ app.add_middleware(
 # ---------------- STATE ----------------
 last_detection_time = 0.0
 last_spoken_time = 0.0
-last_spoken_sentence = None
+main_loop = None
 
 state_lock = threading.Lock()
 
@@ -41,7 +45,7 @@ def on_ml_prediction(prediction_data):
     """
     Handles DEMO SEQUENTIAL predictions from MLService
     """
-    global last_detection_time, last_spoken_time, last_spoken_sentence
+    global last_detection_time, last_spoken_time
 
     # We ONLY expect dict data in demo mode
     if not isinstance(prediction_data, dict):
@@ -51,19 +55,31 @@ def on_ml_prediction(prediction_data):
     sentence = prediction_data.get("sentence", "")
     confidence = prediction_data.get("confidence", 94)
     is_final = prediction_data.get("final", False)
+    is_partial = prediction_data.get("partial", False)
+    if is_final and prediction_data.get("words"):
+        # Beam-decoded gesture words: grammar from the local rules (instant)
+        sentence = gemini_service.generate_sentence(prediction_data["words"])
+    session = session_manager.get(prediction_data.get("device"))
 
-    logger.info(f"📥 DEMO WORD RECEIVED → {word}")
+    logger.info(f"📥 DEMO WORD RECEIVED [{session.key}] → {word}")
 
     # ---------------- FRONTEND UPDATE ----------------
-    data_store.update({
+    result = {
         "gesture": word,
         "sentence": sentence,
         "confidence": confidence,
-        "stable": True
-    })
+        "stable": not is_partial
+    }
+    session.update(result)
+    data_store.update(result)
 
     last_detection_time = time.time()
 
+    # ---------------- AI SENTENCE (off the inference thread) ----------------
+    # The local sentence is shown and spoken now; Gemini's replaces it on screen
+    if is_final and prediction_data.get("words") and main_loop and data_store.config.get("use_gemini", True):
+        asyncio.run_coroutine_threadsafe(refine_sentence(session, prediction_data["words"], sentence), main_loop)
+
     # ---------------- AUDIO OUTPUT ----------------
     use_audio = data_store.config.get("audio", True)
     target_lang = data_store.config.get("lang", "en")
@@ -74,18 +90,39 @@ def on_ml_prediction(prediction_data):
     # Speak ONLY the final AI sentence
     if is_final:
         with state_lock:
-            if sentence != last_spoken_sentence:
+            if sentence != session.last_spoken_sentence:
                 logger.info("🗣️ Speaking FINAL AI sentence")
-                tts_service.speak(sentence, lang=target_lang)
-                last_spoken_sentence = sentence
+                # Newest sentence of this glove first; replaces an unspoken older one
+                tts_service.speak(sentence, lang=target_lang,
+                                  priority=PRIORITY_SENTENCE, key=f"sentence:{session.key}")
+                session.last_spoken_sentence = sentence
                 last_spoken_time = time.time()
 
 
-def on_serial_data(flex, acc):
+async def refine_sentence(session, words, local_sentence):
+    """
+    Replaces the rule-based final sentence shown for a session with the
+    AI one, unless a newer word or sentence arrived in the meantime
+    """
+    sentence = await gemini_service.build_sentence(words)
+    if sentence and sentence != local_sentence and session.store.current.data.get("sentence") == local_sentence:
+        result = {"sentence": sentence}
+        session.update(result)
+        data_store.update(result)
+
+
+def on_serial_data(flex, acc, device=None, gyro=None, frame=None):
     """
-    Called whenever Serial / UDP sends sensor data
+    Called whenever Serial / UDP sends sensor data (UDP: views of its FrameRing)
     """
-    ml_service.process_data(flex, acc)
+    ml_service.process_data(flex, acc, device, gyro, frame)
+
+def speech_vocabulary():
+    """Everything likely to be spoken: gesture words and the demo sentence."""
+    words = list(WORDS) + [FINAL_SENTENCE]
+    if ml_service.model is not None:
+        words += [str(c) for c in ml_service.model.classes]
+    return words
 
 # ---------------- BACKGROUND TASK ----------------
 async def keep_alive_loop():
@@ -95,11 +132,34 @@ async def keep_alive_loop():
     logger.info("⏳ Background keep-alive loop running (Demo Mode)")
     while True:
         await asyncio.sleep(60)
+        for key in session_manager.expire():
+            logger.info(f"👋 Glove session {key} expired")
+
+async def inference_flush_loop():
+    """
+    Flushes partially filled inference batches when the glove goes quiet.
+    poll() takes shard locks, classifies and fires the prediction callbacks,
+    so it runs on a worker thread instead of stalling UDP, WebSockets and HTTP
+    """
+    loop = asyncio.get_running_loop()
+    while True:
+        await asyncio.sleep(ml_service.max_batch_delay)
+        await loop.run_in_executor(None, ml_service.poll)
+
+async def model_watch_loop():
+    """
+    Picks up newly published model versions (hot reload, non-blocking)
+    """
+    while True:
+        await asyncio.sleep(2.0)
+        ml_service.check_for_update()
 
 # ---------------- STARTUP ----------------
 @app.on_event("startup")
 async def startup_event():
+    global main_loop
     logger.info("🚀 Starting SignSpeak Backend (DEMO SEQUENTIAL MODE)")
+    main_loop = asyncio.get_running_loop()
 
     try:
         # Register callbacks
@@ -107,12 +167,18 @@ async def startup_event():
         serial_service.register_callback(on_serial_data)
         udp_service.register_callback(on_serial_data)
 
-        # Start services
-        udp_service.start()
+        # Start services (UDP runs on this event loop)
+        ml_service.start()
+        await udp_service.start()
         serial_service.start()
 
+        # Synthesize repeated phrases up front (TTS cache)
+        tts_service.prewarm(speech_vocabulary())
+
         # Background task
         asyncio.create_task(keep_alive_loop())
+        asyncio.create_task(inference_flush_loop())
+        asyncio.create_task(model_watch_loop())
 
         logger.info("🧠 Mode: Sequential Gesture → AI Sentence")
 
@@ -125,10 +191,17 @@ async def shutdown_event():
     logger.info("🛑 Shutting down SignSpeak backend")
     udp_service.stop()
     serial_service.stop()
+    ml_service.stop()
+    sensor_recorder.stop()
+    frame_rings.close()
+    tts_service.shutdown()
 
 # ---------------- ROUTES ----------------
 app.include_router(sensors.router)
 app.include_router(audio.router, prefix="/audio", tags=["Audio"])
+app.include_router(recording.router, prefix="/recording", tags=["Recording"])
+app.include_router(calibration.router, prefix="/calibration", tags=["Calibration"])
+app.include_router(metrics.router, tags=["Metrics"])
 
 @app.get("/")
 def root():
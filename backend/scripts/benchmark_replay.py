@@ -0,0 +1,347 @@
+"""
+Replays recorded glove sessions through the real backend pipeline:
+
+    UDPService._handle (frame decoding, sessions) -> UDP inference queue
+    -> MLService shards (micro-batched forest, stability) -> GeminiService
+
+at 1x, 10x and maximum speed, and reports throughput, frame-to-word and
+frame-to-sentence latency (p50/p99), CPU and peak RSS for each speed.
+
+The recognised words and sentences are compared against a golden
+transcript, so both accuracy and performance regressions fail the run:
+
+    python scripts/benchmark_replay.py --input ml_data/training_data_shivam.csv --write-golden golden.json
+    python scripts/benchmark_replay.py --input ml_data/training_data_shivam.csv --golden golden.json --max-p99-ms 80
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import time
+
+import numpy as np
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Add backend to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from services import ml_service as ml_module
+from services.dataset_cache import parse_csv
+from services.gemini_service import gemini_service
+from services.ml_service import MLService
+from services.sensor_recorder import load_recording
+from services.session_manager import session_manager
+from services.frame_ring import frame_rings
+from services.udp_service import UDPService
+from services.wire_protocol import encode_frame
+
+# Address CSV replays appear to come from (the session key is the IP)
+REPLAY_ADDR = ("10.0.0.1", 5005)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Replay benchmark of the ingest -> inference -> sentence pipeline")
+    parser.add_argument("--input", required=True,
+                        help="Training CSV or backend recording directory (recordings/<name>)")
+    parser.add_argument("--speeds", default="1,10,max",
+                        help="Comma-separated replay speeds; 'max' replays as fast as possible")
+    parser.add_argument("--rate", type=float, default=33.0,
+                        help="Frame rate assumed for CSV input (the firmware sends ~33 Hz)")
+    parser.add_argument("--binary", action="store_true",
+                        help="Send CSV rows as binary frames instead of ASCII datagrams")
+    parser.add_argument("--limit", type=int, default=0, help="Only replay the first N frames")
+    parser.add_argument("--workers", type=int, default=4, help="MLService inference shards")
+    parser.add_argument("--decoder", choices=("beam", "stability"), default="beam",
+                        help="MLService word decoder")
+    parser.add_argument("--processes", action="store_true",
+                        help="Classify in one worker process per shard instead of threads")
+    parser.add_argument("--no-segment", dest="segment", action="store_false",
+                        help="Classify every frame instead of only motion-segmented holds")
+    parser.add_argument("--store", default=None,
+                        help="Model store directory (default: the backend's models/store)")
+    parser.add_argument("--golden", help="Golden transcript to compare against")
+    parser.add_argument("--write-golden", metavar="PATH", help="Write the transcript of this input to PATH")
+    parser.add_argument("--max-p99-ms", type=float, default=None,
+                        help="Fail if the frame-to-word p99 of any paced speed exceeds this")
+    parser.add_argument("--json", metavar="PATH", help="Also write the results as JSON")
+    parser.add_argument("--verbose", action="store_true", help="Keep the services' INFO logging")
+    return parser.parse_args(argv)
+
+
+def _speeds(spec):
+    return [None if s.strip().lower() == "max" else float(s) for s in spec.split(",") if s.strip()]
+
+
+# ---------------- INPUT ---------------- #
+def load_frames(path, rate=33.0, binary=False, limit=0):
+    """
+    [(t, payload, addr)] in send order, where payload is exactly what a glove
+    would put in one datagram and t is its send time in seconds.
+    """
+    frames = []
+    if os.path.isdir(path):
+        rec = load_recording(path)
+        keep = ~np.isnan(rec["flex"][:, 3]) & np.isnan(rec["flex"][:, 4])
+        devices = {name: i + 1 for i, name in enumerate(sorted(set(rec["device"][keep].tolist())))}
+        for i in np.flatnonzero(keep):
+            gyro = rec["gyro"][i]
+            frames.append((float(rec["t"][i]), encode_frame(
+                rec["flex"][i, :4], rec["acc"][i], None if np.isnan(gyro).any() else gyro,
+                device_id=devices[rec["device"][i]], seq=int(rec["seq"][i]) if rec["seq"][i] >= 0 else int(i),
+                float32=True,
+            ), REPLAY_ADDR))
+    else:
+        X, _ = parse_csv(path)
+        for i, row in enumerate(X):
+            if binary:
+                payload = encode_frame(row[:4], row[4:], device_id=1, seq=i, float32=True)
+            else:
+                payload = ",".join(repr(float(v)) for v in row).encode()
+            frames.append((i / rate, payload, REPLAY_ADDR))
+
+    frames.sort(key=lambda f: f[0])
+    return frames[:limit] if limit else frames
+
+
+# ---------------- PIPELINE ---------------- #
+class Pipeline:
+    """A fresh UDPService -> MLService -> GeminiService chain for one pass."""
+
+    def __init__(self, store=None, workers=4, batch_size=8, udp_queue=64, decoder="beam", segment=True,
+                 processes=False):
+        # Sessions are global; each pass starts from clean stability state
+        with session_manager.lock:
+            session_manager.sessions.clear()
+
+        kwargs = {"store_path": store} if store else {}
+        self.ml = MLService(workers=workers, batch_size=batch_size, decoder=decoder, segment=segment,
+                            processes=processes, **kwargs)
+        if not self.ml.active:
+            raise RuntimeError("No model in the store; train one with scripts/train_custom.py")
+        self.udp = UDPService(queue_size=udp_queue)
+        self.udp.register_callback(self.ml.process_data)
+        self.ml.register_callback(self._on_word)
+
+        self.words = []       # (device, word, sentence, t_word, t_sentence)
+        self.on_word = None   # Extra hook: on_word(device, word)
+
+    def _on_word(self, prediction):
+        if prediction.get("partial") or prediction.get("final"):
+            return  # Decoder hypotheses; every word is also emitted on its own
+        t_word = time.perf_counter()
+        sentence = gemini_service.generate_sentence(prediction["sentence"])
+        self.words.append((prediction["device"], prediction["word"], sentence, t_word, time.perf_counter()))
+        if self.on_word:
+            self.on_word(prediction["device"], prediction["word"])
+
+    def transcript(self):
+        devices = {}
+        for device, word, sentence, _, _ in self.words:
+            entry = devices.setdefault(device, {"words": [], "sentence": None})
+            entry["words"].append(word)
+            entry["sentence"] = sentence
+        return devices
+
+
+def reference_pass(frames, store=None, decoder="beam", segment=True):
+    """
+    Unpaced, single-threaded, unbatched run. Gives the transcript and, for
+    every word, the index of the frame that committed it (what the timed
+    passes measure their latency from).
+    """
+    pipeline = Pipeline(store, workers=1, batch_size=1, udp_queue=len(frames) + 1, decoder=decoder,
+                        segment=segment)
+    pipeline.udp.queue = asyncio.Queue(maxsize=pipeline.udp.queue_size)
+
+    triggers = {}
+    current = [0]
+    pipeline.on_word = lambda device, word: triggers.setdefault(device, []).append(current[0])
+
+    for i, (_, payload, addr) in enumerate(frames):
+        current[0] = i
+        pipeline.udp._handle(payload, addr)
+        while not pipeline.udp.queue.empty():
+            pipeline.udp._dispatch(*pipeline.udp.queue.get_nowait())
+
+    return pipeline.transcript(), triggers
+
+
+async def _timed_pass(frames, speed, args):
+    pipeline = Pipeline(args.store, workers=args.workers, decoder=args.decoder, segment=args.segment,
+                        processes=args.processes)
+    udp, ml = pipeline.udp, pipeline.ml
+    udp.queue = asyncio.Queue(maxsize=udp.queue_size)
+    udp.worker = asyncio.get_running_loop().create_task(udp._inference_worker())
+    ml.start()
+
+    async def flush_loop():  # main.inference_flush_loop
+        while True:
+            await asyncio.sleep(ml.max_batch_delay)
+            ml.poll()
+    flusher = asyncio.get_running_loop().create_task(flush_loop())
+
+    ingest = np.zeros(len(frames))
+    t_first = frames[0][0]
+    cpu_start = time.process_time()
+    start = time.perf_counter()
+
+    for i, (t, payload, addr) in enumerate(frames):
+        if speed:
+            delay = start + (t - t_first) / speed - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+        elif i % udp.max_drain == 0:
+            # A saturated socket is drained max_drain datagrams per wakeup
+            await asyncio.sleep(0)
+        ingest[i] = time.perf_counter()
+        udp._handle(payload, addr)
+
+    # Let the queues drain and the last partial batches flush
+    while not udp.queue.empty() or any(not s.queue.empty() for s in ml.shards):
+        await asyncio.sleep(0.005)
+    await asyncio.sleep(ml.max_batch_delay * 2)
+    for shard in ml.shards:
+        with shard.lock:
+            if shard.engine:
+                shard.engine.flush()
+    seconds = time.perf_counter() - start
+    cpu = time.process_time() - cpu_start
+
+    flusher.cancel()
+    udp.worker.cancel()
+    ml.stop()
+    return pipeline, ingest, seconds, cpu, udp.stats()["dropped"], ml.stats()["dropped"]
+
+
+def _peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _ms_percentiles(values):
+    if not values:
+        return None, None
+    p50, p99 = np.percentile(np.asarray(values) * 1000, [50, 99])
+    return round(float(p50), 2), round(float(p99), 2)
+
+
+def run_speed(frames, speed, args, reference, triggers):
+    pipeline, ingest, seconds, cpu, udp_dropped, ml_dropped = asyncio.run(_timed_pass(frames, speed, args))
+
+    # Match each word to the frame that triggered it in the reference run
+    word_lat, sentence_lat = [], []
+    seen = {}
+    for device, word, _, t_word, t_sentence in pipeline.words:
+        k = seen[device] = seen.get(device, -1) + 1
+        expected = reference.get(device, {"words": []})["words"]
+        if k < len(expected) and expected[k] == word:
+            frame = ingest[triggers[device][k]]
+            word_lat.append(t_word - frame)
+            sentence_lat.append(t_sentence - frame)
+
+    word_p50, word_p99 = _ms_percentiles(word_lat)
+    sentence_p50, sentence_p99 = _ms_percentiles(sentence_lat)
+    return {
+        "speed": "max" if speed is None else speed,
+        "frames": len(frames),
+        "seconds": round(seconds, 3),
+        "frames_per_second": round(len(frames) / seconds, 1),
+        "words": len(pipeline.words),
+        "word_p50_ms": word_p50,
+        "word_p99_ms": word_p99,
+        "sentence_p50_ms": sentence_p50,
+        "sentence_p99_ms": sentence_p99,
+        "cpu_percent": round(100 * cpu / seconds, 1),
+        "peak_rss_mb": _peak_rss_mb(),
+        "udp_dropped": udp_dropped,
+        "ml_dropped": ml_dropped,
+        "transcript_ok": pipeline.transcript() == reference,
+    }
+
+
+def _print_results(results):
+    print(f"\n{'speed':>6} {'fps':>9} {'words':>6} {'word p50/p99 ms':>17} {'sentence p50/p99 ms':>21} "
+          f"{'cpu%':>6} {'rss MB':>7} {'drops':>6}  transcript")
+    for r in results:
+        rss = f"{r['peak_rss_mb']:.0f}" if r["peak_rss_mb"] is not None else "-"
+        print(f"{str(r['speed']):>6} {r['frames_per_second']:>9} {r['words']:>6} "
+              f"{str(r['word_p50_ms']) + ' / ' + str(r['word_p99_ms']):>17} "
+              f"{str(r['sentence_p50_ms']) + ' / ' + str(r['sentence_p99_ms']):>21} "
+              f"{r['cpu_percent']:>6} {rss:>7} {r['udp_dropped'] + r['ml_dropped']:>6}  "
+              f"{'✅' if r['transcript_ok'] else '❌'}")
+
+
+def main(argv=None):
+    try:
+        return _main(argv)
+    finally:
+        # Shared-memory rings outlive the process unless unlinked
+        frame_rings.close()
+
+
+def _main(argv):
+    args = parse_args(argv)
+    if not args.verbose:
+        logging.getLogger().setLevel(logging.WARNING)
+    if args.store:
+        args.store = os.path.abspath(args.store)
+
+    # The real classifier, not the scripted demo words
+    ml_module.DEMO_MODE = False
+
+    frames = load_frames(args.input, rate=args.rate, binary=args.binary, limit=args.limit)
+    if not frames:
+        print(f"❌ No frames in {args.input}")
+        return 1
+    print(f"📂 {args.input}: {len(frames)} frames over {frames[-1][0] - frames[0][0]:.1f}s")
+
+    reference, triggers = reference_pass(frames, args.store, args.decoder, args.segment)
+    failures = []
+
+    if args.write_golden:
+        with open(args.write_golden, "w", encoding="utf-8") as f:
+            json.dump({"input": os.path.basename(os.path.normpath(args.input)), "frames": len(frames),
+                       "devices": reference}, f, indent=2)
+        print(f"✅ Golden transcript written to {args.write_golden}")
+    if args.golden:
+        with open(args.golden, "r", encoding="utf-8") as f:
+            golden = json.load(f)
+        if golden["devices"] != reference:
+            failures.append(f"transcript differs from {args.golden}")
+            for device in sorted(set(golden["devices"]) | set(reference)):
+                print(f"   {device}: expected {golden['devices'].get(device)}")
+                print(f"   {' ' * len(device)}  got      {reference.get(device)}")
+
+    results = []
+    for speed in _speeds(args.speeds):
+        print(f"\n▶️ Replaying at {'max speed' if speed is None else f'{speed:g}x'}...")
+        result = run_speed(frames, speed, args, reference, triggers)
+        results.append(result)
+
+        # Dropping under overload is the designed backpressure; only an
+        # undisturbed run has to reproduce the reference transcript
+        if not result["transcript_ok"] and not (result["udp_dropped"] or result["ml_dropped"]):
+            failures.append(f"{result['speed']}x: transcript differs from the reference run")
+        if speed and args.max_p99_ms and result["word_p99_ms"] and result["word_p99_ms"] > args.max_p99_ms:
+            failures.append(f"{result['speed']}x: word p99 {result['word_p99_ms']}ms > {args.max_p99_ms}ms")
+
+    _print_results(results)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"input": args.input, "results": results}, f, indent=2)
+
+    for failure in failures:
+        print(f"❌ {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,118 @@
+"""
+Renders the phrase bank used for offline speech (services/phrase_bank.py).
+
+Every gesture word, the demo sentence and the fixed sentence translations
+are synthesized with Edge TTS (or taken from the TTS cache), together with
+each of their words, decoded once to 16-bit PCM and packed into one
+memory-mapped file per deployment:
+
+    python scripts/build_phrase_bank.py
+    python scripts/build_phrase_bank.py --phrases extra.tsv --langs en,hi
+
+extra.tsv holds one "<lang><TAB><phrase>" per line.
+"""
+import argparse
+import asyncio
+import io
+import logging
+import os
+import sys
+
+import numpy as np
+import pygame
+
+# Add backend to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from services.ml_service import FINAL_SENTENCE, WORDS
+from services.phrase_bank import normalize, write_pack
+from services.tts_cache import cache_key
+from services.tts_service import OFFLINE_SENTENCE_TRANSLATIONS, tts_service
+
+logging.basicConfig(level=logging.INFO, format="%(message)s")
+logger = logging.getLogger("build_phrase_bank")
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+DEFAULT_OUTPUT = os.path.join(BASE_DIR, "phrase_bank", "phrases.pack")
+
+# Edge TTS voices are 24 kHz mono
+SAMPLE_RATE = 24000
+
+
+def default_phrases():
+    """{lang: [phrase, ...]}: what the backend is expected to say."""
+    phrases = {"en": list(WORDS) + [FINAL_SENTENCE]}
+    for lang, sentences in OFFLINE_SENTENCE_TRANSLATIONS.items():
+        phrases["en"] += list(sentences)
+        phrases.setdefault(lang, []).extend(sentences.values())
+    return phrases
+
+
+def with_words(phrases):
+    """Adds every word of every phrase, so new sentences can be stitched."""
+    out = []
+    for phrase in phrases:
+        out.append(phrase)
+        out.extend(normalize(phrase).split())
+    return list(dict.fromkeys(p for p in out if normalize(p)))
+
+
+def decode(audio):
+    """MP3 bytes -> int16 mono PCM at SAMPLE_RATE (via the pygame mixer)."""
+    sound = pygame.mixer.Sound(file=io.BytesIO(audio))
+    return np.frombuffer(sound.get_raw(), dtype="<i2").copy()
+
+
+async def render(phrases):
+    clips = {}
+    for lang, texts in phrases.items():
+        voice = tts_service.voices.get(lang)
+        if not voice:
+            logger.warning(f"⚠️ No voice for {lang}, skipped")
+            continue
+        for text in texts:
+            audio = tts_service.cache.get(cache_key(text, lang, voice))
+            if audio is None:
+                audio = await tts_service._synthesize(text, lang, voice)
+            clips[(lang, text)] = decode(audio)
+            logger.info(f"🎙️ [{lang}] {text} ({len(clips[(lang, text)]) / SAMPLE_RATE:.2f}s)")
+    return clips
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build the offline TTS phrase bank")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT)
+    parser.add_argument("--phrases", help="Extra phrases, one '<lang>\\t<phrase>' per line")
+    parser.add_argument("--langs", help="Comma separated languages to include (default: all)")
+    args = parser.parse_args(argv)
+
+    phrases = default_phrases()
+    if args.phrases:
+        with open(args.phrases, encoding="utf-8") as f:
+            for line in f:
+                lang, _, text = line.rstrip("\n").partition("\t")
+                if text.strip():
+                    phrases.setdefault(lang.strip(), []).append(text.strip())
+    if args.langs:
+        wanted = set(args.langs.split(","))
+        phrases = {lang: texts for lang, texts in phrases.items() if lang in wanted}
+    phrases = {lang: with_words(texts) for lang, texts in phrases.items()}
+
+    # Decode straight into the pack format
+    pygame.mixer.quit()
+    pygame.mixer.init(frequency=SAMPLE_RATE, size=-16, channels=1)
+
+    try:
+        clips = asyncio.run(render(phrases))
+    except Exception as e:
+        logger.error(f"❌ Synthesis failed (Edge TTS needs the network once): {e}")
+        return 1
+
+    write_pack(args.output, clips, SAMPLE_RATE, channels=1)
+    seconds = sum(len(pcm) for pcm in clips.values()) / SAMPLE_RATE
+    logger.info(f"✅ Phrase bank written: {args.output} ({len(clips)} clips, {seconds:.1f}s of audio)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,17 +1,25 @@
+import os
 import socket
+import sys
 import time
 import random
 
+# Add backend to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from services.wire_protocol import encode_frame
+
 # CONFIG
 TARGET_IP = "127.0.0.1" # Send to localhost
 TARGET_PORT = 6000      # Must match backend port
+BINARY = "--binary" in sys.argv  # Send binary frames instead of CSV
 
 sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
 
 print(f"🚀 Sending 50 fake glove packets to {TARGET_IP}:{TARGET_PORT}...")
 
 try:
-    for _ in range(50):
+    for seq in range(50):
         # Simulate Flex Sensors (0-4095)
         f1 = random.randint(2000, 3000)
         f2 = random.randint(2000, 3000)
@@ -25,9 +33,15 @@ try:
 
         # Format: f1,f2,f3,f4,ax,ay,az
         packet = f"{f1},{f2},{f3},{f4},{ax},{ay},{az}"
-        
-        sock.sendto(packet.encode(), (TARGET_IP, TARGET_PORT))
-        print(f"Sent: {packet}")
+
+        if BINARY:
+            payload = encode_frame([f1, f2, f3, f4], [ax, ay, az], seq=seq,
+                                   timestamp_ms=int(time.monotonic() * 1000))
+        else:
+            payload = packet.encode()
+
+        sock.sendto(payload, (TARGET_IP, TARGET_PORT))
+        print(f"Sent ({len(payload)} bytes): {packet}")
         
         time.sleep(0.1) # 10Hz
 
@@ -1,68 +1,490 @@
-import pandas as pd
 import numpy as np
+import pandas as pd
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import accuracy_score
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+import itertools
 import joblib
+import argparse
 import os
+import sys
+import time
+
+# Add backend to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from services.beam_decoder import label_bigrams
+from services.calibration import CalibrationProfile, profile_store
+from services.compiled_forest import compile_forest, merge_forests
+from services.dataset_cache import FEATURE_COLUMNS, DatasetCache, parse_dataset
+from services.model_store import ModelStore
+from services.window_features import window_columns, window_features
 
 # --- PATHS ---
 # Relative to where this script is run, or absolute
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 DATA_PATH = os.path.join(BASE_DIR, 'ml_data', 'training_data_shivam.csv')
 MODEL_PATH = os.path.join(BASE_DIR, 'models', 'signspeak.pkl')
+STORE_PATH = os.path.join(BASE_DIR, 'models', 'store')
+CACHE_PATH = os.path.join(BASE_DIR, 'ml_data', 'cache')
+
+# Default forest (also the base of every sweep point)
+DEFAULT_PARAMS = {"n_estimators": 100, "max_depth": 15}
+# Trees added per incremental update
+INCREMENTAL_TREES = 30
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Train the SignSpeak gesture classifier")
+    parser.add_argument("--data", action="append", default=None,
+                        help="Training CSV or backend recording directory (repeatable; default: ml_data CSV)")
+    parser.add_argument("--recording", action="append", default=[],
+                        help="Backend recording directory (recordings/<name>); same as --data")
+    parser.add_argument("--calibrate", action="store_true",
+                        help="Train on per-wearer normalised features (see services/calibration.py)")
+    parser.add_argument("--profile", action="append", default=[], metavar="SOURCE=NAME",
+                        help="Calibration profile of a data source (default: fitted from its own frames)")
+    parser.add_argument("--window", type=int, default=0,
+                        help="Train on sliding-window features over N frames (0 = per-frame model)")
+    parser.add_argument("--stability", type=int, default=2,
+                        help="Consecutive identical windows required to emit a word (windowed mode)")
+    parser.add_argument("--trees", type=int, default=None,
+                        help=f"Number of trees (default {DEFAULT_PARAMS['n_estimators']}, "
+                             f"{INCREMENTAL_TREES} added per --incremental update)")
+    parser.add_argument("--depth", type=_depth, default=DEFAULT_PARAMS["max_depth"])
+    parser.add_argument("--jobs", type=int, default=-1,
+                        help="Cores used to fit the forest / run the sweep (-1 = all)")
+    parser.add_argument("--sweep", action="append", default=[], metavar="PARAM=V1,V2,...",
+                        help="Hyperparameter grid, e.g. --sweep n_estimators=50,100 --sweep max_depth=10,none")
+    parser.add_argument("--no-cache", action="store_true", help="Re-parse the data even if cached")
+    parser.add_argument("--pickle", default=MODEL_PATH,
+                        help="Where the per-frame sklearn pickle is written")
+    parser.add_argument("--publish-pickle", action="store_true",
+                        help="Only publish the existing --pickle model to the store (no training)")
+    parser.add_argument("--no-publish", action="store_true",
+                        help="Do not publish the compiled forest to the backend model store")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Update the current store model with the rows appended since it was trained")
+    parser.add_argument("--replay", type=int, default=200,
+                        help="Old rows per class replayed into an incremental update")
+    parser.add_argument("--update-share", type=float, default=0.7,
+                        help="Share of the vote given to the trees of an incremental update")
+    args = parser.parse_args(argv)
+    if args.profile and not args.calibrate:
+        parser.error("--profile needs --calibrate")
+    args.profiles = {}
+    for spec in args.profile:
+        source, _, name = spec.partition("=")
+        if not source or not name:
+            parser.error(f"--profile expects SOURCE=NAME, got {spec!r}")
+        args.profiles[_source_name(source)] = name
+    if args.incremental and (args.window or args.sweep or args.no_publish):
+        parser.error("--incremental updates the published per-frame model; "
+                     "it cannot be combined with --window, --sweep or --no-publish")
+    return args
+
+
+def _depth(value):
+    return None if str(value).lower() == "none" else int(value)
+
+
+def _sweep_value(value):
+    try:
+        return _depth(value)
+    except ValueError:
+        try:
+            return float(value)
+        except ValueError:
+            return value
+
+
+class Timings:
+    """Wall-clock time per training phase, printed as a report at the end."""
+
+    def __init__(self):
+        self.phases = []
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append((name, time.perf_counter() - start))
+
+    def report(self):
+        total = sum(seconds for _, seconds in self.phases)
+        print("\n⏱️ Timings")
+        for name, seconds in self.phases:
+            print(f"   {name:<22}{seconds:8.2f}s")
+        print(f"   {'total':<22}{total:8.2f}s")
+
+
+def _source_name(path):
+    return os.path.basename(os.path.normpath(path))
+
+
+def load_data(paths, cache):
+    """
+    Concatenated (X, y) of every dataset, parsed once and then cached, and
+    the row count of each source (in order).
+    """
+    Xs, ys, rows = [], [], {}
+    for path in paths:
+        if cache:
+            X, y, hit = cache.load(path)
+            print(f"📂 {path}: {len(y)} rows ({'cache hit' if hit else 'parsed, cached'})")
+        else:
+            X, y = parse_dataset(path)
+            print(f"📂 {path}: {len(y)} rows (parsed)")
+        Xs.append(X)
+        ys.append(y)
+        rows[_source_name(path)] = int(len(y))
+    if len(Xs) == 1:
+        return Xs[0], ys[0], rows
+    return np.concatenate(Xs), np.concatenate(ys), rows
+
+
+def calibrate_sources(X, rows, assigned, known=None):
+    """
+    Every source normalised with its wearer's profile: the stored one given
+    with --profile, the one a previous model recorded (`known`), or else
+    one fitted from the source's own frames (fine for a recording that
+    covers several signs, not for a single-sign dataset). Returns the
+    normalised X and the "calibration" model metadata.
+    """
+    unknown = set(assigned) - set(rows)
+    if unknown:
+        raise ValueError(f"--profile for unknown sources: {', '.join(sorted(unknown))}")
+
+    out = np.empty(X.shape, dtype=np.float32)
+    profiles = {}
+    start = 0
+    for name, count in rows.items():
+        part = X[start:start + count]
+        if name in assigned:
+            profile = profile_store.load(assigned[name])
+            print(f"🎛️ {name}: calibration profile {profile.name}")
+        elif known and name in known:
+            profile = CalibrationProfile.from_dict(known[name])
+        else:
+            try:
+                profile = CalibrationProfile.fit(name, part)
+            except ValueError as e:
+                raise ValueError(f"{name}: {e} (or pass --profile {name}=NAME)") from e
+            print(f"🎛️ {name}: no --profile, calibration fitted from its own frames")
+        out[start:start + count] = profile.apply(part)
+        profiles[name] = profile.to_dict()
+        start += count
+    # Gloves without a profile of their own are read like the largest source
+    return out, {"profiles": profiles, "default": max(rows, key=rows.get)}
+
+
+def build_windowed(X, y, size):
+    """
+    Windowed feature rows for every contiguous run of one label (one
+    recording). The last 20% of each run is held out for testing, so
+    overlapping windows never leak between train and test.
+    """
+    bounds = np.concatenate(([0], np.flatnonzero(y[1:] != y[:-1]) + 1, [len(y)]))
+
+    parts = {"train": ([], []), "test": ([], [])}
+    for start, end in zip(bounds[:-1], bounds[1:]):
+        feats = window_features(X[start:end], size)
+        if not len(feats):
+            continue
+        cut = int(len(feats) * 0.8)
+        for name, block in (("train", feats[:cut]), ("test", feats[cut:])):
+            parts[name][0].append(block)
+            parts[name][1].append(np.full(len(block), y[start], dtype=y.dtype))
+
+    X_train, y_train = np.vstack(parts["train"][0]), np.concatenate(parts["train"][1])
+    X_test, y_test = np.vstack(parts["test"][0]), np.concatenate(parts["test"][1])
+    return X_train, X_test, y_train, y_test
+
+
+# ---------------- SWEEP (process pool) ---------------- #
+_sweep_data = None
+
+
+def _init_sweep_worker(data):
+    global _sweep_data
+    _sweep_data = data
+
+
+def _fit_sweep_point(params):
+    X_train, X_test, y_train, y_test = _sweep_data
+    start = time.perf_counter()
+    model = RandomForestClassifier(random_state=42, n_jobs=1, **params).fit(X_train, y_train)
+    fit_seconds = time.perf_counter() - start
+    return params, accuracy_score(y_test, model.predict(X_test)), fit_seconds
+
+
+def run_sweep(grid, base_params, split, jobs):
+    keys = list(grid)
+    points = [dict(base_params, **dict(zip(keys, values))) for values in itertools.product(*grid.values())]
+    workers = min(len(points), os.cpu_count() if jobs < 1 else jobs)
+    print(f"\n🔎 Sweeping {len(points)} configurations over {workers} processes...")
 
-print(f"📂 Data Path: {DATA_PATH}")
-print(f"📂 Model Path: {MODEL_PATH}")
-
-# 1. Load the data
-print("\nLoading training data...")
-# The CSV has a header: f1,f2,f3,f4,ax,ay,az,label
-try:
-    df = pd.read_csv(DATA_PATH) 
-    
-    # Verify columns
-    expected_cols = ['f1', 'f2', 'f3', 'f4', 'ax', 'ay', 'az', 'label']
-    if list(df.columns) != expected_cols:
-        print(f"⚠️ Warning: Columns might be different. Expected {expected_cols}, got {list(df.columns)}")
-        # If columns match but names are missing, you might need header=None and names=cols
-        # But this file HAS a header.
-
-    # Remove duplicates and NaNs
-    df = df.dropna()
-    # df = df.drop_duplicates() # Optional: sometimes duplicates are okay in sensor data
-
-    print(f"✅ Data loaded: {len(df)} samples")
-    print(f"Classes: {df['label'].unique()}")
-
-    # 2. Split Features (X) and Labels (y)
-    X = df.drop('label', axis=1)
-    y = df['label']
-
-    # 3. Split into Training and Testing sets (80% train, 20% test)
-    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
-
-    # 4. Initialize and Train the Random Forest
-    print("\nTraining the model (this may take a few seconds)...")
-    model = RandomForestClassifier(n_estimators=100, max_depth=15, random_state=42)
-    model.fit(X_train, y_train)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_sweep_worker, initargs=(split,)) as pool:
+        results = list(pool.map(_fit_sweep_point, points))
+
+    results.sort(key=lambda r: (-r[1], r[2]))
+    for params, acc, seconds in results:
+        print(f"   {acc * 100:6.2f}%  {seconds:6.2f}s  {params}")
+    return results[0][0]
+
+
+# ---------------- INCREMENTAL UPDATE ---------------- #
+def holdout_metadata(indices, rows):
+    """Held-out row indices as {source: [row within source]} (survives appends and reordering)."""
+    indices = np.sort(np.asarray(indices, dtype=np.int64))
+    out, start = {}, 0
+    for name, count in rows.items():
+        part = indices[(indices >= start) & (indices < start + count)] - start
+        out[name] = part.tolist()
+        start += count
+    return out
+
+
+def holdout_rows(holdout, rows):
+    """Global indices into the current data of a stored held-out split."""
+    parts, start = [], 0
+    for name, count in rows.items():
+        part = np.asarray(holdout.get(name, ()), dtype=np.int64)
+        parts.append(part[part < count] + start)
+        start += count
+    return np.concatenate(parts) if parts else np.empty(0, dtype=np.int64)
+
+
+
+def train_incremental(args, X, y, rows, timings):
+    """
+    Adds a small forest to the current store model instead of refitting it.
+
+    The new trees are fitted on the rows appended since the current model was
+    trained plus `--replay` old rows per class, so the cost follows the new
+    data rather than the corpus, and they still know every word. They are
+    merged with the current trees (`--update-share` of the vote) and
+    published as a new version, which the backend picks up live.
+    """
+    store = ModelStore(STORE_PATH)
+    base, manifest = store.load(mmap=False)
+    trained = manifest["metadata"].get("rows")
+    if manifest["metadata"].get("window") or manifest["columns"] != list(FEATURE_COLUMNS):
+        raise RuntimeError(f"Model {manifest['version']} is windowed; retrain it in full")
+    if trained is None:
+        raise RuntimeError(f"Model {manifest['version']} does not record its training rows; "
+                           "run a full training first")
+    calibration = manifest["metadata"].get("calibration")
+    if bool(calibration) != args.calibrate:
+        raise RuntimeError(f"Model {manifest['version']} was trained {'with' if calibration else 'without'} "
+                           "--calibrate; updates must match")
+    if calibration:
+        with timings.phase("calibrate"):
+            X, calibration = calibrate_sources(X, rows, args.profiles, calibration["profiles"])
+
+    # Rows of each source the current model has (not) seen
+    old_idx, new_idx = [], []
+    start = 0
+    for name, count in rows.items():
+        seen = min(trained.get(name, 0), count)
+        old_idx.append(np.arange(start, start + seen))
+        new_idx.append(np.arange(start + seen, start + count))
+        start += count
+    old_idx, new_idx = np.concatenate(old_idx), np.concatenate(new_idx)
+
+    # The base model's held-out rows: evaluated on, never replayed
+    holdout = manifest["metadata"].get("holdout")
+    old_test = holdout_rows(holdout, rows) if holdout is not None else None
+    if old_test is not None:
+        old_idx = np.setdiff1d(old_idx, old_test, assume_unique=True)
+
+    if not len(new_idx):
+        print(f"✅ {manifest['version']} is up to date (no new rows)")
+        return
+    print(f"\n➕ Updating {manifest['version']} with {len(new_idx)} new rows")
+
+    with timings.phase("replay sample"):
+        # Per class: `replay` rows to train on (plus, for a base model
+        # without a stored held-out split, a quarter as many to test on)
+        rng = np.random.default_rng(42)
+        y_old = y[old_idx]
+        extra = args.replay // 4 if old_test is None else 0
+        replay_train, replay_test = [], []
+        for label in np.unique(y_old):
+            members = old_idx[y_old == label]
+            picked = rng.choice(members, min(len(members), args.replay + extra), replace=False)
+            replay_train.append(picked[:args.replay])
+            replay_test.append(picked[args.replay:])
+        replay_train = np.concatenate(replay_train) if replay_train else np.empty(0, dtype=int)
+        replay_test = np.concatenate(replay_test) if replay_test else np.empty(0, dtype=int)
+        if old_test is not None:
+            replay_test = old_test
+
+        if len(new_idx) >= 5:
+            new_train, new_test = train_test_split(new_idx, test_size=0.2, random_state=42)
+        else:
+            new_train, new_test = new_idx, new_idx[:0]
+        train_idx = np.sort(np.concatenate([new_train, replay_train]))
+        X_train, y_train = np.asarray(X[train_idx]), y[train_idx]
+
+    params = {"n_estimators": args.trees or INCREMENTAL_TREES, "max_depth": args.depth}
+    print(f"Training {params['n_estimators']} trees on {len(y_train)} rows "
+          f"({len(new_train)} new + {len(replay_train)} replayed)...")
+    with timings.phase("fit"):
+        model = RandomForestClassifier(random_state=42, n_jobs=args.jobs, **params)
+        model.fit(pd.DataFrame(X_train, columns=FEATURE_COLUMNS), y_train)
+
+    with timings.phase("compile + merge"):
+        update = compile_forest(model)
+        if (update.predict(X_train) != model.predict(pd.DataFrame(X_train, columns=FEATURE_COLUMNS))).any():
+            raise RuntimeError("Compiled forest disagrees with the sklearn model")
+        merged = merge_forests(base, update, args.update_share)
+
+    with timings.phase("evaluate"):
+        # Without a stored split the old rows were seen by the base model, so
+        # their figure is training accuracy and overstates what was kept
+        old_name, old_note = ("old rows", "held out") if old_test is not None else ("old rows", "training accuracy")
+        results = {}
+        for name, note, idx in (("new rows", "held out", new_test), (old_name, old_note, replay_test)):
+            if len(idx):
+                results[name] = (merged.predict(np.asarray(X[idx])) == y[idx]).mean()
+                print(f"   {name:<10}{results[name] * 100:6.2f}%  ({len(idx)} rows, {note})")
+        test_idx = np.concatenate([new_test, replay_test]) if old_test is not None else new_test
+        acc = float((merged.predict(np.asarray(X[test_idx])) == y[test_idx]).mean()) if len(test_idx) else None
+
+    with timings.phase("publish"):
+        metadata = dict(manifest["metadata"])
+        metadata.update({
+            "source": ", ".join(rows), "samples": int(len(y)), "rows": rows, "accuracy": acc,
+            "bigrams": label_bigrams(y, rows), "calibration": calibration,
+            "holdout": holdout_metadata(np.concatenate([old_test, new_test]), rows) if old_test is not None else None,
+            "incremental": {"base": manifest["version"], "new_rows": int(len(new_idx)),
+                            "replay_rows": int(len(replay_train)), "params": params,
+                            "share": args.update_share},
+        })
+        version = store.publish(merged, columns=manifest["columns"], metadata=metadata)
+    new_words = sorted(set(merged.classes) - set(base.classes))
+    print(f"✅ Updated forest published as {version} ({merged.n_trees} trees"
+          f"{', new words: ' + ', '.join(new_words) if new_words else ''})")
+    print("The running backend loads it within a few seconds.")
+    timings.report()
+
+
+def publish_pickle(path, store_path=STORE_PATH):
+    """Publishes a legacy sklearn pickle; the backend only ever reads it in memory."""
+    model = joblib.load(path)
+    columns = list(getattr(model, "feature_names_in_", FEATURE_COLUMNS))
+    compiled = compile_forest(model)
+    version = ModelStore(store_path).publish(compiled, columns=columns,
+                                             metadata={"source": os.path.basename(path)})
+    print(f"✅ {path} published as {version} ({compiled.n_trees} trees, depth {compiled.depth})")
+    return version
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.publish_pickle:
+        return publish_pickle(args.pickle)
+    paths = (args.data or []) + args.recording or [DATA_PATH]
+    params = {"n_estimators": args.trees or DEFAULT_PARAMS["n_estimators"], "max_depth": args.depth}
+    timings = Timings()
+
+    print(f"📂 Data: {', '.join(paths)}")
+    print(f"📂 Model Path: {args.pickle}")
+    print(f"📂 Model Store: {STORE_PATH}")
+
+    # 1. Load the data (parsed once per file version, then memory-mapped)
+    print("\nLoading training data...")
+    with timings.phase("load"):
+        X, y, rows = load_data(paths, None if args.no_cache else DatasetCache(CACHE_PATH))
+
+    print(f"✅ Data loaded: {len(y)} samples")
+    if args.incremental:
+        return train_incremental(args, X, y, rows, timings)
+
+    calibration = None
+    if args.calibrate:
+        with timings.phase("calibrate"):
+            X, calibration = calibrate_sources(X, rows, args.profiles)
+    print(f"Classes: {np.unique(y)}")
+
+    # 2. Split into Training and Testing sets (80% train, 20% test)
+    with timings.phase("features + split"):
+        if args.window:
+            print(f"🪟 Windowed mode: {args.window}-frame windows, stability {args.stability}")
+            X_train, X_test, y_train, y_test = build_windowed(X, y, args.window)
+            columns = window_columns(FEATURE_COLUMNS)
+            # Frames held before a word can fire: window fill + stability run
+            print(f"Frames held per word: {args.window + args.stability - 1} (per-frame model: 5)")
+        else:
+            train_idx, test_idx = train_test_split(np.arange(len(y)), test_size=0.2, random_state=42)
+            X_train, X_test, y_train, y_test = np.asarray(X[train_idx]), np.asarray(X[test_idx]), y[train_idx], y[test_idx]
+            columns = list(FEATURE_COLUMNS)
+
+    # 3. Optional hyperparameter sweep (one process per configuration)
+    if args.sweep:
+        grid = {}
+        for spec in args.sweep:
+            key, _, values = spec.partition("=")
+            grid[key.strip()] = [_sweep_value(v.strip()) for v in values.split(",")]
+        with timings.phase("sweep"):
+            params = run_sweep(grid, params, (X_train, X_test, y_train, y_test), args.jobs)
+        print(f"🏆 Best: {params}")
+
+    # 4. Train the Random Forest (trees fitted in parallel)
+    print(f"\nTraining the model on {len(y_train)} rows {params}...")
+    with timings.phase("fit"):
+        model = RandomForestClassifier(random_state=42, n_jobs=args.jobs, **params)
+        model.fit(pd.DataFrame(X_train, columns=columns), y_train)
 
     # 5. Evaluate Accuracy
-    predictions = model.predict(X_test)
-    acc = accuracy_score(y_test, predictions)
-    
+    with timings.phase("evaluate"):
+        predictions = model.predict(pd.DataFrame(X_test, columns=columns))
+        acc = accuracy_score(y_test, predictions)
+
     print("\n" + "="*30)
     print(f"TRAINING SUCCESSFUL!")
     print(f"Model Accuracy: {acc * 100:.2f}%")
     print("="*30)
 
-    # 6. Save the model to a file
-    os.makedirs(os.path.dirname(MODEL_PATH), exist_ok=True)
-    joblib.dump(model, MODEL_PATH)
-    print(f"\n✅ Model saved to: {MODEL_PATH}")
-    print("Restart your backend to load the new model.")
+    # 6. Save the model to a file (the legacy pickle is per-frame, raw features only)
+    if not args.window and not calibration:
+        os.makedirs(os.path.dirname(os.path.abspath(args.pickle)), exist_ok=True)
+        joblib.dump(model, args.pickle)
+        print(f"\n✅ Model saved to: {args.pickle}")
+
+    # 7. Export the flat array-backed predictor used by the backend
+    with timings.phase("compile + publish"):
+        compiled = compile_forest(model)
+        if (compiled.predict(X_test) != predictions).any():
+            raise RuntimeError("Compiled forest disagrees with the sklearn model")
+
+        if not args.no_publish:
+            # Sign order of the recordings feeds the decoder's language model
+            metadata = {"source": ", ".join(rows), "samples": int(len(y)), "rows": rows,
+                        "accuracy": acc, "params": params, "bigrams": label_bigrams(y, rows)}
+            if calibration:
+                metadata["calibration"] = calibration
+            if args.window:
+                metadata.update({"window": args.window, "required_stability": args.stability})
+            else:
+                # Incremental updates measure forgetting on these, never train on them
+                metadata["holdout"] = holdout_metadata(test_idx, rows)
+            version = ModelStore(STORE_PATH).publish(compiled, columns=columns, metadata=metadata)
+            print(f"✅ Compiled forest published as {version} ({compiled.n_trees} trees, depth {compiled.depth})")
+            print("A running backend loads it within a few seconds (it watches the model store).")
+
+    timings.report()
+
 
-except FileNotFoundError:
-    print(f"❌ ERROR: File not found at {DATA_PATH}")
-except Exception as e:
-    print(f"❌ An error occurred: {e}")
+if __name__ == "__main__":
+    try:
+        main()
+    except FileNotFoundError as e:
+        print(f"❌ ERROR: File not found: {e.filename}")
+    except Exception as e:
+        print(f"❌ An error occurred: {e}")
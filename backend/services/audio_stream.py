@@ -0,0 +1,205 @@
+import io
+import logging
+import queue
+import threading
+import time
+
+import pygame
+
+logger = logging.getLogger(__name__)
+
+# =========================================================
+# MP3 FRAME HEADERS (Layer III, what Edge TTS streams)
+# =========================================================
+#   11 bits sync | version (2) | layer (2) | crc (1)
+#   bitrate index (4) | sample rate index (2) | padding (1) | ...
+BITRATES_KBPS = {
+    3: (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),   # MPEG-1
+    2: (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),       # MPEG-2
+    0: (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),       # MPEG-2.5
+}
+SAMPLE_RATES = {3: (44100, 48000, 32000), 2: (22050, 24000, 16000), 0: (11025, 12000, 8000)}
+
+
+def mp3_frame(data, offset):
+    """(length, samples, sample_rate) of the Layer III frame at `offset`, or None."""
+    if offset + 4 > len(data) or data[offset] != 0xFF or data[offset + 1] & 0xE0 != 0xE0:
+        return None
+    b1, b2 = data[offset + 1], data[offset + 2]
+    version, layer = (b1 >> 3) & 3, (b1 >> 1) & 3
+    bitrate_index, rate_index, padding = b2 >> 4, (b2 >> 2) & 3, (b2 >> 1) & 1
+    if version == 1 or layer != 1 or bitrate_index in (0, 15) or rate_index == 3:
+        return None
+
+    bitrate = BITRATES_KBPS[version][bitrate_index] * 1000
+    sample_rate = SAMPLE_RATES[version][rate_index]
+    if version == 3:
+        return 144 * bitrate // sample_rate + padding, 1152, sample_rate
+    return 72 * bitrate // sample_rate + padding, 576, sample_rate
+
+
+class Mp3Segment:
+    __slots__ = ("data", "skip_samples", "samples", "sample_rate")
+
+    def __init__(self, data, skip_samples, samples, sample_rate):
+        self.data = data
+        self.skip_samples = skip_samples  # Priming audio to drop after decoding
+        self.samples = samples
+        self.sample_rate = sample_rate
+
+
+class Mp3Segmenter:
+    """
+    Cuts a growing MP3 byte stream into independently decodable segments at
+    frame boundaries: a short first one (fast start), longer ones after.
+
+    Layer III frames may borrow bits from the frames before them, so each
+    segment is prefixed with the last `prime_frames` frames of the previous
+    one; their audio is reported in `skip_samples` and trimmed by the player.
+    """
+
+    def __init__(self, first_seconds=0.3, segment_seconds=1.0, prime_frames=1):
+        self.first_seconds = first_seconds
+        self.segment_seconds = segment_seconds
+        self.prime_frames = prime_frames
+
+        self.buffer = bytearray()
+        self.frames = []     # (start, end, samples) of complete, unsent frames
+        self.scanned = 0     # Parse position in buffer
+        self.primer = []     # Raw bytes + samples of the last sent frames
+        self.sent = 0
+        self._rate = 0
+
+    def feed(self, data):
+        """Returns the segments completed by `data` (possibly none)."""
+        self.buffer += data
+        self._scan()
+        segments = []
+        while self.frames:
+            target = self.first_seconds if not self.sent else self.segment_seconds
+            rate = self._rate
+            total = 0
+            for i, (_, _, samples) in enumerate(self.frames):
+                total += samples
+                if total >= target * rate:
+                    segments.append(self._cut(i + 1))
+                    break
+            else:
+                break
+        return segments
+
+    def flush(self):
+        """The remaining complete frames as a last segment (or nothing)."""
+        self._scan()
+        return [self._cut(len(self.frames))] if self.frames else []
+
+    def _scan(self):
+        data = self.buffer
+        pos = self.scanned
+        while pos + 4 <= len(data):
+            frame = mp3_frame(data, pos)
+            if frame is None:
+                pos += 1  # Resync (tags, garbage)
+                continue
+            length, samples, rate = frame
+            if pos + length > len(data):
+                break  # Incomplete frame; wait for more bytes
+            self.frames.append((pos, pos + length, samples))
+            self._rate = rate
+            pos += length
+        self.scanned = pos
+
+    def _cut(self, count):
+        frames, self.frames = self.frames[:count], self.frames[count:]
+        body = [bytes(self.buffer[start:end]) for start, end, _ in frames]
+        samples = [s for _, _, s in frames]
+
+        primer_bytes = b"".join(b for b, _ in self.primer)
+        skip = sum(s for _, s in self.primer)
+        segment = Mp3Segment(primer_bytes + b"".join(body), skip, sum(samples), self._rate)
+
+        self.primer = list(zip(body, samples))[-self.prime_frames:] if self.prime_frames else []
+        self.sent += 1
+
+        # Drop consumed bytes so the buffer only holds unsent frames
+        consumed = frames[-1][1]
+        del self.buffer[:consumed]
+        self.frames = [(s - consumed, e - consumed, n) for s, e, n in self.frames]
+        self.scanned -= consumed
+        return segment
+
+
+class StreamPlayer:
+    """
+    Plays an MP3 stream while it is still arriving.
+
+    `feed()` hands over raw chunks (e.g. from edge_tts `stream()`); a player
+    thread segments them, decodes each segment with pygame and queues it on
+    one mixer channel, so playback starts after the first ~0.3s of audio
+    instead of after the whole synthesis. `finish()` waits for the end.
+    """
+
+    def __init__(self, on_start=None, **segmenter_args):
+        self.segmenter = Mp3Segmenter(**segmenter_args)
+        self.on_start = on_start
+        self.chunks = queue.Queue()
+        self.channel = None
+        self.stopped = False
+        self.thread = threading.Thread(target=self._run, name="tts-stream", daemon=True)
+        self.thread.start()
+
+    def feed(self, chunk):
+        self.chunks.put(chunk)
+
+    def finish(self):
+        self.chunks.put(None)
+        self.thread.join()
+
+    def stop(self):
+        self.stopped = True
+        if self.channel:
+            self.channel.stop()
+
+    def _run(self):
+        try:
+            while True:
+                chunk = self.chunks.get()
+                last = chunk is None
+                for segment in self.segmenter.flush() if last else self.segmenter.feed(chunk):
+                    if self.stopped:
+                        return
+                    self._play(self._decode(segment))
+                if last:
+                    break
+            while self.channel and self.channel.get_busy() and not self.stopped:
+                time.sleep(0.01)
+        except Exception as e:
+            # finish() only joins this thread, so bailing out cannot hang it
+            logger.error(f"❌ Streaming playback error: {e}")
+
+    @staticmethod
+    def _decode(segment):
+        sound = pygame.mixer.Sound(file=io.BytesIO(segment.data))
+        if not segment.skip_samples:
+            return sound
+        # Drop the priming frames' audio (converted to the mixer's format)
+        freq, size, channels = pygame.mixer.get_init()
+        frame_bytes = abs(size) // 8 * channels
+        skip = round(segment.skip_samples * freq / segment.sample_rate) * frame_bytes
+        return pygame.mixer.Sound(buffer=sound.get_raw()[skip:])
+
+    def _play(self, sound):
+        if self.channel is None:
+            self.channel = sound.play()
+            if self.channel is None:
+                raise RuntimeError("No free mixer channel")
+            if self.on_start:
+                self.on_start()
+            return
+        # A channel holds one queued sound: wait for the slot to free up
+        while self.channel.get_queue() is not None and not self.stopped:
+            time.sleep(0.005)
+        if not self.channel.get_busy():
+            self.channel.play(sound)
+        else:
+            self.channel.queue(sound)
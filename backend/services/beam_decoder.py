@@ -0,0 +1,213 @@
+import numpy as np
+
+# Row of the bigram table for "nothing signed yet"
+START = "<s>"
+
+
+def label_bigrams(labels, rows=None):
+    """
+    {prev: {next: count}} over the runs of identical labels in a recording
+    (one run = one sign). `rows` ({source: row count}, in order) keeps the
+    end of one source from being counted as followed by the next one.
+    """
+    labels = np.asarray(labels)
+    counts = {}
+    bounds = np.concatenate(([0], np.cumsum(list(rows.values()) if rows else [len(labels)])))
+    for start, end in zip(bounds[:-1], bounds[1:]):
+        part = labels[start:end]
+        if not len(part):
+            continue
+        runs = part[np.concatenate(([True], part[1:] != part[:-1]))]
+        prev = START
+        for label in runs:
+            label = str(label)
+            nexts = counts.setdefault(prev, {})
+            nexts[label] = nexts.get(label, 0) + 1
+            prev = label
+    return counts
+
+
+def template_bigrams(patterns, classes):
+    """
+    Bigrams implied by sentence templates ("i am *"): consecutive literal
+    words of a pattern that are both gesture classes (TEAM_FSOCIETY matches
+    "team_fsociety"); "*" and "<tag>" break the chain.
+    """
+    by_word = {str(c).lower(): str(c) for c in classes}
+    counts = {}
+    for pattern in patterns:
+        prev = None
+        for token in pattern.lower().split():
+            label = by_word.get(token)
+            if label is not None and prev is not None:
+                nexts = counts.setdefault(prev, {})
+                nexts[label] = nexts.get(label, 0) + 1
+            prev = label
+    return counts
+
+
+def merge_bigrams(*tables):
+    merged = {}
+    for table in tables:
+        for prev, nexts in (table or {}).items():
+            row = merged.setdefault(prev, {})
+            for label, n in nexts.items():
+                row[label] = row.get(label, 0) + n
+    return merged
+
+
+class BigramLM:
+    """
+    Add-alpha smoothed word bigrams over the model's classes.
+
+    `logp[v, w]` is log P(w | v); the extra last row is P(w | sentence
+    start). A word never follows itself within a hold (a held sign is one
+    word), so the diagonal is excluded; `repeat[w]` is the smoothed
+    probability of signing w again after a segmented pause, used only at
+    a word boundary (BeamDecoder.boundary).
+    """
+
+    def __init__(self, classes, counts=None, alpha=0.5):
+        self.classes = [str(c) for c in classes]
+        index = {c: i for i, c in enumerate(self.classes)}
+        n = len(self.classes)
+
+        table = np.zeros((n + 1, n))
+        for prev, nexts in (counts or {}).items():
+            row = n if prev == START else index.get(prev)
+            if row is None:
+                continue
+            for label, count in nexts.items():
+                col = index.get(label)
+                if col is not None:
+                    table[row, col] += count
+
+        table += alpha
+        table[np.arange(n), np.arange(n)] = 0.0
+        totals = table.sum(axis=1, keepdims=True)
+        with np.errstate(divide="ignore"):
+            # A one-class model has nothing to follow a word with: -inf, not 0/0
+            self.logp = np.log(np.divide(table, totals, out=np.zeros_like(table), where=totals > 0))
+            self.repeat = np.log(alpha / (totals[:n, 0] + alpha))
+
+
+class BeamDecoder:
+    """
+    Streaming Viterbi beam search from per-frame class probabilities to
+    words, for one glove session.
+
+    Each state is "currently signing word c" with the best word history
+    that ends there. Every frame a state either continues its word or a new
+    word starts, which costs `insertion_penalty` and is weighted by the
+    bigram LM; only the best `beam_width` states within `beam_margin` of
+    the best survive. So a lone misclassified frame does not become a word,
+    while a clear new sign wins after a frame or two instead of a fixed run
+    of identical predictions.
+
+    A word is committed (emitted) once every state within `commit_margin`
+    of the best agrees on it; hypothesis() is the best partial sentence and
+    finish() commits the rest and starts a new sentence.
+    """
+
+    def __init__(self, lm, beam_width=4, lm_weight=1.0, insertion_penalty=3.0,
+                 beam_margin=12.0, commit_margin=3.0):
+        self.lm = lm
+        self.beam_width = beam_width
+        self.beam_margin = beam_margin
+        self.commit_margin = commit_margin
+
+        n = len(lm.classes)
+        self.n = n
+        self.cols = np.arange(n)
+        # Score of entering word c from state v (last row: sentence start),
+        # and of entering c again from c at a word boundary
+        self.enter = lm_weight * lm.logp - insertion_penalty
+        self.enter_again = lm_weight * lm.repeat - insertion_penalty
+        self.reset()
+
+    def reset(self):
+        self.scores = np.full(self.n, -np.inf)
+        self.start = 0.0  # Nothing signed yet
+        self.histories = [()] * self.n
+        self.committed = 0
+        self.frames = 0
+        self.at_boundary = False
+
+    def boundary(self):
+        """
+        The current sign has ended (the segmenter saw motion): the next
+        frame starts a new word, which may be the same class again.
+        """
+        if self.frames:
+            self.at_boundary = True
+
+    def step(self, proba):
+        """Consumes one frame's class probabilities; returns the words it committed."""
+        logp = np.log(np.maximum(np.asarray(proba, dtype=np.float64), 1e-6))
+        scores = self.scores
+
+        # Best way into each word: from another word's state or from the start
+        enter = scores[:, None] + self.enter[:-1]
+        at_boundary = self.at_boundary
+        if at_boundary:
+            enter[self.cols, self.cols] = scores + self.enter_again
+            self.at_boundary = False
+        prev = np.argmax(enter, axis=0)
+        entered = enter[prev, self.cols]
+        from_start = self.start + self.enter[-1]
+        use_start = from_start > entered
+        entered = np.where(use_start, from_start, entered)
+
+        # At a boundary no word continues: every state enters a new one
+        switch = np.ones(self.n, dtype=bool) if at_boundary else entered > scores
+        scores = np.where(switch, entered, scores) + logp
+        histories = self.histories
+        self.histories = [
+            ((() if use_start[c] else histories[prev[c]]) + (c,)) if switch[c] else histories[c]
+            for c in range(self.n)
+        ]
+        self.start = -np.inf
+        self.frames += 1
+
+        # Prune to the beam (scores are kept relative to the best)
+        scores -= scores.max()
+        keep = scores >= -self.beam_margin
+        if keep.sum() > self.beam_width:
+            keep &= scores >= np.partition(scores, -self.beam_width)[-self.beam_width]
+        scores[~keep] = -np.inf
+        self.scores = scores
+
+        return self._commit()
+
+    def _commit(self):
+        alive = [self.histories[c] for c in np.flatnonzero(self.scores >= -self.commit_margin)]
+        common = min(len(h) for h in alive)
+        for i in range(self.committed, common):
+            if any(h[i] != alive[0][i] for h in alive):
+                common = i
+                break
+        if common <= self.committed:
+            return []
+
+        # Committed words are final: drop states that disagree with them
+        prefix = alive[0][:common]
+        for c in np.flatnonzero(np.isfinite(self.scores)):
+            if self.histories[c][:common] != prefix:
+                self.scores[c] = -np.inf
+
+        words = [self.lm.classes[c] for c in prefix[self.committed:]]
+        self.committed = common
+        return words
+
+    def hypothesis(self):
+        """Best word sequence so far (committed words included)."""
+        if not self.frames:
+            return []
+        return [self.lm.classes[c] for c in self.histories[int(np.argmax(self.scores))]]
+
+    def finish(self):
+        """(words not committed yet, whole sentence) of the best hypothesis; then reset()."""
+        words = self.hypothesis()
+        rest = words[self.committed:]
+        self.reset()
+        return rest, words
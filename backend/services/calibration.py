@@ -0,0 +1,231 @@
+import json
+import logging
+import os
+import re
+import threading
+import time
+import uuid
+
+import numpy as np
+
+from services.dataset_cache import FEATURE_COLUMNS
+
+logger = logging.getLogger(__name__)
+
+N_FLEX = 4
+# Robust range of a capture: ignore the most extreme 2% at either end
+LOW_PERCENTILE, HIGH_PERCENTILE = 2.0, 98.0
+
+
+class CalibrationProfile:
+    """
+    One wearer's sensor ranges, as a per-column affine map onto a common
+    scale:
+
+        flex  (f - flex_min) / (flex_max - flex_min), clipped to 0..1
+        acc   (a - acc_zero) / acc_scale              (in g)
+
+    so a glove sending ADC counts, 0..1 floats or m/s^2 ends up with the
+    same features. apply() takes one frame or a whole (n, 7) batch.
+    """
+
+    def __init__(self, name, flex_min, flex_max, acc_zero, acc_scale, created=None):
+        self.name = name
+        self.flex_min = [float(v) for v in flex_min]
+        self.flex_max = [float(v) for v in flex_max]
+        self.acc_zero = [float(v) for v in acc_zero]
+        self.acc_scale = [float(v) for v in acc_scale]
+        self.created = created if created is not None else time.time()
+
+        span = np.subtract(self.flex_max, self.flex_min)
+        if len(span) != N_FLEX or len(self.acc_zero) != 3 or len(self.acc_scale) != 3:
+            raise ValueError(f"Profile {name!r} needs {N_FLEX} flex and 3 accelerometer channels")
+        if (span <= 0).any() or min(self.acc_scale) <= 0:
+            raise ValueError(f"Profile {name!r} has an empty sensor range")
+
+        self.offset = np.array(self.flex_min + self.acc_zero, dtype=np.float32)
+        self.scale = np.concatenate((1.0 / span, 1.0 / np.asarray(self.acc_scale))).astype(np.float32)
+
+    def apply(self, X):
+        """Normalised float32 copy of X (shape (7,) or (n, 7))."""
+        out = np.subtract(X, self.offset, dtype=np.float32)
+        out *= self.scale
+        np.clip(out[..., :N_FLEX], 0.0, 1.0, out=out[..., :N_FLEX])
+        return out
+
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "flex_min": self.flex_min,
+            "flex_max": self.flex_max,
+            "acc_zero": self.acc_zero,
+            "acc_scale": self.acc_scale,
+            "created": self.created,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["name"], data["flex_min"], data["flex_max"],
+                   data["acc_zero"], data["acc_scale"], data.get("created"))
+
+    @classmethod
+    def fit(cls, name, X, min_flex_span=None):
+        """
+        Profile from raw frames (n, 7) of the wearer opening and closing the
+        hand and turning it through a few orientations.
+
+        Flex: the robust min/max of each sensor. Accelerometer: an axis that
+        saw gravity both ways gets the classic min/max calibration (zero-g
+        at the midpoint, half the span = 1 g); an axis that did not is only
+        rescaled by the measured gravity, which still maps m/s^2 and g onto
+        the same scale.
+        """
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim != 2 or X.shape[1] != len(FEATURE_COLUMNS) or len(X) < 2:
+            raise ValueError(f"Calibration needs frames of {len(FEATURE_COLUMNS)} values")
+
+        low, high = np.percentile(X, [LOW_PERCENTILE, HIGH_PERCENTILE], axis=0)
+        flex_min, flex_max = low[:N_FLEX], high[:N_FLEX]
+        span = flex_max - flex_min
+        if min_flex_span is None:
+            min_flex_span = 1e-3 * max(float(np.abs(X[:, :N_FLEX]).max()), 1.0)
+        still = [FEATURE_COLUMNS[i] for i in np.flatnonzero(span < min_flex_span)]
+        if still:
+            raise ValueError(f"Flex sensors {', '.join(still)} did not move; open and close the hand")
+
+        gravity = float(np.median(np.linalg.norm(X[:, N_FLEX:], axis=1)))
+        if gravity <= 0:
+            raise ValueError("Accelerometer reads zero; is it connected?")
+        acc_low, acc_high = low[N_FLEX:], high[N_FLEX:]
+        # Seen pointing up and down: |min| and |max| both near 1 g
+        turned = (acc_high > 0.5 * gravity) & (acc_low < -0.5 * gravity)
+        acc_zero = np.where(turned, (acc_high + acc_low) / 2, 0.0)
+        acc_scale = np.where(turned, (acc_high - acc_low) / 2, gravity)
+        return cls(name, flex_min, flex_max, acc_zero, acc_scale)
+
+
+class CalibrationCapture:
+    """
+    Frames of one glove collected for a profile (the capture routine): the
+    wearer opens and closes the hand a few times, then turns it palm up,
+    palm down and on its side. Frames go into a preallocated array; past
+    `max_frames` the oldest are overwritten.
+    """
+
+    def __init__(self, name, max_frames=3000):
+        self.name = name
+        self.frames = np.empty((max_frames, len(FEATURE_COLUMNS)), dtype=np.float32)
+        self.count = 0
+        self.started = time.time()
+
+    def add(self, flex_vals, acc_vals):
+        if len(flex_vals) != N_FLEX or len(acc_vals) != 3:
+            return
+        row = self.frames[self.count % len(self.frames)]
+        row[:N_FLEX] = flex_vals
+        row[N_FLEX:] = acc_vals
+        self.count += 1
+
+    def finish(self):
+        return CalibrationProfile.fit(self.name, self.frames[:min(self.count, len(self.frames))])
+
+    def stats(self):
+        return {"name": self.name, "frames": self.count, "seconds": round(time.time() - self.started, 1)}
+
+
+class ProfileStore:
+    """
+    Profiles as <root>/<name>.json plus devices.json (glove session key ->
+    profile name), each written atomically. `version` changes on every
+    save or assignment, so MLService re-resolves its sessions' profiles
+    without a restart.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self.lock = threading.Lock()
+        self.version = 0
+        self._profiles = {}
+        self._devices = None
+
+    @staticmethod
+    def _safe(name):
+        safe = re.sub(r"[^A-Za-z0-9_.-]", "_", str(name or "")).strip("._")
+        if not safe:
+            raise ValueError(f"Invalid profile name: {name!r}")
+        return safe
+
+    def _write_json(self, filename, data):
+        os.makedirs(self.root, exist_ok=True)
+        tmp_path = os.path.join(self.root, f".{filename}.{uuid.uuid4().hex}")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, os.path.join(self.root, filename))
+
+    def names(self):
+        try:
+            files = os.listdir(self.root)
+        except OSError:
+            return []
+        return sorted(f[:-5] for f in files if f.endswith(".json") and f != "devices.json")
+
+    def save(self, profile):
+        name = self._safe(profile.name)
+        with self.lock:
+            self._write_json(f"{name}.json", profile.to_dict())
+            self._profiles[name] = profile
+            self.version += 1
+        logger.info(f"🎛️ Calibration profile saved: {name}")
+        return name
+
+    def load(self, name):
+        name = self._safe(name)
+        with self.lock:
+            profile = self._profiles.get(name)
+            if profile is None:
+                with open(os.path.join(self.root, f"{name}.json"), encoding="utf-8") as f:
+                    profile = self._profiles[name] = CalibrationProfile.from_dict(json.load(f))
+            return profile
+
+    def devices(self):
+        with self.lock:
+            if self._devices is None:
+                try:
+                    with open(os.path.join(self.root, "devices.json"), encoding="utf-8") as f:
+                        self._devices = json.load(f)
+                except (OSError, ValueError):
+                    self._devices = {}
+            return dict(self._devices)
+
+    def assign(self, device, name):
+        """Uses profile `name` for glove session `device` (None = unassign)."""
+        if name is not None:
+            self.load(name)  # Must exist
+            name = self._safe(name)
+        devices = self.devices()
+        if name is None:
+            devices.pop(device, None)
+        else:
+            devices[device] = name
+        with self.lock:
+            self._write_json("devices.json", devices)
+            self._devices = devices
+            self.version += 1
+
+    def for_device(self, device):
+        """The device's profile, or None when it has none (or it is unreadable)."""
+        name = self.devices().get(device)
+        if name is None:
+            return None
+        try:
+            return self.load(name)
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"⚠️ Calibration profile {name!r} for {device} unavailable: {e}")
+            return None
+
+
+# Global instance
+profile_store = ProfileStore(
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "calibration"))
@@ -0,0 +1,189 @@
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Names of the flat tables making up a compiled forest (one .npz entry each)
+ARRAY_NAMES = ("feature", "threshold", "left", "right", "value", "roots")
+# Tables only present on some forests (merged ones carry per-tree weights)
+OPTIONAL_ARRAY_NAMES = ("weight",)
+
+
+class CompiledForest:
+    """
+    A random forest flattened into contiguous NumPy tables.
+
+    All trees share one node table; `roots[t]` is the node index of tree t.
+    Leaves point to themselves and carry an infinite threshold, so every row
+    can be advanced `depth` times for all trees at once without branching.
+    `value[n]` holds the normalised class distribution of node n, exactly as
+    `DecisionTreeClassifier.predict_proba` would return it.
+
+    `weight[t]`, when present, is the vote weight of tree t (see
+    merge_forests); without it every tree votes equally, like sklearn.
+    """
+
+    def __init__(self, feature, threshold, left, right, value, roots, classes, depth, weight=None):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.value = value
+        self.roots = roots
+        self.classes = np.asarray(classes)
+        self.depth = int(depth)
+        self.weight = weight
+
+    @property
+    def n_trees(self):
+        return len(self.roots)
+
+    @property
+    def n_classes(self):
+        return len(self.classes)
+
+    # ---------------- INFERENCE ---------------- #
+    def apply(self, X):
+        """Leaf node index for every (row, tree) pair, shape (n_rows, n_trees)."""
+        # sklearn compares float32 inputs against float64 thresholds
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+
+        rows = np.arange(X.shape[0])[:, None]
+        nodes = np.broadcast_to(self.roots, (X.shape[0], self.n_trees))
+
+        for _ in range(self.depth):
+            go_left = X[rows, self.feature[nodes]] <= self.threshold[nodes]
+            nodes = np.where(go_left, self.left[nodes], self.right[nodes])
+
+        return nodes
+
+    def predict_proba(self, X):
+        leaves = self.apply(X)
+        if self.weight is not None:
+            total = np.einsum("rtc,t->rc", self.value[leaves], self.weight)
+            return total / self.weight.sum()
+        # Sequential accumulation over trees (cumsum) reproduces sklearn's
+        # running sum bit-for-bit, so argmax ties break the same way.
+        total = np.cumsum(self.value[leaves], axis=1)[:, -1]
+        return total / self.n_trees
+
+    def predict(self, X):
+        return self.classes.take(np.argmax(self.predict_proba(X), axis=1))
+
+    # ---------------- PERSISTENCE ---------------- #
+    def tables(self):
+        """Every table this forest carries, by name (optional ones if set)."""
+        names = ARRAY_NAMES + tuple(n for n in OPTIONAL_ARRAY_NAMES if getattr(self, n) is not None)
+        return {name: getattr(self, name) for name in names}
+
+    def save(self, path):
+        np.savez(
+            path,
+            classes=self.classes,
+            depth=np.array(self.depth),
+            **self.tables(),
+        )
+        logger.info(f"💾 Compiled forest saved to {path}")
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            names = ARRAY_NAMES + tuple(n for n in OPTIONAL_ARRAY_NAMES if n in data.files)
+            arrays = {name: data[name] for name in names}
+            return cls(classes=data["classes"], depth=int(data["depth"]), **arrays)
+
+
+def compile_forest(model):
+    """Flatten a fitted sklearn RandomForestClassifier into a CompiledForest."""
+    estimators = model.estimators_
+    n_classes = len(model.classes_)
+
+    features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+    depth = 0
+    offset = 0
+
+    for estimator in estimators:
+        tree = estimator.tree_
+        n_nodes = tree.node_count
+        node_ids = np.arange(n_nodes)
+        is_leaf = tree.children_left == -1
+
+        feature = np.where(is_leaf, 0, tree.feature)
+        threshold = np.where(is_leaf, np.inf, tree.threshold)
+        left = np.where(is_leaf, node_ids, tree.children_left) + offset
+        right = np.where(is_leaf, node_ids, tree.children_right) + offset
+
+        value = tree.value[:, 0, :n_classes].astype(np.float64)
+        normalizer = value.sum(axis=1, keepdims=True)
+        if not np.allclose(normalizer, 1.0):
+            # sklearn < 1.4 stores raw class counts and normalises at predict
+            # time; newer releases store (and return) the fractions as-is.
+            normalizer[normalizer == 0.0] = 1.0
+            value = value / normalizer
+
+        features.append(feature)
+        thresholds.append(threshold)
+        lefts.append(left)
+        rights.append(right)
+        values.append(value)
+        roots.append(offset)
+
+        depth = max(depth, tree.max_depth)
+        offset += n_nodes
+
+    return CompiledForest(
+        feature=np.concatenate(features).astype(np.int32),
+        threshold=np.concatenate(thresholds).astype(np.float64),
+        left=np.concatenate(lefts).astype(np.int32),
+        right=np.concatenate(rights).astype(np.int32),
+        value=np.ascontiguousarray(np.concatenate(values)),
+        roots=np.asarray(roots, dtype=np.int32),
+        # Labels are stored as a fixed-width string array so the tables can
+        # be saved and loaded without pickle
+        classes=np.asarray(model.classes_).astype(str),
+        depth=depth,
+    )
+
+
+def merge_forests(base, update, share):
+    """
+    One forest voting with the trees of both `base` and `update`.
+
+    `update` is typically a small forest fitted on newly appended rows (plus
+    a replay sample of the old ones, so it knows every class). Its trees get
+    `share` of the total vote and the base trees the rest, whatever the
+    number of trees in each. Classes are the sorted union, so a new
+    vocabulary word only has to be known by the update trees.
+    """
+    if not 0.0 < share < 1.0:
+        raise ValueError("share must be between 0 and 1")
+
+    classes = np.union1d(base.classes, update.classes)
+    offset = len(base.feature)
+
+    def widen(forest):
+        value = np.zeros((len(forest.value), len(classes)), dtype=np.float64)
+        value[:, np.searchsorted(classes, forest.classes)] = forest.value
+        return value
+
+    def weights(forest, total):
+        if forest.weight is None:
+            return np.full(forest.n_trees, total / forest.n_trees)
+        return forest.weight * (total / forest.weight.sum())
+
+    return CompiledForest(
+        feature=np.concatenate([base.feature, update.feature]).astype(np.int32),
+        threshold=np.concatenate([base.threshold, update.threshold]),
+        left=np.concatenate([base.left, update.left + offset]).astype(np.int32),
+        right=np.concatenate([base.right, update.right + offset]).astype(np.int32),
+        value=np.concatenate([widen(base), widen(update)]),
+        roots=np.concatenate([base.roots, update.roots + offset]).astype(np.int32),
+        classes=classes.astype(str),
+        depth=max(base.depth, update.depth),
+        # Normalised so the weights sum to the number of trees
+        weight=np.concatenate([weights(base, 1.0 - share), weights(update, share)]) *
+               (base.n_trees + update.n_trees),
+    )
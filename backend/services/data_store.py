@@ -1,35 +1,140 @@
 import threading
 import time
+from types import MappingProxyType
+
+
+class Snapshot:
+    """
+    One immutable published state of a DataStore.
+
+    `data` and `config` are read-only mappings; `key_versions` records the
+    version at which each key was last written, which is what makes
+    "changes since version N" a single pass over the keys.
+    """
+
+    __slots__ = ("version", "data", "config", "key_versions", "_merged")
+
+    def __init__(self, version, data, config, key_versions):
+        # Callers hand over ownership of the dicts; they are never mutated again
+        self.version = version
+        self.data = data if isinstance(data, MappingProxyType) else MappingProxyType(data)
+        self.config = config if isinstance(config, MappingProxyType) else MappingProxyType(config)
+        self.key_versions = MappingProxyType(key_versions)
+        self._merged = None
+
+    def merged(self):
+        """Sensor data with config merged in (built once, on first read)."""
+        merged = self._merged
+        if merged is None:
+            merged = dict(self.data)
+            merged.update(self.config)
+            merged["version"] = self.version
+            self._merged = merged
+        return merged
+
 
 class DataStore:
+    """
+    Latest sensor/prediction state, published as immutable Snapshots.
+
+    Writers build a new Snapshot and swap `self.current` in one reference
+    assignment (atomic under the GIL); they only serialise among themselves.
+    Readers just read `self.current` and never block writers or each other.
+    """
+
     def __init__(self):
-        self.lock = threading.Lock()
-        self.latest_data = {
+        self.write_lock = threading.Lock()
+        data = {
             "ax": 0.0, "ay": 0.0, "az": 0.0,
             "gx": 0.0, "gy": 0.0, "gz": 0.0,
             "flex": [0, 0, 0, 0, 0],
             "last_updated": 0
         }
-        self.config = {
+        config = {
             "use_gemini": True,
             "lang": "en",
-            "auto_speak": False 
+            "auto_speak": False
         }
+        self.current = Snapshot(0, data, config, dict.fromkeys(list(data) + list(config), 0))
+
+        # Change notification for push clients (see services/sensor_stream.py).
+        # Replaced, never mutated, so it can be iterated without a lock.
+        self.listeners = ()
+
+    @property
+    def version(self):
+        return self.current.version
+
+    @property
+    def config(self):
+        return self.current.config
+
+    def subscribe(self, listener):
+        """listener() is called after every update, on the updating thread."""
+        with self.write_lock:
+            self.listeners = self.listeners + (listener,)
+
+    def unsubscribe(self, listener):
+        with self.write_lock:
+            self.listeners = tuple(l for l in self.listeners if l != listener)
+
+    def _notify(self):
+        for listener in self.listeners:
+            listener()
+
+    # ---------------- WRITE ---------------- #
+    def _publish(self, new_data=None, new_config=None):
+        with self.write_lock:
+            cur = self.current
+            version = cur.version + 1
+            key_versions = dict(cur.key_versions)
+
+            data = cur.data
+            if new_data is not None:
+                data = dict(data)
+                data.update(new_data)
+                data["last_updated"] = time.time()
+                key_versions.update(dict.fromkeys(new_data, version))
+                key_versions["last_updated"] = version
+
+            config = cur.config
+            if new_config is not None:
+                config = dict(config)
+                config.update(new_config)
+                key_versions.update(dict.fromkeys(new_config, version))
+
+            # An unchanged half is shared with the previous snapshot
+            self.current = Snapshot(version, data, config, key_versions)
+        self._notify()
 
     def update(self, new_data):
-        with self.lock:
-            self.latest_data.update(new_data)
-            self.latest_data["last_updated"] = time.time()
+        self._publish(new_data=new_data)
+
+    def update_config(self, new_config):
+        self._publish(new_config=new_config)
+
+    # ---------------- READ (lock-free) ---------------- #
+    def snapshot(self):
+        return self.current
 
     def get(self):
-        with self.lock:
-            data = self.latest_data.copy()
-            data.update(self.config) # Merge config into response
-            return data
+        return dict(self.current.merged())
 
-    def update_config(self, new_config):
-        with self.lock:
-            self.config.update(new_config)
+    def get_config(self):
+        return dict(self.current.config)
+
+    def changes_since(self, version=None):
+        """
+        Returns (current_version, changed) where `changed` holds every key
+        (data or config) written after `version`; None means everything.
+        """
+        snap = self.current
+        merged = snap.merged()
+        if version is None:
+            return snap.version, dict(merged)
+
+        changed = {k: merged[k] for k, v in snap.key_versions.items() if v > version}
+        return snap.version, changed
 
 # Global Instance
 data_store = DataStore()
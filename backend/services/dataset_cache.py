@@ -0,0 +1,188 @@
+import hashlib
+import io
+import json
+import logging
+import os
+import re
+import shutil
+import uuid
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+FEATURE_COLUMNS = ['f1', 'f2', 'f3', 'f4', 'ax', 'ay', 'az']
+CACHE_FORMAT = 1
+
+
+def dataset_files(path):
+    """The files a dataset is read from (a CSV, or a recording's segments)."""
+    if os.path.isdir(path):
+        return [os.path.join(path, f) for f in sorted(os.listdir(path)) if f.endswith(".srec")]
+    return [path]
+
+
+def dataset_digest(path, size=None):
+    """
+    Content hash of a dataset; any edit or appended frame changes it.
+    `size` hashes only the first `size` bytes of a single-file dataset.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f"format={CACHE_FORMAT}".encode())
+    for file in dataset_files(path):
+        digest.update(os.path.basename(file).encode())
+        remaining = size if size is not None else float("inf")
+        with open(file, "rb") as f:
+            while remaining > 0:
+                block = f.read(int(min(1 << 20, remaining)))
+                if not block:
+                    break
+                digest.update(block)
+                remaining -= len(block)
+    return digest.hexdigest()
+
+
+# ---------------- PARSING ---------------- #
+def parse_csv(path, offset=0):
+    """
+    (X, y) from a training CSV in FEATURE_COLUMNS + label order. The header
+    row is optional (ML/ CSVs have none, backend/ml_data ones do). A nonzero
+    `offset` parses only the rows from that byte on (a line boundary).
+    """
+    import pandas as pd
+
+    source, header = path, None
+    if offset:
+        with open(path, "rb") as f:
+            f.seek(offset)
+            tail = f.read()
+        if not tail.strip():
+            return np.empty((0, len(FEATURE_COLUMNS))), np.empty(0, dtype=str)
+        source = io.BytesIO(tail)
+    else:
+        with open(path, "r", encoding="utf-8", errors="ignore") as f:
+            first = f.readline().split(",")
+        try:
+            float(first[0])
+        except ValueError:
+            header = 0
+
+    names = FEATURE_COLUMNS + ['label']
+    df = pd.read_csv(source, header=header, names=names)
+    for column in FEATURE_COLUMNS:
+        df[column] = pd.to_numeric(df[column], errors="coerce")  # Corrupt rows -> NaN
+    df = df.dropna()
+    return df[FEATURE_COLUMNS].to_numpy(dtype=np.float64), df['label'].to_numpy(dtype=str)
+
+
+def parse_recording(path):
+    """
+    (X, y) from the labelled 4-flex frames of a backend recording, one
+    device after another, so label runs (and windows) never mix gloves.
+    """
+    from services.sensor_recorder import load_recording
+
+    rec = load_recording(path)
+    keep = (rec["label"] != "") & ~np.isnan(rec["flex"][:, 3]) & np.isnan(rec["flex"][:, 4])
+    order = np.lexsort((rec["t"][keep], rec["device"][keep].astype(str)))
+    X = np.hstack([rec["flex"][keep, :4], rec["acc"][keep]]).astype(np.float64)[order]
+    y = rec["label"][keep].astype(str)[order]
+    return X, y
+
+
+def parse_dataset(path):
+    return parse_recording(path) if os.path.isdir(path) else parse_csv(path)
+
+
+# ---------------- CACHE ---------------- #
+class DatasetCache:
+    """
+    Parsed datasets as plain .npy feature/label arrays.
+
+    Layout:
+        <root>/<name>-<digest>/X.npy       float64 (n, 7)
+        <root>/<name>-<digest>/y.npy       unicode labels (n,)
+        <root>/<name>-<digest>/meta.json
+
+    The entry is keyed by the content hash of the source, so editing or
+    appending to it (ML/add.py, a new recording segment) is a cache miss.
+    A CSV that only grew since it was cached is not re-parsed in full: the
+    cached rows are reused and only the appended bytes are parsed.
+    Older entries for the same source are removed when a new one is written.
+    """
+
+    def __init__(self, root):
+        self.root = root
+
+    @staticmethod
+    def _name(path):
+        base = os.path.basename(os.path.normpath(path))
+        return re.sub(r"[^A-Za-z0-9_.-]", "_", base)
+
+    def load(self, path, refresh=False):
+        """Returns (X, y, hit). X is memory-mapped read-only on a cache hit."""
+        name = self._name(path)
+        size = None if os.path.isdir(path) else os.path.getsize(path)
+        digest = dataset_digest(path)
+        entry = os.path.join(self.root, f"{name}-{digest}")
+
+        if not refresh and os.path.isfile(os.path.join(entry, "meta.json")):
+            X = np.load(os.path.join(entry, "X.npy"), mmap_mode="r")
+            y = np.load(os.path.join(entry, "y.npy"))
+            return X, y, True
+
+        appended = None if refresh or size is None else self._load_appended(path, name, size)
+        X, y = appended if appended is not None else parse_dataset(path)
+        self._write(entry, name, X, y, path, size)
+        return X, y, False
+
+    def _load_appended(self, path, name, size):
+        """
+        (X, y) of a CSV whose cached version is a prefix of it: the cached
+        rows plus the parsed tail. None if no cached entry qualifies.
+        """
+        if not os.path.isdir(self.root):
+            return None
+        for old in os.listdir(self.root):
+            prefix, _, old_digest = old.rpartition("-")
+            meta_path = os.path.join(self.root, old, "meta.json")
+            if prefix != name or not os.path.isfile(meta_path):
+                continue
+            with open(meta_path, "r", encoding="utf-8") as f:
+                cached = json.load(f).get("bytes")
+            if not cached or cached >= size:
+                continue
+            with open(path, "rb") as f:
+                f.seek(cached - 1)
+                if f.read(1) != b"\n":
+                    continue  # The cached file ended mid-row
+            if dataset_digest(path, size=cached) != old_digest:
+                continue
+
+            X_new, y_new = parse_csv(path, offset=cached)
+            X = np.concatenate([np.load(os.path.join(self.root, old, "X.npy"), mmap_mode="r"), X_new])
+            y = np.concatenate([np.load(os.path.join(self.root, old, "y.npy")), y_new])
+            logger.info(f"Parsed {len(y_new)} appended rows of {path}")
+            return X, y
+        return None
+
+    def _write(self, entry, name, X, y, source, size=None):
+        os.makedirs(self.root, exist_ok=True)
+        tmp = os.path.join(self.root, f".tmp-{uuid.uuid4().hex}")
+        os.makedirs(tmp)
+        try:
+            np.save(os.path.join(tmp, "X.npy"), X)
+            np.save(os.path.join(tmp, "y.npy"), y)
+            with open(os.path.join(tmp, "meta.json"), "w", encoding="utf-8") as f:
+                json.dump({"source": os.path.abspath(source), "rows": int(len(y)), "bytes": size,
+                           "columns": FEATURE_COLUMNS}, f, indent=2)
+            shutil.rmtree(entry, ignore_errors=True)
+            os.replace(tmp, entry)
+        except Exception:
+            shutil.rmtree(tmp, ignore_errors=True)
+            raise
+
+        for old in os.listdir(self.root):
+            if old.rsplit("-", 1)[0] == name and os.path.join(self.root, old) != entry:
+                shutil.rmtree(os.path.join(self.root, old), ignore_errors=True)
+        logger.info(f"Cached {len(y)} rows of {source} in {entry}")
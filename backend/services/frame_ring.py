@@ -0,0 +1,221 @@
+import threading
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+# =========================================================
+# RING LAYOUT (one shared-memory block per glove)
+# =========================================================
+#   header  int64[4]   capacity, width, head (frames ever written), n_flex
+#   stamps  int64[cap] sequence number of the frame in each slot
+#   times   f8[cap]    host receive time (time.time())
+#   frames  f4[cap, WIDTH]
+#
+# A row is [f1 f2 f3 f4 ax ay az gx gy gz f5]: the model's feature columns
+# first, so row[:7] is a ready feature vector. Gyro is NaN when the glove
+# has none, f5 when it has four flex sensors.
+#
+# One thread writes a ring; it clears the slot's stamp, fills the slot,
+# stamps it, then advances head. A reader (seqlock order) copies a row out
+# first and then confirms with valid() that the writer did not start
+# reusing the slot before the copy was complete.
+WIDTH = 11
+FEATURES = slice(0, 7)
+FLEX4 = slice(0, 4)
+ACC = slice(4, 7)
+GYRO = slice(7, 10)
+FLEX5 = 10
+
+_HEADER = 4 * 8
+
+
+def _layout(capacity):
+    stamps = _HEADER
+    times = stamps + capacity * 8
+    frames = times + capacity * 8
+    return stamps, times, frames, frames + capacity * WIDTH * 4
+
+
+class FrameRing:
+    """
+    Fixed-capacity ring of raw sensor frames for one glove, in
+    multiprocessing.shared_memory so other processes can attach() by name.
+
+    write() copies one frame into its slot (no allocation) and returns its
+    sequence number; readers keep their own cursor and get zero-copy NumPy
+    views from frame() / read(). A view stays valid until the writer laps
+    it, `capacity` frames later.
+    """
+
+    def __init__(self, capacity=1024, name=None, create=True):
+        if create:
+            size = _layout(capacity)[3]
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+            capacity = int(np.ndarray(1, dtype=np.int64, buffer=self.shm.buf)[0])
+
+        stamps, times, frames, _ = _layout(capacity)
+        buf = self.shm.buf
+        self.header = np.ndarray(4, dtype=np.int64, buffer=buf)
+        self.stamps = np.ndarray(capacity, dtype=np.int64, buffer=buf, offset=stamps)
+        self.times = np.ndarray(capacity, dtype=np.float64, buffer=buf, offset=times)
+        self.frames = np.ndarray((capacity, WIDTH), dtype=np.float32, buffer=buf, offset=frames)
+        self.capacity = capacity
+        self.owner = None  # Writer thread (see write)
+
+        if create:
+            self.header[:] = (capacity, WIDTH, 0, 0)
+            self.stamps[:] = -1
+
+    @classmethod
+    def attach(cls, name):
+        return cls(name=name, create=False)
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    @property
+    def head(self):
+        """Sequence number the next frame will get (= frames ever written)."""
+        return int(self.header[2])
+
+    @property
+    def n_flex(self):
+        return int(self.header[3])
+
+    # ---------------- WRITE (one thread) ---------------- #
+    def write(self, flex, acc, gyro=None, t=None):
+        owner = threading.get_ident()
+        if self.owner != owner:
+            if self.owner is not None:
+                raise RuntimeError(f"Frame ring {self.name} already has a writer thread")
+            self.owner = owner
+
+        seq = int(self.header[2])
+        slot = seq % self.capacity
+        self.stamps[slot] = -1  # Readers copying this slot now fail valid()
+        row = self.frames[slot]
+        n = len(flex)
+        if n == 4:
+            row[FLEX4] = flex
+            row[FLEX5] = np.nan
+        else:
+            row[FLEX4] = flex[:4]
+            row[FLEX5] = flex[4] if n > 4 else np.nan
+        row[ACC] = acc
+        if gyro is not None and len(gyro):
+            row[GYRO] = gyro
+        else:
+            row[GYRO] = np.nan
+        self.times[slot] = time.time() if t is None else t
+
+        self.stamps[slot] = seq
+        self.header[3] = n
+        self.header[2] = seq + 1
+        return seq
+
+    # ---------------- READ (any thread / process) ---------------- #
+    def values(self, row):
+        """A ring row as the dashboard's sensor dict (see frame_values)."""
+        flex = row[FLEX4].tolist()
+        if self.n_flex > 4:
+            flex.append(float(row[FLEX5]))
+        gyro = row[GYRO]
+        return frame_values(flex, row[ACC], None if gyro[0] != gyro[0] else gyro)
+
+    def valid(self, seq):
+        """True while the frame `seq` is still in its slot (False once closed)."""
+        stamps = self.stamps
+        return stamps is not None and 0 <= seq and int(stamps[seq % self.capacity]) == seq
+
+    def frame(self, seq):
+        """Zero-copy view of frame `seq`, or None once it has been overwritten."""
+        if not self.valid(seq):
+            return None
+        return self.frames[seq % self.capacity]
+
+    def latest(self):
+        """(seq, view) of the newest frame, or (None, None) before the first."""
+        head = self.head
+        if not head:
+            return None, None
+        return head - 1, self.frame(head - 1)
+
+    def read(self, cursor):
+        """
+        Frames from `cursor` on, as (first seq, frames view, times view,
+        lost). The views stop at the end of the ring buffer, so call again
+        with first + len(frames) for the rest; `lost` counts frames the
+        writer overwrote before they were read.
+        """
+        head = self.head
+        first = max(cursor, head - self.capacity)
+        lost = first - cursor
+        if first >= head:
+            return first, self.frames[:0], self.times[:0], lost
+        start = first % self.capacity
+        stop = start + min(head - first, self.capacity - start)
+        return first, self.frames[start:stop], self.times[start:stop], lost
+
+    def close(self):
+        self.header = self.stamps = self.times = self.frames = None
+        try:
+            self.shm.close()
+        except BufferError:
+            pass  # A consumer still holds a view; unmapped once it is collected
+
+    def unlink(self):
+        self.shm.unlink()
+
+
+def frame_values(flex, acc, gyro=None):
+    """The DataStore / dashboard form of one frame; gyro reads 0 when absent."""
+    flex = flex.tolist() if hasattr(flex, "tolist") else list(flex)
+    ax, ay, az = acc.tolist() if hasattr(acc, "tolist") else acc
+    gx, gy, gz = (gyro.tolist() if hasattr(gyro, "tolist") else gyro) if gyro is not None else (0, 0, 0)
+    return {"flex": flex, "ax": ax, "ay": ay, "az": az, "gx": gx, "gy": gy, "gz": gz}
+
+
+class FrameRings:
+    """The rings of every glove, keyed by session key; created on first write."""
+
+    def __init__(self, capacity=1024):
+        self.capacity = capacity
+        self.rings = {}
+        self.lock = threading.Lock()
+
+    def get(self, device):
+        ring = self.rings.get(device)
+        if ring is None:
+            with self.lock:
+                ring = self.rings.get(device)
+                if ring is None:
+                    ring = self.rings[device] = FrameRing(self.capacity)
+        return ring
+
+    def release(self, device):
+        """Closes and unlinks one glove's ring (its session expired)."""
+        with self.lock:
+            ring = self.rings.pop(device, None)
+        if ring is not None:
+            ring.close()
+            ring.unlink()
+
+    def names(self):
+        """{device: shared-memory name}, for consumers in other processes."""
+        with self.lock:
+            return {device: ring.name for device, ring in self.rings.items()}
+
+    def close(self):
+        with self.lock:
+            rings, self.rings = self.rings, {}
+        for ring in rings.values():
+            ring.close()
+            ring.unlink()
+
+
+# Global instance
+frame_rings = FrameRings()
@@ -1,35 +1,90 @@
 from google import genai
 from google.genai import types
+import asyncio
+import json
 import os
 import logging
 import time
+from collections import OrderedDict
 from dotenv import load_dotenv
+from services.metrics import metrics, stage_seconds
+from services.sentence_rules import SentenceRules
 
 load_dotenv()
 logger = logging.getLogger(__name__)
 
+_SENTENCE = stage_seconds.labels("sentence")
+_LLM = stage_seconds.labels("llm_batch")
+_LLM_SENTENCES = metrics.counter(
+    "signspeak_llm_sentences_total", "AI sentences by where they came from", labels=("source",))
+
+RULES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sentence_rules.json")
+DEFAULT_MODEL = "gemini-2.0-flash"
+
+PROMPT = """You turn sign language gesture words into natural spoken English.
+Each numbered line below is one sequence of recognised gestures, in order.
+Reply with a JSON array of strings: exactly one short, grammatical sentence
+per line, in the same order. Do not add facts that are not in the words.
+
+{lines}"""
+
 
 class GeminiService:
     """
     Gemini is used ONLY for sentence construction (English).
     No translation is performed here.
+
+    build_sentence() is the async path: requests from all sessions that
+    arrive within `batch_window` go to the model in one call, identical
+    word sequences share one request, and answers are kept in an LRU cache
+    keyed by the normalised word sequence. A caller waits at most
+    `hedge_seconds` and otherwise gets the local rule-based sentence at
+    once (the late answer still fills the cache). After
+    `failure_threshold` failed calls in a row the circuit opens and only
+    local rules are used until `cooldown_seconds` have passed; then one
+    trial batch decides whether it closes again.
     """
 
-    def __init__(self):
-        self.api_key = os.getenv("GEMINI_API_KEY")
+    def __init__(self, rules_file=RULES_FILE, api_key=None, base_url=None, model=None,
+                 batch_window=0.03, max_batch=8, hedge_seconds=0.8, timeout_seconds=8.0,
+                 failure_threshold=3, cooldown_seconds=60, cache_size=512):
+        # Offline grammar templates (compiled once, results memoized)
+        self.rules = SentenceRules.load(rules_file)
+
+        self.api_key = api_key or os.getenv("GEMINI_API_KEY")
+        self.model = model or os.getenv("GEMINI_MODEL", DEFAULT_MODEL)
+        base_url = base_url or os.getenv("GEMINI_BASE_URL")  # e.g. a local stub server
         self.client = None
 
         # Circuit Breaker
         self.circuit_open = False
         self.last_error_time = 0
-        self.cooldown_seconds = 60
+        self.cooldown_seconds = cooldown_seconds
+        self.failure_threshold = failure_threshold
+        self.failures = 0
+        self.probing = False
+
+        # Batching (all on the event loop that calls build_sentence)
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self.hedge_seconds = hedge_seconds
+        self.timeout_seconds = timeout_seconds
+        self.batch = []       # (key, words) waiting for the next call
+        self.pending = {}     # key -> Future shared by identical requests
+        self.flush_handle = None
+        self.sending = set()  # In-flight _send tasks (the loop only keeps weak references)
+
+        # Model answers, least recently used first
+        self.cache = OrderedDict()
+        self.cache_size = cache_size
 
         if not self.api_key:
             logger.warning("⚠️ GEMINI_API_KEY not found in .env")
             return
 
         try:
-            self.client = genai.Client(api_key=self.api_key)
+            http_options = types.HttpOptions(base_url=base_url) if base_url else None
+            self.client = genai.Client(api_key=self.api_key, http_options=http_options)
             logger.info("✅ Gemini (GenAI) initialized (English sentence mode)")
 
         except Exception as e:
@@ -38,63 +93,11 @@ class GeminiService:
     def _offline_correct(self, text):
         """
         Local Rule-Based Correction (No API)
-        - Adds "am", "are", etc.
-        - Fixes sentence structure.
+        - Collapses repeated words and multiword labels (TEAM_FSOCITY)
+        - Adds "am", "are", etc. (see sentence_rules.json)
         - Adds punctuation for TTS delays.
         """
-        import re
-        
-        normalized = text.lower().strip()
-        
-        # Rule 1: "I Yash We TeamFsociety" -> "I am Yash. We are Team Fsociety."
-        # breakdown: 
-        # "i ... yash" -> "I am Yash."
-        # "we ... teamfsociety" -> "We are Team Fsociety."
-        
-        # We process sequentially
-        
-        # 0. DEDUPLICATE consecutive words (Fixes "WE I WE I..." spam)
-        # Split by space, keep order, remove adjacent duplicates
-        words = normalized.split()
-        if not words:
-            return ""
-            
-        deduped = [words[0]]
-        for w in words[1:]:
-            if w != deduped[-1]:
-                deduped.append(w)
-        
-        normalized = " ".join(deduped)
-        logger.info(f"🧹 Deduplicated: {normalized}")
-
-        # Rule 1: "i yash we teamfsociety" -> "I am Yash. We are Team Fsociety."
-        if "yash" in normalized and ("fsociety" in normalized or "teamfsociety" in normalized):
-             return "I am Yash. We are Team Fsociety."
-            
-        # General simple grammar fixes (Regex)
-        # "i {name}" -> "I am {name}"
-        normalized = re.sub(r'\bi\s+([a-z]+)', r'I am \1', normalized)
-        
-        # "we {noun}" -> "We are {noun}"
-        normalized = re.sub(r'\bwe\s+([a-z]+)', r'We are \1', normalized)
-        
-        # "teamfsociety" -> "Team Fsociety"
-        normalized = normalized.replace("teamfsociety", "Team Fsociety")
-        
-        # Ensure punctuation for TTS
-        if not normalized.endswith("."):
-            normalized += "."
-            
-        # Capitalize sentences
-        sentences = normalized.split(". ")
-        final_sentences = []
-        for s in sentences:
-            s = s.strip()
-            if s:
-                s = s[0].upper() + s[1:]
-                final_sentences.append(s)
-                
-        return ". ".join(final_sentences)
+        return self.rules.correct(text)
 
     def generate_sentence(self, words):
         """
@@ -115,11 +118,153 @@ class GeminiService:
         logger.info(f"🔄 Correcting Triggered: {base_text}")
 
         # -------- USE LOCAL RULES --------
+        start = time.perf_counter()
         final_text = self._offline_correct(base_text)
+        _SENTENCE.since(start)
         
         logger.info(f"✨ Rule-Based Output: {final_text}")
         return final_text
 
 
+    # ---------------- ASYNC (LLM) ---------------- #
+    async def build_sentence(self, words):
+        """
+        words: list[str] OR str. Gemini's sentence when it answers within
+        `hedge_seconds`, otherwise the local one. Never raises.
+        """
+        if not words:
+            return None
+        base_text = " ".join(words) if isinstance(words, (list, tuple)) else str(words)
+
+        start = time.perf_counter()
+        units = self.rules.units(base_text)
+        key = tuple(u.key for u in units)
+        local = self._offline_correct(base_text)
+        if not key:
+            return local
+
+        sentence = self._cache_get(key)
+        if sentence is not None:
+            _LLM_SENTENCES.inc(1, "cache")
+        else:
+            sentence = await self._ask(key, " ".join(u.text for u in units))
+            _LLM_SENTENCES.inc(1, "llm" if sentence is not None else "local")
+
+        _SENTENCE.since(start)
+        return sentence if sentence is not None else local
+
+    async def _ask(self, key, words):
+        if not self._allow_request():
+            return None
+
+        future = self.pending.get(key)
+        if future is None:
+            future = self._enqueue(key, words)
+        try:
+            # shield: a hedged caller must not cancel the shared request
+            return await asyncio.wait_for(asyncio.shield(future), self.hedge_seconds)
+        except asyncio.TimeoutError:
+            logger.info(f"⏱️ Gemini slower than {self.hedge_seconds}s, using local rules")
+            return None
+
+    def _enqueue(self, key, words):
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self.pending[key] = future
+        self.batch.append((key, words))
+
+        if len(self.batch) >= self.max_batch:
+            self._flush()
+        elif self.flush_handle is None:
+            self.flush_handle = loop.call_later(self.batch_window, self._flush)
+        return future
+
+    def _flush(self):
+        if self.flush_handle is not None:
+            self.flush_handle.cancel()
+            self.flush_handle = None
+        batch, self.batch = self.batch, []
+        if batch:
+            task = asyncio.get_running_loop().create_task(self._send(batch))
+            self.sending.add(task)
+            task.add_done_callback(self.sending.discard)
+
+    async def _send(self, batch):
+        start = time.perf_counter()
+        try:
+            sentences = await asyncio.wait_for(
+                self._call_model([words for _, words in batch]), self.timeout_seconds)
+        except Exception as e:
+            self._record_failure(e)
+            sentences = [None] * len(batch)
+        else:
+            self._record_success()
+        _LLM.since(start)
+
+        for (key, _), sentence in zip(batch, sentences):
+            if sentence is not None:
+                self._cache_put(key, sentence)
+            future = self.pending.pop(key, None)
+            if future is not None and not future.done():
+                future.set_result(sentence)
+
+    async def _call_model(self, lines):
+        """One generateContent call for all `lines`; one sentence per line."""
+        prompt = PROMPT.format(lines="\n".join(f"{i}. {line}" for i, line in enumerate(lines, 1)))
+        response = await self.client.aio.models.generate_content(
+            model=self.model,
+            contents=prompt,
+            config=types.GenerateContentConfig(response_mime_type="application/json", temperature=0.2),
+        )
+        sentences = json.loads(response.text)
+        if not isinstance(sentences, list) or len(sentences) != len(lines) or \
+                not all(isinstance(s, str) and s.strip() for s in sentences):
+            raise ValueError(f"Unexpected Gemini answer: {response.text[:200]}")
+        return [s.strip() for s in sentences]
+
+    # ---------------- CIRCUIT BREAKER ---------------- #
+    def _allow_request(self):
+        if self.client is None:
+            return False
+        if not self.circuit_open:
+            return True
+        if self.probing or time.monotonic() - self.last_error_time < self.cooldown_seconds:
+            return False
+        # Half open: let one batch through to test the API
+        self.probing = True
+        logger.info("🔌 Gemini circuit half-open, trying one batch")
+        return True
+
+    def _record_success(self):
+        if self.circuit_open:
+            logger.info("✅ Gemini circuit closed")
+        self.failures = 0
+        self.circuit_open = False
+        self.probing = False
+
+    def _record_failure(self, error):
+        self.failures += 1
+        self.last_error_time = time.monotonic()
+        logger.error(f"❌ Gemini request failed ({self.failures}x): {error!r}")
+        if self.probing or self.failures >= self.failure_threshold:
+            if not self.circuit_open or self.probing:
+                logger.warning(f"⚠️ Gemini circuit open for {self.cooldown_seconds}s, using local rules")
+            self.circuit_open = True
+        self.probing = False
+
+    # ---------------- CACHE ---------------- #
+    def _cache_get(self, key):
+        sentence = self.cache.get(key)
+        if sentence is not None:
+            self.cache.move_to_end(key)
+        return sentence
+
+    def _cache_put(self, key, sentence):
+        self.cache[key] = sentence
+        self.cache.move_to_end(key)
+        while len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+
+
 # -------- GLOBAL SINGLETON --------
 gemini_service = GeminiService()
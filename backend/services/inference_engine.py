@@ -0,0 +1,98 @@
+import logging
+import time
+
+import numpy as np
+
+from services.metrics import metrics, stage_seconds
+
+logger = logging.getLogger(__name__)
+
+_PREDICT = stage_seconds.labels("predict")
+_PREDICTIONS = metrics.counter("signspeak_predictions_total", "Frames classified by the gesture model")
+
+
+class BatchInferenceEngine:
+    """
+    Micro-batching front end for a classifier.
+
+    Frames are copied into a preallocated float32 buffer and classified in
+    one `predict` call once `batch_size` frames are queued or the oldest
+    queued frame is older than `max_delay` seconds. Results are handed to
+    `on_result(label, tag)` one frame at a time, in arrival order; `tag` is
+    whatever was submitted with the frame (e.g. its glove session), so one
+    batch can mix frames from several devices.
+
+    `buffer` lets the caller supply the frame buffer (e.g. a view of shared
+    memory a worker process reads), so frames are written where they are
+    classified.
+    """
+
+    def __init__(self, predict_fn, n_features, on_result, batch_size=8, max_delay=0.04, buffer=None):
+        if batch_size < 1:
+            raise ValueError("batch_size must be >= 1")
+
+        self.predict_fn = predict_fn
+        self.n_features = n_features
+        self.on_result = on_result
+        self.batch_size = batch_size
+        self.max_delay = max_delay
+
+        # Preallocated frame buffer (reused for every batch)
+        if buffer is None:
+            buffer = np.zeros((batch_size, n_features), dtype=np.float32)
+        elif buffer.shape != (batch_size, n_features):
+            raise ValueError(f"Frame buffer must have shape {(batch_size, n_features)}, got {buffer.shape}")
+        self.buffer = buffer
+        self.tags = [None] * batch_size
+        self.pending = 0
+        self.oldest_time = 0.0
+
+    # ---------------- INGEST ---------------- #
+    def submit(self, features, tag=None, now=None):
+        """
+        Queue one frame. Returns the number of frames classified by this call
+        (0 while the batch is still filling).
+        """
+        if now is None:
+            now = time.monotonic()
+
+        if self.pending == 0:
+            self.oldest_time = now
+
+        self.buffer[self.pending, :] = features
+        self.tags[self.pending] = tag
+        self.pending += 1
+
+        if self.pending >= self.batch_size or now - self.oldest_time >= self.max_delay:
+            return self.flush()
+        return 0
+
+    def poll(self, now=None):
+        """Flush if the deadline of the oldest queued frame has passed."""
+        if not self.pending:
+            return 0
+        if now is None:
+            now = time.monotonic()
+        if now - self.oldest_time >= self.max_delay:
+            return self.flush()
+        return 0
+
+    # ---------------- CLASSIFY ---------------- #
+    def flush(self):
+        count = self.pending
+        if not count:
+            return 0
+
+        # Reset before dispatching so a failing callback cannot replay frames
+        self.pending = 0
+        start = time.perf_counter()
+        labels = self.predict_fn(self.buffer[:count])
+        _PREDICT.since(start)
+        _PREDICTIONS.inc(count)
+
+        tags = self.tags
+        for i in range(count):
+            self.on_result(labels[i], tags[i])
+            tags[i] = None
+
+        return count
@@ -0,0 +1,189 @@
+import logging
+import multiprocessing as mp
+import threading
+from multiprocessing import shared_memory
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Spawned, not forked: the backend is multi-threaded by the time a worker starts
+_CONTEXT = mp.get_context("spawn")
+
+
+def _serve(conn, store_root):
+    """
+    Worker process main loop. Messages are small tuples; frames and
+    probabilities live in the shared-memory block named by "buffer":
+        ("buffer", name, rows, n_features, n_classes)
+        ("predict", version, count)  -> ("ok", count) | ("error", message)
+        ("stop",)
+    """
+    from services.model_store import ModelStore
+
+    store = ModelStore(store_root)
+    forest = version = shm = None
+    inputs = outputs = None
+    try:
+        while True:
+            try:
+                message = conn.recv()
+            except EOFError:
+                return  # Parent went away
+            kind = message[0]
+            if kind == "stop":
+                return
+            try:
+                if kind == "buffer":
+                    _, name, rows, n_features, n_classes = message
+                    inputs = outputs = None
+                    if shm is not None:
+                        shm.close()
+                    shm = shared_memory.SharedMemory(name=name)
+                    inputs, outputs = _views(shm, rows, n_features, n_classes)
+                    conn.send(("ok", 0))
+                elif kind == "predict":
+                    _, wanted, count = message
+                    if wanted != version:
+                        # Memory-mapped: every worker shares the same pages
+                        forest, _ = store.load(wanted)
+                        version = wanted
+                    outputs[:count, :forest.n_classes] = forest.predict_proba(inputs[:count])
+                    conn.send(("ok", count))
+                else:
+                    conn.send(("error", f"unknown message {kind!r}"))
+            except Exception as e:
+                conn.send(("error", f"{type(e).__name__}: {e}"))
+    finally:
+        inputs = outputs = None
+        if shm is not None:
+            shm.close()
+
+
+def _views(shm, rows, n_features, n_classes):
+    """(inputs float32 (rows, n_features), outputs float64 (rows, n_classes)) over one block."""
+    split = rows * n_features * 4
+    split += -split % 8  # Align the float64 outputs
+    inputs = np.ndarray((rows, n_features), dtype=np.float32, buffer=shm.buf)
+    outputs = np.ndarray((rows, n_classes), dtype=np.float64, buffer=shm.buf, offset=split)
+    return inputs, outputs
+
+
+def _block_size(rows, n_features, n_classes):
+    split = rows * n_features * 4
+    return split + (-split % 8) + rows * n_classes * 8
+
+
+class InferenceProcess:
+    """
+    One worker process for one inference shard, so shards classify on
+    separate cores instead of taking turns on the GIL.
+
+    The worker memory-maps each model version from the ModelStore itself,
+    so a model is loaded once per version and its tables are shared
+    read-only through the page cache. Batches are never pickled: the
+    shard's BatchInferenceEngine writes frames straight into `inputs`, a
+    view of a shared-memory block the worker also maps, and the worker
+    writes the class probabilities back into the same block. Only
+    ("predict", version, count) and ("ok", count) cross the pipe.
+
+    Used by one shard thread at a time (under its lock); a worker that dies
+    is restarted on the next batch.
+    """
+
+    def __init__(self, store_root, name="ml-worker"):
+        self.store_root = store_root
+        self.name = name
+        self.lock = threading.Lock()
+        self.process = None
+        self.conn = None
+        self.shm = None
+        self.inputs = None
+        self.outputs = None
+        self.shape = None  # (rows, n_features, n_classes) of the block
+        self.restarts = 0
+
+    # ---------------- LIFECYCLE ---------------- #
+    def start(self):
+        with self.lock:
+            self._start_locked()
+
+    def _start_locked(self):
+        if self.process is not None and self.process.is_alive():
+            return
+        if self.process is not None:
+            self.restarts += 1
+            logger.warning(f"⚠️ {self.name} exited (code {self.process.exitcode}); restarting")
+            self.conn.close()
+        self.conn, child = _CONTEXT.Pipe()
+        self.process = _CONTEXT.Process(target=_serve, args=(child, self.store_root), name=self.name, daemon=True)
+        self.process.start()
+        child.close()
+        if self.shm is not None:
+            self._call(("buffer", self.shm.name) + self.shape)
+
+    def stop(self):
+        with self.lock:
+            if self.process is not None:
+                try:
+                    self.conn.send(("stop",))
+                except (OSError, ValueError):
+                    pass
+                self.process.join(timeout=2.0)
+                if self.process.is_alive():
+                    self.process.kill()
+                    self.process.join()
+                self.conn.close()
+                self.process = self.conn = None
+            self._release()
+
+    def _release(self):
+        self.inputs = self.outputs = None
+        if self.shm is not None:
+            try:
+                self.shm.close()
+            except BufferError:
+                pass  # A retired engine still holds a view; unmapped once it is collected
+            self.shm.unlink()
+            self.shm = None
+            self.shape = None
+
+    # ---------------- BATCHES ---------------- #
+    def buffer(self, rows, n_features, n_classes):
+        """Input view (rows, n_features) for a batch engine; re-created only when the shape changes."""
+        with self.lock:
+            shape = (rows, n_features, n_classes)
+            if shape != self.shape:
+                self._release()
+                self.shm = shared_memory.SharedMemory(create=True, size=_block_size(*shape))
+                self.shape = shape
+                self.inputs, self.outputs = _views(self.shm, *shape)
+                if self.process is not None and self.process.is_alive():
+                    self._call(("buffer", self.shm.name) + shape)
+                else:
+                    self._start_locked()  # Attaches the new block
+            return self.inputs
+
+    def predict_proba(self, X, version):
+        """
+        Class probabilities of X under model `version`. X is normally a
+        view of `inputs` (nothing is copied); the result is a view that the
+        next call overwrites.
+        """
+        with self.lock:
+            count = len(X)
+            if not np.may_share_memory(X, self.inputs):
+                self.inputs[:count] = X
+            self._start_locked()
+            self._call(("predict", version, count))
+            return self.outputs[:count]
+
+    def _call(self, message):
+        try:
+            self.conn.send(message)
+            status, detail = self.conn.recv()
+        except (EOFError, OSError) as e:
+            raise RuntimeError(f"{self.name} died: {e}") from e
+        if status != "ok":
+            raise RuntimeError(f"{self.name}: {detail}")
+        return detail
@@ -0,0 +1,169 @@
+import bisect
+import threading
+import time
+
+# Latency buckets (seconds): 50us parse/predict steps up to multi-second TTS
+DEFAULT_BUCKETS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+                   0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _labels(names, values, extra=""):
+    pairs = [f'{n}="{v}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Monotonic count, optionally split by label values."""
+
+    kind = "counter"
+
+    def __init__(self, name, help, labels=()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labels)
+        self.values = {}
+        self.lock = threading.Lock()
+
+    def inc(self, amount=1, *labelvalues):
+        with self.lock:
+            self.values[labelvalues] = self.values.get(labelvalues, 0) + amount
+
+    def samples(self):
+        with self.lock:
+            values = dict(self.values) or ({(): 0} if not self.labelnames else {})
+        for labelvalues, value in sorted(values.items()):
+            yield f"{self.name}{_labels(self.labelnames, labelvalues)} {_number(value)}"
+
+
+class _HistogramChild:
+    """One label combination of a Histogram."""
+
+    __slots__ = ("buckets", "counts", "sum", "lock")
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.lock = threading.Lock()
+
+    def observe(self, seconds):
+        i = bisect.bisect_left(self.buckets, seconds)
+        with self.lock:
+            self.counts[i] += 1
+            self.sum += seconds
+
+    def since(self, start):
+        """observe() the time elapsed since a time.perf_counter() reading."""
+        self.observe(time.perf_counter() - start)
+
+
+class Histogram:
+    """Latency distribution per label combination (children are cached)."""
+
+    kind = "histogram"
+
+    def __init__(self, name, help, labels=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labels)
+        self.buckets = tuple(buckets)
+        self.children = {}
+        self.lock = threading.Lock()
+
+    def labels(self, *labelvalues):
+        child = self.children.get(labelvalues)
+        if child is None:
+            with self.lock:
+                child = self.children.setdefault(labelvalues, _HistogramChild(self.buckets))
+        return child
+
+    def samples(self):
+        with self.lock:
+            children = sorted(self.children.items())
+        for labelvalues, child in children:
+            with child.lock:
+                counts, total = list(child.counts), child.sum
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = 'le="%s"' % ("+Inf" if bound == float("inf") else repr(bound))
+                yield f"{self.name}_bucket{_labels(self.labelnames, labelvalues, le)} {cumulative}"
+            yield f"{self.name}_sum{_labels(self.labelnames, labelvalues)} {_number(total)}"
+            yield f"{self.name}_count{_labels(self.labelnames, labelvalues)} {cumulative}"
+
+
+class _Collected:
+    """A value read from a service at scrape time (zero cost in between)."""
+
+    def __init__(self, kind, name, help, fn, label=None):
+        self.kind = kind
+        self.name = name
+        self.help = help
+        self.fn = fn
+        self.label = label
+
+    def samples(self):
+        value = self.fn()
+        if isinstance(value, dict):
+            # {label value: number}, one sample per value of `label`
+            for labelvalue, v in sorted(value.items()):
+                yield f"{self.name}{_labels((self.label,), (labelvalue,))} {_number(v)}"
+        else:
+            yield f"{self.name} {_number(value)}"
+
+
+class MetricsRegistry:
+    """
+    Counters, latency histograms and scrape-time collectors, rendered in the
+    Prometheus text exposition format.
+
+    Everything records from startup, so the first scrape already has the
+    history and counters never go backwards between scrapes. A span costs
+    one bisect and a short lock.
+    """
+
+    def __init__(self):
+        self.metrics = []
+        self.lock = threading.Lock()
+
+    def _register(self, metric):
+        with self.lock:
+            self.metrics.append(metric)
+        return metric
+
+    def counter(self, name, help, labels=()):
+        return self._register(Counter(name, help, labels))
+
+    def histogram(self, name, help, labels=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram(name, help, labels, buckets))
+
+    def collect(self, kind, name, help, fn, label=None):
+        """fn() -> number (or {label value: number}), read on every scrape."""
+        return self._register(_Collected(kind, name, help, fn, label))
+
+    def render(self):
+        with self.lock:
+            metrics = list(self.metrics)
+
+        lines = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+# Global Instance
+metrics = MetricsRegistry()
+
+# Pipeline stages, from datagram to audio (see api/routes/metrics.py)
+stage_seconds = metrics.histogram(
+    "signspeak_stage_seconds", "Time spent in each pipeline stage", labels=("stage",))
@@ -1,41 +1,198 @@
+import functools
 import joblib
-import pandas as pd
+import json
 import logging
 import os
+import queue
 import threading
 import time
 
+import numpy as np
+
+from services.beam_decoder import BeamDecoder, BigramLM, merge_bigrams, template_bigrams
+from services.calibration import CalibrationProfile, profile_store
+from services.compiled_forest import compile_forest
+from services.inference_engine import BatchInferenceEngine
+from services.inference_pool import InferenceProcess
+from services.metrics import metrics
+from services.model_store import ModelStore
+from services.motion_segmenter import HOLD, REST
+from services.session_manager import session_manager
+from services.window_features import RollingWindow, window_columns
+
 logger = logging.getLogger(__name__)
 
+_WORDS = metrics.counter("signspeak_words_total", "Stable gestures emitted as words")
+_SEGMENTS = metrics.counter("signspeak_segments_total", "Motion segmenter transitions", ("event",))
+_SKIPPED = metrics.counter(
+    "signspeak_frames_skipped_total", "Frames not classified because the hand was moving or at rest")
+_LAPPED = metrics.counter(
+    "signspeak_frames_lapped_total", "Queued ring frames overwritten before they were classified")
+
 # ================= DEMO CONFIG ================= #
 DEMO_MODE = True
 WORDS = ["HELLO", "I", "YASH", "WE", "TEAM_FSOCITY"]
 FINAL_SENTENCE = "Hello, I am Yash. We are Team Fsocity."
 
+# Grammar templates that also shape the decoder's word bigrams
+RULES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sentence_rules.json")
+
+
+class InferenceShard:
+    """
+    A slice of the glove sessions (chosen by hashing the session key) with
+    its own micro-batching engine. Every session always lands on the same
+    shard, so its frames are classified in order and its stability state is
+    only ever touched under this shard's lock.
+
+    Until `start()` is called frames are processed on the caller's thread;
+    afterwards a worker thread drains a bounded queue, dropping the oldest
+    frame when the queue is full.
+    """
+
+    def __init__(self, service, index, queue_size=256):
+        self.service = service
+        self.index = index
+        self.lock = threading.Lock()
+
+        # Engine for the active model generation (rebuilt on model swap)
+        self.engine = None
+        self.generation = None
+        self.window_size = None
+        self.calibration = None
+
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.thread = None
+        self.running = False
+        self.dropped = 0
+        self.lapped = 0
+
+        # Optional worker process that runs this shard's forest off the GIL
+        self.worker = None
+        if service.processes:
+            self.worker = InferenceProcess(service.model_store.root, name=f"ml-worker-{index}")
+
+    def start(self):
+        if self.running:
+            return
+        self.running = True
+        self.thread = threading.Thread(target=self._run, name=f"ml-shard-{self.index}", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.running = False
+        if self.thread:
+            self.thread.join()
+            self.thread = None
+        if self.worker:
+            self.worker.stop()
+
+    def submit(self, session, flex_vals, acc_vals, gyro_vals=None, frame=None):
+        if not self.running:
+            self.process(session, flex_vals, acc_vals, gyro_vals, frame)
+            return
+
+        item = (session, flex_vals, acc_vals, gyro_vals, frame)
+        while True:
+            try:
+                self.queue.put_nowait(item)
+                return
+            except queue.Full:
+                try:
+                    self.queue.get_nowait()
+                    self.dropped += 1
+                except queue.Empty:
+                    pass
+
+    def process(self, session, flex_vals, acc_vals, gyro_vals=None, frame=None):
+        if frame is not None:
+            # Views of a FrameRing row: copy first, then check the writer did
+            # not reuse the row while it was copied (seqlock read)
+            flex_vals, acc_vals = flex_vals.copy(), acc_vals.copy()
+            if gyro_vals is not None:
+                gyro_vals = gyro_vals.copy()
+            if not frame[0].valid(frame[1]):
+                self.lapped += 1
+                _LAPPED.inc()
+                return
+        with self.lock:
+            self.service._process_frame(self, session, flex_vals, acc_vals, gyro_vals)
+
+    def poll(self):
+        with self.lock:
+            if self.engine:
+                self.engine.poll()
+            self.service._end_sentences(self)
+
+    def _run(self):
+        while self.running:
+            try:
+                item = self.queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            self.process(*item)
+
 
 class MLService:
-    def __init__(self, model_path="models/signspeak.pkl", required_stability=5):
+    def __init__(self, model_path="models/signspeak.pkl", required_stability=5,
+                 batch_size=8, max_batch_delay=0.04, store_path="models/store",
+                 workers=4, queue_size=256, decoder="beam", sentence_gap=1.5, segment=True,
+                 processes=None):
         self.model = None
+        self.model_version = None
         self.model_path = model_path
 
+        # Versioned, memory-mapped artifacts (see services/model_store.py)
+        base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        self.base_dir = base_dir
+        self.model_store = ModelStore(os.path.join(base_dir, store_path))
+
+        # Hot reload: models are loaded by a background thread and swapped
+        # in by the sensor thread between frames
+        self._staged_model = None
+        self._staged_lock = threading.Lock()
+        self._reload_thread = None
+
+        # Active model as one tuple, so shards never see a half-swapped model:
+        # (generation, forest, n_features, window_size, language model,
+        #  fallback calibration profile or None for a raw-feature model,
+        #  store version)
+        self.generation = 0
+        self.active = None
+
+        # Micro-batched inference, sharded by glove session; with `processes`
+        # each shard classifies in its own worker process (see
+        # services/inference_pool.py), so shards scale across cores
+        if processes is None:
+            processes = os.getenv("SIGNSPEAK_ML_PROCESSES", "0") == "1"
+        self.processes = processes
+        self.batch_size = batch_size
+        self.max_batch_delay = max_batch_delay
+        self.shards = [InferenceShard(self, i, queue_size) for i in range(max(1, workers))]
+
         # Feature order (kept for compatibility)
         self.columns = ['f1', 'f2', 'f3', 'f4', 'ax', 'ay', 'az']
 
-        # Stability (kept but unused in demo)
-        self.last_prediction = None
-        self.stability_counter = 0
+        # Stability (per-session counters live on GloveSession)
         self.required_stability = required_stability
-        self.last_stable_word = None
+        self.active_stability = required_stability
+
+        # Word decoding: "beam" (streaming beam search over class
+        # probabilities) or "stability" (N identical predictions in a row).
+        # A beam-decoded sentence ends after `sentence_gap` quiet seconds.
+        if decoder not in ("beam", "stability"):
+            raise ValueError(f"Unknown decoder: {decoder}")
+        self.decoder = decoder
+        self.sentence_gap = sentence_gap
 
-        # Demo sequence state
-        self.demo_index = 0
-        self.demo_sentence = []
-        self.last_trigger_time = 0
+        # Motion segmentation: classify only while the hand holds a sign
+        # (see services/motion_segmenter.py); False classifies every frame
+        self.segment = segment
 
         # Callback
         self.on_prediction_callback = None
 
-        # Thread safety
+        # Thread safety (model activation)
         self.lock = threading.Lock()
 
         self._load_model()
@@ -43,22 +200,109 @@ class MLService:
     # ---------------- MODEL LOADING ---------------- #
     def _load_model(self):
         try:
-            base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-            full_path = os.path.join(base_dir, self.model_path)
+            loaded = self._read_model()
+            if loaded:
+                self._activate_model(*loaded)
+        except Exception:
+            logger.exception("❌ Error loading ML model")
 
-            if not os.path.exists(full_path):
-                logger.warning("⚠️ ML model not found (demo mode active)")
-                return
+    def _read_model(self):
+        """Returns (CompiledForest, manifest) for the current version, or None."""
+        if self.model_store.current_version():
+            forest, manifest = self.model_store.load()
+            logger.info(f"✅ ML model {manifest['version']} memory-mapped from {self.model_store.root}")
+            return forest, manifest
+
+        full_path = os.path.join(self.base_dir, self.model_path)
+        if not os.path.exists(full_path):
+            logger.warning("⚠️ ML model not found (demo mode active)")
+            return None
+
+        # Legacy pickle only: compiled in memory. Loading never writes the
+        # store; `train_custom.py --publish-pickle` publishes it
+        model = joblib.load(full_path)
+        columns = list(getattr(model, "feature_names_in_", self.columns))
+        logger.info(f"✅ ML Model loaded from {full_path} (not in the model store)")
+        return compile_forest(model), {"version": None, "columns": columns, "metadata": {"source": self.model_path}}
+
+    def _activate_model(self, forest, manifest):
+        columns = manifest["columns"]
+        metadata = manifest.get("metadata", {})
+        window_size = metadata.get("window")
+
+        expected = window_columns(self.columns) if window_size else self.columns
+        if columns != expected:
+            raise ValueError(f"Model {manifest['version']} expects columns {columns}, got {expected}")
+
+        # Shards rebuild their engines (and sessions their windows) when they
+        # see the new generation; frames already queued for the previous
+        # model are classified by it first
+        self.model = forest
+        self.model_version = manifest["version"]
+        self.active_stability = metadata.get("required_stability", self.required_stability)
+        lm = BigramLM(forest.classes, merge_bigrams(
+            metadata.get("bigrams"), template_bigrams(self._template_patterns(), forest.classes)))
+        # Calibrated models were trained on normalised features; gloves
+        # without a profile of their own get the training data's default
+        calibration = metadata.get("calibration")
+        if calibration:
+            calibration = CalibrationProfile.from_dict(calibration["profiles"][calibration["default"]])
+        self.generation += 1
+        self.active = (self.generation, forest, len(columns), window_size, lm, calibration or None,
+                       manifest["version"])
+        logger.info(
+            f"🧠 Active ML model: {self.model_version} "
+            f"(window={window_size or 1}, stability={self.active_stability}, "
+            f"calibrated={'yes' if calibration else 'no'})"
+        )
+
+    @staticmethod
+    def _template_patterns():
+        try:
+            with open(RULES_FILE, encoding="utf-8") as f:
+                return [t["pattern"] for t in json.load(f).get("templates", ())]
+        except (OSError, ValueError) as e:
+            logger.warning(f"⚠️ Sentence templates unavailable for the decoder: {e}")
+            return []
+
+    def reload_model(self):
+        """
+        Loads the current store version on a background thread. The sensor
+        thread swaps it in before its next frame, so reloads never block it.
+        """
+        if self._reload_thread and self._reload_thread.is_alive():
+            logger.info("🔄 ML model reload already in progress")
+            return
 
-            self.model = joblib.load(full_path)
-            logger.info(f"✅ ML Model loaded from {full_path}")
+        logger.info("🔄 Reloading ML model...")
+        self._reload_thread = threading.Thread(target=self._background_reload, daemon=True)
+        self._reload_thread.start()
+
+    def check_for_update(self):
+        """Starts a background reload when the store's CURRENT version changed."""
+        version = self.model_store.current_version()
+        if version and version != self.model_version:
+            self.reload_model()
 
+    def _background_reload(self):
+        try:
+            loaded = self._read_model()
         except Exception:
             logger.exception("❌ Error loading ML model")
+            return
 
-    def reload_model(self):
-        logger.info("🔄 Reloading ML model...")
-        self._load_model()
+        if loaded:
+            with self._staged_lock:
+                self._staged_model = loaded
+
+    def _swap_staged_model(self):
+        with self._staged_lock:
+            staged, self._staged_model = self._staged_model, None
+        if staged:
+            try:
+                self._activate_model(*staged)
+            except Exception:
+                logger.exception("❌ Error activating ML model")
 
     # ---------------- CALLBACK ---------------- #
     def register_callback(self, callback):
@@ -66,42 +310,109 @@ class MLService:
             raise ValueError("Callback must be callable")
         self.on_prediction_callback = callback
 
+    # ---------------- WORKER POOL ---------------- #
+    def start(self):
+        """Moves inference off the transports onto one thread per shard."""
+        for shard in self.shards:
+            if shard.worker:
+                shard.worker.start()
+            shard.start()
+        kind = "worker processes" if self.processes else "workers"
+        logger.info(f"🧵 ML inference sharded across {len(self.shards)} {kind}")
+
+    def stop(self):
+        for shard in self.shards:
+            shard.stop()
+
+    def stats(self):
+        return {
+            "workers": len(self.shards),
+            "queued": sum(s.queue.qsize() for s in self.shards),
+            "dropped": sum(s.dropped for s in self.shards),
+            "lapped": sum(s.lapped for s in self.shards),
+            "processes": self.processes,
+            "process_restarts": sum(s.worker.restarts for s in self.shards if s.worker),
+        }
+
     # ---------------- MAIN ENTRY ---------------- #
-    def process_data(self, flex_vals, acc_vals):
+    def process_data(self, flex_vals, acc_vals, device=None, gyro_vals=None, frame=None):
         """
         flex_vals: [f1, f2, f3, f4]
         acc_vals: [ax, ay, az]
+        device: session key (see SessionManager.key_for); None = single glove
+        gyro_vals: [gx, gy, gz] when the glove has a gyroscope (segmentation only)
+        frame: (FrameRing, seq) when the values are views of that ring's row;
+               the frame is skipped if the ring reuses the row before its turn
         """
+        if self._staged_model is not None:
+            with self.lock:
+                self._swap_staged_model()
+
+        session = session_manager.get(device)
+        # Serial / TCP / polling frames never update() their session's store,
+        # so every frame counts as activity for expire()
+        session.last_seen = time.time()
+        self.shards[hash(session.key) % len(self.shards)].submit(session, flex_vals, acc_vals, gyro_vals, frame)
+
+    def poll(self):
+        """Classify frames whose batch deadline has passed (idle stream)."""
+        if DEMO_MODE or not self.active:
+            return
+        if self._staged_model is not None:
+            with self.lock:
+                self._swap_staged_model()
+        for shard in self.shards:
+            try:
+                shard.poll()
+            except Exception:
+                logger.exception("❌ ML Prediction Error")
+
+    def _process_frame(self, shard, session, flex_vals, acc_vals, gyro_vals=None):
+        """Runs on the session's shard, under the shard lock."""
+        try:
+            capture = session.capture  # /calibration/finish may clear it meanwhile
+            if capture is not None:
+                capture.add(flex_vals, acc_vals)
+            if self.segment:
+                session.segmenter.update(flex_vals, acc_vals, gyro_vals)
+                if session.segmenter.event:
+                    _SEGMENTS.inc(1, session.segmenter.event)
 
-        with self.lock:
             if DEMO_MODE:
-                self._demo_sequence()
+                self._demo_sequence(session)
             else:
-                self._real_ml_predict(flex_vals, acc_vals)
+                self._real_ml_predict(shard, session, flex_vals, acc_vals)
+        except Exception:
+            logger.exception("❌ ML Prediction Error")
 
     # ---------------- DEMO SEQUENCE ---------------- #
-    def _demo_sequence(self):
+    def _demo_sequence(self, session):
         now = time.time()
 
+        if self.segment:
+            # One word each time the hand settles on a sign
+            if session.segmenter.event != "hold" or now - session.last_trigger_time < 0.5:
+                return
         # debounce to avoid rapid firing
         # 2.0s delay gives you time to "Act Out" the gesture comfortably
-        if now - self.last_trigger_time < 2.0:
+        elif now - session.last_trigger_time < 2.0:
             return
 
-        self.last_trigger_time = now
+        session.last_trigger_time = now
 
-        if self.demo_index < len(WORDS):
-            word = WORDS[self.demo_index]
-            self.demo_sentence.append(word)
-            self.demo_index += 1
+        if session.demo_index < len(WORDS):
+            word = WORDS[session.demo_index]
+            session.demo_sentence.append(word)
+            session.demo_index += 1
 
-            logger.info(f"🟡 DEMO WORD → {word}")
+            logger.info(f"🟡 DEMO WORD [{session.key}] → {word}")
 
             if self.on_prediction_callback:
                 self.on_prediction_callback({
+                    "device": session.key,
                     "word": word,
                     "confidence": 94,
-                    "sentence": " ".join(self.demo_sentence),
+                    "sentence": " ".join(session.demo_sentence),
                     "final": False
                 })
         else:
@@ -110,15 +421,61 @@ class MLService:
 
             if self.on_prediction_callback:
                 self.on_prediction_callback({
+                    "device": session.key,
                     "word": "TEAM_FSOCITY",
                     "confidence": 96,
                     "sentence": FINAL_SENTENCE,
                     "final": True
                 })
 
-    # ---------------- REAL ML (UNTOUCHED) ---------------- #
-    def _real_ml_predict(self, flex_vals, acc_vals):
-        if not self.model:
+    # ---------------- REAL ML ---------------- #
+    def _shard_engine(self, shard):
+        active = self.active
+        if active is None:
+            return None
+
+        generation, forest, n_features, _, lm, _, version = active
+        if shard.generation != generation:
+            # Frames queued for the previous model are classified by it
+            if shard.engine:
+                shard.engine.flush()
+
+            buffer = None
+            predict_proba = forest.predict_proba
+            worker = shard.worker if version else None  # Workers load store versions only
+            if worker:
+                # Frames are written straight into the worker's shared memory
+                buffer = worker.buffer(self.batch_size, n_features, forest.n_classes)
+                predict_proba = functools.partial(worker.predict_proba, version=version)
+
+            if self.decoder == "beam":
+                predict, on_result = predict_proba, functools.partial(self._decode, lm)
+            elif worker:
+                predict = functools.partial(self._predict_labels, forest.classes, predict_proba)
+                on_result = self._apply_prediction
+            else:
+                predict, on_result = forest.predict, self._apply_prediction
+            shard.engine = BatchInferenceEngine(
+                predict,
+                n_features=n_features,
+                on_result=on_result,
+                batch_size=self.batch_size,
+                max_delay=self.max_batch_delay,
+                buffer=buffer,
+            )
+            shard.generation = generation
+            shard.window_size = active[3]
+            shard.calibration = active[5]
+        return shard.engine
+
+    @staticmethod
+    def _predict_labels(classes, predict_proba, X):
+        # CompiledForest.predict, over probabilities computed elsewhere
+        return classes.take(np.argmax(predict_proba(X), axis=1))
+
+    def _real_ml_predict(self, shard, session, flex_vals, acc_vals):
+        engine = self._shard_engine(shard)
+        if not engine:
             logger.warning("⚠️ Model not loaded")
             return
 
@@ -126,38 +483,151 @@ class MLService:
             logger.error("❌ Invalid sensor input length")
             return
 
-        try:
-            features = flex_vals + acc_vals
-            df = pd.DataFrame([features], columns=self.columns)
+        # Lists from serial / polling, views of the glove's FrameRing from UDP
+        features = np.concatenate((flex_vals, acc_vals))
+        if shard.calibration is not None:
+            features = (self._session_profile(session) or shard.calibration).apply(features)
 
-            prediction = self.model.predict(df)[0]
+        # Sliding-window features (only for models trained with --window)
+        if session.window_generation != shard.generation:
+            window_size = shard.window_size
+            session.window = RollingWindow(len(self.columns), window_size) if window_size else None
+            session.window_generation = shard.generation
 
-            if prediction == self.last_prediction:
-                self.stability_counter += 1
-            else:
-                self.last_prediction = prediction
-                self.stability_counter = 1
+        if self.segment and not self._holding(shard, session):
+            _SKIPPED.inc()
+            return
 
-            if self.stability_counter >= self.required_stability:
-                if prediction != self.last_stable_word:
-                    self._emit_prediction(prediction)
+        if session.window:
+            features = session.window.push(features)
+            if features is None:
+                return  # Window still filling
+
+        # Frames are classified in micro-batches (mixing sessions on this
+        # shard); each result still goes through its own session's
+        # stability counter in arrival order.
+        engine.submit(features, session)
+
+    @staticmethod
+    def _session_profile(session):
+        """The glove's assigned calibration profile (re-read when assignments change)."""
+        if session.profile_version != profile_store.version:
+            session.profile = profile_store.for_device(session.key)
+            session.profile_version = profile_store.version
+        return session.profile
+
+    def _holding(self, shard, session):
+        """Acts on the segmenter's last event; True if this frame should be classified."""
+        segmenter = session.segmenter
+        if segmenter.event == "onset":
+            # The held sign is over: the next hold starts a fresh window and
+            # may repeat the same word (on both the stability and beam paths)
+            session.last_prediction = None
+            session.stability_counter = 0
+            session.last_stable_word = None
+            if session.window:
+                session.window.reset()
+            if session.decoder is not None:
+                # Frames of the ended sign are decoded before the boundary
+                shard.engine.flush()
+                session.decoder.boundary()
+        elif segmenter.event == "rest" and session.decoder is not None:
+            # A pause ends the sentence now rather than after sentence_gap
+            shard.engine.flush()
+            if session.decoder.frames:
+                self._finish_sentence(session)
+
+        if segmenter.state == HOLD:
+            return True
+        if segmenter.state != REST:
+            session.last_frame_time = time.monotonic()  # Still signing
+        return False
+
+    def _apply_prediction(self, prediction, session):
+        if prediction == session.last_prediction:
+            session.stability_counter += 1
+        else:
+            session.last_prediction = prediction
+            session.stability_counter = 1
+
+        if session.stability_counter >= self.active_stability:
+            if prediction != session.last_stable_word:
+                self._emit_prediction(prediction, session)
+
+    # ---------------- BEAM DECODING ---------------- #
+    def _decode(self, lm, proba, session):
+        decoder = session.decoder
+        if decoder is None or decoder.lm is not lm:
+            decoder = session.decoder = BeamDecoder(lm)
+        session.last_frame_time = time.monotonic()
+
+        for word in decoder.step(proba):
+            self._emit_prediction(word, session)
+
+        # Partial sentence, whenever the best guess changes
+        hypothesis = decoder.hypothesis()
+        if hypothesis != session.hypothesis:
+            session.hypothesis = hypothesis
+            if self.on_prediction_callback and len(hypothesis) > decoder.committed:
+                self.on_prediction_callback({
+                    "device": session.key,
+                    "word": hypothesis[-1],
+                    "confidence": int(round(float(max(proba)) * 100)),
+                    "sentence": " ".join(hypothesis),
+                    "final": False,
+                    "partial": True
+                })
 
-        except Exception:
-            logger.exception("❌ ML Prediction Error")
+    def _end_sentences(self, shard, now=None):
+        """Finishes the beam-decoded sentences of this shard's quiet sessions."""
+        if now is None:
+            now = time.monotonic()
+        for session in list(session_manager.sessions.values()):
+            decoder = session.decoder
+            if decoder is None or not decoder.frames or now - session.last_frame_time < self.sentence_gap:
+                continue
+            if self.shards[hash(session.key) % len(self.shards)] is not shard:
+                continue
+            self._finish_sentence(session)
+
+    def _finish_sentence(self, session):
+        """Commits the rest of the session's beam hypothesis as one sentence."""
+        rest, words = session.decoder.finish()
+        for word in rest:
+            self._emit_prediction(word, session)
+        session.hypothesis = []
+        session.words.clear()
+        session.last_stable_word = None
+        if not words:
+            return
+
+        logger.info(f"🧾 DECODED SENTENCE [{session.key}] → {' '.join(words)}")
+        if self.on_prediction_callback:
+            self.on_prediction_callback({
+                "device": session.key,
+                "word": words[-1],
+                "confidence": 92,
+                "sentence": " ".join(words),
+                "words": words,
+                "final": True
+            })
 
     # ---------------- EMIT ---------------- #
-    def _emit_prediction(self, prediction):
-        self.last_stable_word = prediction
-        self.stability_counter = 0
-        self.last_prediction = None
+    def _emit_prediction(self, prediction, session):
+        session.last_stable_word = prediction
+        session.stability_counter = 0
+        session.last_prediction = None
+        session.words.append(prediction)
+        _WORDS.inc()
 
-        logger.info(f"🗣️ STABLE GESTURE DETECTED → {prediction}")
+        logger.info(f"🗣️ STABLE GESTURE DETECTED [{session.key}] → {prediction}")
 
         if self.on_prediction_callback:
             self.on_prediction_callback({
+                "device": session.key,
                 "word": prediction,
                 "confidence": 92,
-                "sentence": prediction,
+                "sentence": session.sentence,
                 "final": False
             })
 
@@ -0,0 +1,203 @@
+import json
+import logging
+import os
+import re
+import shutil
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+import numpy as np
+
+from services.compiled_forest import ARRAY_NAMES, OPTIONAL_ARRAY_NAMES, CompiledForest
+
+logger = logging.getLogger(__name__)
+
+CURRENT_FILE = "CURRENT"
+MANIFEST_FILE = "manifest.json"
+LOCK_FILE = ".publish.lock"
+VERSION_PATTERN = re.compile(r"^v(\d{4,})$")
+
+
+def _fsync_path(path):
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return  # Directories cannot be opened on every platform
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+class ModelStore:
+    """
+    Versioned, memory-mappable model artifacts.
+
+    Layout:
+        <root>/CURRENT            name of the active version ("v0003")
+        <root>/v0003/manifest.json
+        <root>/v0003/<table>.npy  one plain .npy file per CompiledForest table
+
+    A version directory is written under a temporary name and renamed into
+    place once complete, then CURRENT is swapped with os.replace. Readers
+    therefore only ever see fully written versions.
+
+    Publishing and activation hold `<root>/.publish.lock` (created with
+    O_EXCL), so the backend and a training run in another process never
+    claim the same version number.
+    """
+
+    def __init__(self, root, lock_timeout=30.0, stale_lock=120.0):
+        self.root = root
+        self.lock = threading.Lock()
+        self.lock_timeout = lock_timeout
+        self.stale_lock = stale_lock
+
+    @contextmanager
+    def _locked(self):
+        """Thread lock plus the cross-process lock file."""
+        path = os.path.join(self.root, LOCK_FILE)
+        with self.lock:
+            deadline = time.monotonic() + self.lock_timeout
+            while True:
+                try:
+                    fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+                    break
+                except FileExistsError:
+                    try:
+                        if time.time() - os.path.getmtime(path) > self.stale_lock:
+                            # Left behind by a crashed publisher
+                            logger.warning(f"⚠️ Removing stale model store lock {path}")
+                            os.remove(path)
+                            continue
+                    except FileNotFoundError:
+                        continue
+                    if time.monotonic() > deadline:
+                        raise TimeoutError(f"Model store {self.root} is locked by another publisher")
+                    time.sleep(0.05)
+            try:
+                os.write(fd, str(os.getpid()).encode("ascii"))
+                os.close(fd)
+                yield
+            finally:
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+
+    # ---------------- VERSIONS ---------------- #
+    def versions(self):
+        if not os.path.isdir(self.root):
+            return []
+        found = [name for name in os.listdir(self.root) if VERSION_PATTERN.match(name)]
+        return sorted(found, key=lambda name: int(VERSION_PATTERN.match(name).group(1)))
+
+    def current_version(self):
+        try:
+            with open(os.path.join(self.root, CURRENT_FILE), "r", encoding="utf-8") as f:
+                version = f.read().strip()
+        except FileNotFoundError:
+            return None
+        return version if VERSION_PATTERN.match(version) else None
+
+    def _next_version(self):
+        existing = self.versions()
+        number = int(VERSION_PATTERN.match(existing[-1]).group(1)) + 1 if existing else 1
+        return f"v{number:04d}"
+
+    # ---------------- PUBLISH ---------------- #
+    def publish(self, forest, columns, metadata=None, activate=True):
+        """
+        Write `forest` as a new version and (optionally) make it current.
+        Returns the new version name.
+        """
+        os.makedirs(self.root, exist_ok=True)
+
+        with self._locked():
+            version = self._next_version()
+            staging = os.path.join(self.root, f".{version}.tmp-{uuid.uuid4().hex}")
+            os.makedirs(staging)
+
+            try:
+                tables = {}
+                for name, array in forest.tables().items():
+                    array = np.ascontiguousarray(array)
+                    path = os.path.join(staging, f"{name}.npy")
+                    np.save(path, array)
+                    _fsync_path(path)
+                    tables[name] = {"dtype": array.dtype.str, "shape": list(array.shape)}
+
+                manifest = {
+                    "version": version,
+                    "created": time.time(),
+                    "columns": list(columns),
+                    "classes": [str(c) for c in forest.classes],
+                    "depth": forest.depth,
+                    "n_trees": forest.n_trees,
+                    "tables": tables,
+                    "metadata": metadata or {},
+                }
+                manifest_path = os.path.join(staging, MANIFEST_FILE)
+                with open(manifest_path, "w", encoding="utf-8") as f:
+                    json.dump(manifest, f, indent=2)
+                    f.flush()
+                    os.fsync(f.fileno())
+
+                os.replace(staging, os.path.join(self.root, version))
+                _fsync_path(self.root)
+            except Exception:
+                shutil.rmtree(staging, ignore_errors=True)
+                raise
+
+            if activate:
+                self._set_current(version)
+
+        logger.info(f"📦 Model version {version} published to {self.root}")
+        return version
+
+    def activate(self, version):
+        with self._locked():
+            if not os.path.isfile(os.path.join(self.root, version, MANIFEST_FILE)):
+                raise FileNotFoundError(f"Unknown model version: {version}")
+            self._set_current(version)
+
+    def _set_current(self, version):
+        tmp_path = os.path.join(self.root, f".{CURRENT_FILE}.{uuid.uuid4().hex}")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(version)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, os.path.join(self.root, CURRENT_FILE))
+
+    # ---------------- LOAD ---------------- #
+    def read_manifest(self, version):
+        with open(os.path.join(self.root, version, MANIFEST_FILE), "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def load(self, version=None, mmap=True):
+        """
+        Open a version (default: CURRENT). Tables are memory-mapped read-only,
+        so nothing is unpickled and pages are shared between processes.
+        Returns (CompiledForest, manifest).
+        """
+        version = version or self.current_version()
+        if not version:
+            raise FileNotFoundError(f"No current model version in {self.root}")
+
+        manifest = self.read_manifest(version)
+        mmap_mode = "r" if mmap else None
+
+        arrays = {}
+        for name in ARRAY_NAMES + tuple(n for n in OPTIONAL_ARRAY_NAMES if n in manifest["tables"]):
+            array = np.load(os.path.join(self.root, version, f"{name}.npy"), mmap_mode=mmap_mode, allow_pickle=False)
+            expected = manifest["tables"][name]
+            if list(array.shape) != expected["shape"] or array.dtype.str != expected["dtype"]:
+                raise ValueError(f"Model {version}: table '{name}' does not match its manifest")
+            arrays[name] = array
+
+        forest = CompiledForest(classes=manifest["classes"], depth=manifest["depth"], **arrays)
+        return forest, manifest
@@ -0,0 +1,128 @@
+import time
+
+MOVING = "moving"
+HOLD = "hold"
+REST = "rest"
+
+
+def _floats(values):
+    return values.tolist() if hasattr(values, "tolist") else values
+
+
+class _Channel:
+    """EMA-smoothed energy of one sensor group over its own noise floor."""
+
+    __slots__ = ("energy", "floor")
+
+    def __init__(self):
+        self.energy = None
+        self.floor = None
+
+    def update(self, raw, seg):
+        if self.energy is None:
+            self.energy = self.floor = raw
+        else:
+            self.energy += seg.smoothing * (raw - self.energy)
+            floor = max(self.floor, seg.min_floor)
+            if not seg.holds or (seg.state != MOVING and self.energy < seg.hold_ratio * floor):
+                rate = seg.floor_rate
+            else:
+                rate = seg.floor_rate if self.energy < self.floor else seg.floor_creep
+            self.floor += rate * (self.energy - self.floor)
+        return self.energy / max(self.floor, seg.min_floor)
+
+
+class MotionSegmenter:
+    """
+    Online sign segmentation for one glove from motion energy.
+
+    Per frame, in O(1), each sensor group gets an energy:
+        acc:  |d acc|^2    flex: |d flex|^2    gyro: |gyro|^2 (when present)
+    smoothed with an EMA and divided by that group's noise floor: the mean
+    energy while the hand is still (or before the first hold, so it can
+    find its level), which otherwise only creeps up (`floor_creep`) so a
+    long transition is not learnt as noise. Normalising per group means
+    raw ADC flex counts and m/s^2 (or g) accelerations need no weights, and
+    the loudest group decides:
+
+        MOVING -> HOLD   after `hold_frames` frames all below hold_ratio
+        HOLD   -> MOVING as soon as any group exceeds move_ratio
+        HOLD   -> REST   once the hold has lasted `rest_seconds`
+
+    REST is measured in time (`clock`), not frames, so it does not depend
+    on the glove's frame rate; the default is well beyond how long a sign
+    is normally held, so a slowly held sign is not taken for a pause.
+
+    update() returns the state; `event` is what the frame changed:
+    "onset" (motion started; any sign being held has ended), "hold" (the
+    hand settled on a sign), "rest" (still long enough to be a pause) or
+    None.
+    """
+
+    def __init__(self, hold_ratio=3.0, move_ratio=8.0, hold_frames=3, rest_seconds=4.0,
+                 smoothing=0.5, floor_rate=0.05, floor_creep=0.002, min_floor=1e-4, clock=time.monotonic):
+        self.hold_ratio = hold_ratio
+        self.move_ratio = move_ratio
+        self.hold_frames = hold_frames
+        self.rest_seconds = rest_seconds
+        self.clock = clock
+        self.smoothing = smoothing
+        self.floor_rate = floor_rate
+        self.floor_creep = floor_creep
+        self.min_floor = min_floor
+
+        self.state = MOVING  # Until the hand is seen to settle
+        self.event = None
+        self.motion = 0.0    # Loudest group's energy / noise floor
+        self.quiet = 0       # Consecutive frames below the hold threshold
+        self.held_since = 0.0  # Clock time the current hold began
+        self.prev_flex = None
+        self.prev_acc = None
+        self.channels = {"acc": _Channel(), "flex": _Channel(), "gyro": _Channel()}
+        self.onsets = 0
+        self.holds = 0
+
+    def update(self, flex, acc, gyro=None):
+        # Ring views (see frame_ring.py) are overwritten later; keep floats
+        flex, acc, gyro = _floats(flex), _floats(acc), _floats(gyro)
+        prev_flex, prev_acc = self.prev_flex, self.prev_acc
+        self.prev_flex, self.prev_acc = flex, acc
+        self.event = None
+        if prev_acc is None:
+            return self.state  # No difference to measure yet
+
+        acc_energy = 0.0
+        for a, b in zip(acc, prev_acc):
+            acc_energy += (a - b) ** 2
+        flex_energy = 0.0
+        for a, b in zip(flex, prev_flex):
+            flex_energy += (a - b) ** 2
+
+        motion = max(self.channels["acc"].update(acc_energy, self),
+                     self.channels["flex"].update(flex_energy, self))
+        if gyro is not None:
+            gyro_energy = 0.0
+            for g in gyro:
+                gyro_energy += g * g
+            motion = max(motion, self.channels["gyro"].update(gyro_energy, self))
+        self.motion = motion
+        return self._advance(motion)
+
+    def _advance(self, motion):
+        if motion > self.move_ratio:
+            self.quiet = 0
+            if self.state != MOVING:
+                self.state, self.event = MOVING, "onset"
+                self.onsets += 1
+            return self.state
+
+        self.quiet = self.quiet + 1 if motion < self.hold_ratio else 0
+        if self.state == MOVING:
+            if self.quiet >= self.hold_frames:
+                self.state, self.event = HOLD, "hold"
+                self.held_since = self.clock()
+                self.holds += 1
+        elif self.state == HOLD:
+            if self.clock() - self.held_since >= self.rest_seconds:
+                self.state, self.event = REST, "rest"
+        return self.state
@@ -0,0 +1,191 @@
+import json
+import logging
+import mmap
+import os
+import struct
+import unicodedata
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# =========================================================
+# PACK FILE
+# =========================================================
+#   magic (8) | header length (u32, little endian) | JSON header | padding
+#   int16 PCM of every clip, back to back (16-byte aligned start)
+#
+# header: {"sample_rate", "channels",
+#          "clips": {lang: {normalised phrase: [start sample, sample count]}}}
+MAGIC = b"SSPBANK1"
+ALIGN = 16
+
+
+def normalize(text):
+    """Lowercase words with punctuation removed (combining marks are kept)."""
+    cleaned = "".join(" " if unicodedata.category(ch).startswith("P") else ch for ch in str(text).lower())
+    return " ".join(cleaned.split())
+
+
+def write_pack(path, clips, sample_rate, channels=1):
+    """
+    clips: {(lang, phrase): int16 array of interleaved samples}. Written
+    under a temporary name and renamed into place.
+    """
+    index = {}
+    offset = 0
+    arrays = []
+    for (lang, phrase), pcm in clips.items():
+        pcm = np.ascontiguousarray(pcm, dtype="<i2").ravel()
+        index.setdefault(lang, {})[normalize(phrase)] = [offset, len(pcm)]
+        arrays.append(pcm)
+        offset += len(pcm)
+
+    header = json.dumps({"sample_rate": sample_rate, "channels": channels, "clips": index},
+                        ensure_ascii=False).encode("utf-8")
+    head = len(MAGIC) + 4 + len(header)
+    padding = -head % ALIGN
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(MAGIC + struct.pack("<I", len(header)) + header + b"\0" * padding)
+        for pcm in arrays:
+            f.write(pcm.tobytes())
+    os.replace(tmp, path)
+
+
+def to_format(pcm, rate, channels, target_rate, target_channels):
+    """Resamples (linear) and up/down-mixes interleaved int16 PCM."""
+    frames = pcm.reshape(-1, channels).astype(np.float32)
+    if channels != target_channels:
+        frames = np.repeat(frames.mean(axis=1, keepdims=True), target_channels, axis=1)
+    if rate != target_rate and len(frames):
+        n = int(round(len(frames) * target_rate / rate))
+        src = np.arange(len(frames))
+        pos = np.minimum(np.arange(n) * (rate / target_rate), len(frames) - 1)
+        frames = np.column_stack([np.interp(pos, src, frames[:, c]) for c in range(target_channels)])
+    return np.clip(np.rint(frames), -32768, 32767).astype(np.int16).ravel()
+
+
+class PhraseBank:
+    """
+    Pre-rendered speech clips per language, memory-mapped from a pack file
+    (see write_pack and scripts/build_phrase_bank.py).
+
+    render() returns a whole-phrase clip when there is one, and otherwise
+    stitches the longest known phrases together word by word with short
+    crossfades. Clips are views into the mapping, so opening the bank and
+    looking a phrase up costs no decoding and no copies.
+    """
+
+    def __init__(self, path, crossfade_ms=15, silence_threshold=500, pad_ms=30):
+        self.path = path
+        self.crossfade_ms = crossfade_ms
+        self.silence_threshold = silence_threshold
+        self.pad_ms = pad_ms
+
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._map[:len(MAGIC)] != MAGIC:
+            self._map.close()
+            raise ValueError(f"Not a phrase bank: {path}")
+
+        (length,) = struct.unpack_from("<I", self._map, len(MAGIC))
+        start = len(MAGIC) + 4
+        header = json.loads(self._map[start:start + length].decode("utf-8"))
+        data_offset = start + length + (-(start + length) % ALIGN)
+
+        self.sample_rate = header["sample_rate"]
+        self.channels = header["channels"]
+        self.clips = header["clips"]
+        self.samples = np.frombuffer(self._map, dtype="<i2", offset=data_offset)
+        # Longest phrase (in words) per language, bounds the greedy match
+        self.max_words = {
+            lang: max((len(p.split()) for p in phrases), default=0)
+            for lang, phrases in self.clips.items()
+        }
+
+    @classmethod
+    def open(cls, path):
+        """The bank at `path`, or None if there is none (or it is unreadable)."""
+        if not os.path.exists(path):
+            return None
+        try:
+            return cls(path)
+        except (OSError, ValueError) as e:
+            logger.error(f"❌ Phrase bank unreadable: {e}")
+            return None
+
+    def languages(self):
+        return list(self.clips)
+
+    def clip(self, phrase, lang):
+        """The clip recorded for exactly `phrase`, or None."""
+        entry = self.clips.get(lang, {}).get(normalize(phrase))
+        if entry is None:
+            return None
+        start, count = entry
+        return self.samples[start:start + count]
+
+    def plan(self, text, lang):
+        """Phrases covering `text` (longest match first), or None if a word is missing."""
+        phrases = self.clips.get(lang, {})
+        words = normalize(text).split()
+        if not words:
+            return None
+        parts = []
+        i = 0
+        while i < len(words):
+            for n in range(min(self.max_words.get(lang, 0), len(words) - i), 0, -1):
+                phrase = " ".join(words[i:i + n])
+                if phrase in phrases:
+                    parts.append(phrase)
+                    i += n
+                    break
+            else:
+                return None
+        return parts
+
+    def covers(self, text, lang):
+        return self.plan(text, lang) is not None
+
+    def render(self, text, lang):
+        """int16 PCM (interleaved, bank format) for `text`, or None."""
+        parts = self.plan(text, lang)
+        if parts is None:
+            return None
+        if len(parts) == 1:
+            return self.clip(parts[0], lang)
+        return self._join([self._trim(self.clip(p, lang)) for p in parts])
+
+    def _trim(self, pcm):
+        """Drops leading/trailing silence, keeping `pad_ms` around the speech."""
+        frames = pcm.reshape(-1, self.channels)
+        loud = np.flatnonzero(np.abs(frames.astype(np.int32)).max(axis=1) > self.silence_threshold)
+        if not len(loud):
+            return pcm
+        pad = self.sample_rate * self.pad_ms // 1000
+        start, end = max(loud[0] - pad, 0), min(loud[-1] + 1 + pad, len(frames))
+        return frames[start:end].ravel()
+
+    def _join(self, clips):
+        fade = self.sample_rate * self.crossfade_ms // 1000
+        out = clips[0].reshape(-1, self.channels).astype(np.float32)
+        for pcm in clips[1:]:
+            nxt = pcm.reshape(-1, self.channels).astype(np.float32)
+            n = min(fade, len(out), len(nxt))
+            if n:
+                ramp = np.linspace(0.0, 1.0, n, dtype=np.float32)[:, None]
+                overlap = out[-n:] * (1.0 - ramp) + nxt[:n] * ramp
+                out = np.concatenate([out[:-n], overlap, nxt[n:]])
+            else:
+                out = np.concatenate([out, nxt])
+        return np.clip(out, -32768, 32767).astype(np.int16).ravel()
+
+    def close(self):
+        self.samples = None
+        try:
+            self._map.close()
+        except BufferError:
+            pass  # A rendered clip still views the mapping; it closes with it
@@ -3,6 +3,8 @@ import threading
 import time
 import logging
 from services.data_store import data_store
+from services.sensor_recorder import sensor_recorder
+from services.wire_protocol import POLLING_FALLBACK, FrameDecoder
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -17,6 +19,7 @@ class PollingService:
         self.thread = None
         self.on_data_callback = None
         self.session = None
+        self.decoder = FrameDecoder(fallback=POLLING_FALLBACK)
 
     def register_callback(self, callback):
         self.on_data_callback = callback
@@ -48,8 +51,8 @@ class PollingService:
             try:
                 response = self.session.get(self.url, timeout=0.5)
                 if response.status_code == 200:
-                    line = response.text.strip()
-                    self._process_data(line)
+                    # Raw body: binary frame or "f1,...,gz" text (auto-detected)
+                    self._process_data(response.content)
             except requests.exceptions.Timeout:
                 pass # Expected if device is sleeping or busy
             except requests.exceptions.ConnectionError:
@@ -64,29 +67,26 @@ class PollingService:
             sleep_time = max(0, self.interval - elapsed)
             time.sleep(sleep_time)
 
-    def _process_data(self, line):
-        try:
-            # Expected: f1,f2,f3,f4,ax,ay,az,gx,gy,gz
-            parts = line.split(',')
-            if len(parts) >= 10:
-                vals = [float(x) for x in parts]
-                
-                flex_vals = vals[0:4]
-                acc_vals = vals[4:7]
-                gyr_vals = vals[7:10]
+    def _process_data(self, payload):
+        # Expected: f1,f2,f3,f4,ax,ay,az,gx,gy,gz
+        frame = self.decoder.decode(payload)
+        if frame is None or len(frame.flex) != 4 or not frame.has_gyro:
+            return  # parsing error
+        sensor_recorder.record(None, frame)
 
-                # Update Global Data Store
-                data_store.update({
-                    "flex": flex_vals,
-                    "ax": acc_vals[0], "ay": acc_vals[1], "az": acc_vals[2],
-                    "gx": gyr_vals[0], "gy": gyr_vals[1], "gz": gyr_vals[2]
-                })
+        flex_vals = frame.flex.tolist()
+        acc_vals = frame.acc.tolist()
+        gyr_vals = frame.gyro.tolist()
 
-                if self.on_data_callback:
-                    self.on_data_callback(flex_vals, acc_vals)
-                    
-        except ValueError:
-            pass # parsing error
+        # Update Global Data Store
+        data_store.update({
+            "flex": flex_vals,
+            "ax": acc_vals[0], "ay": acc_vals[1], "az": acc_vals[2],
+            "gx": gyr_vals[0], "gy": gyr_vals[1], "gz": gyr_vals[2]
+        })
+
+        if self.on_data_callback:
+            self.on_data_callback(flex_vals, acc_vals)
 
 # Global instance
 polling_service = PollingService()
@@ -0,0 +1,404 @@
+import json
+import logging
+import os
+import queue
+import re
+import struct
+import threading
+import time
+import zlib
+
+import numpy as np
+
+from services.session_manager import DEFAULT_DEVICE
+
+logger = logging.getLogger(__name__)
+
+# =========================================================
+# RECORDING LAYOUT
+# =========================================================
+#   <root>/<name>/segment-000001.srec, segment-000002.srec, ...
+#
+# A segment is an append-only sequence of blocks, one per chunk of frames:
+#   header   BLOCK_HEADER: magic b"SREC", rows, meta_len, crc32(meta + columns)
+#   meta     JSON {"devices": [...], "labels": [...]}; the device/label
+#            columns index into these lists (label 0 = unlabelled)
+#   columns  each column of COLUMNS as one contiguous little-endian array
+#
+# A crash can only leave a truncated last block, which readers skip.
+BLOCK_MAGIC = b"SREC"
+BLOCK_HEADER = struct.Struct("<4sIII")
+SEGMENT_PATTERN = "segment-{:06d}.srec"
+RECORDING_NAME = re.compile(r"[A-Za-z0-9_-][A-Za-z0-9_.-]*")
+
+MAX_FLEX = 5
+COLUMNS = (
+    ("t", "<f8", ()),              # host receive time (time.time())
+    ("device", "<u2", ()),
+    ("seq", "<i8", ()),            # -1 for text frames (no sequence number)
+    ("flex", "<f4", (MAX_FLEX,)),  # NaN-padded past the glove's flex count
+    ("acc", "<f4", (3,)),
+    ("gyro", "<f4", (3,)),         # NaN when the frame carries no gyro
+    ("label", "<u2", ()),
+)
+
+
+def _fsync_dir(path):
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return  # Directories cannot be opened on every platform
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+class _Chunk:
+    """Preallocated column buffers for up to `capacity` frames (recycled)."""
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.columns = {name: np.empty((capacity,) + shape, dtype=dtype) for name, dtype, shape in COLUMNS}
+        self.reset()
+
+    def reset(self):
+        self.rows = 0
+        self.devices = {}
+        self.labels = {"": 0}
+        self.opened = time.monotonic()
+
+    def append(self, t, device, frame, label):
+        """Copies one frame in. Returns True once the chunk is full."""
+        i = self.rows
+        c = self.columns
+        c["t"][i] = t
+        c["device"][i] = self.devices.setdefault(device, len(self.devices))
+        c["seq"][i] = -1 if frame.seq is None else frame.seq
+
+        flex = c["flex"][i]
+        n = min(len(frame.flex), MAX_FLEX)
+        flex[:n] = frame.flex[:n]
+        flex[n:] = np.nan
+        c["acc"][i] = frame.acc[:3]
+        if frame.has_gyro:
+            c["gyro"][i] = frame.gyro[:3]
+        else:
+            c["gyro"][i] = np.nan
+        c["label"][i] = self.labels.setdefault(label or "", len(self.labels))
+
+        self.rows += 1
+        return self.rows >= self.capacity
+
+    def encode(self):
+        """Returns (header, parts) for one block; parts are zero-copy views."""
+        meta = json.dumps({"devices": list(self.devices), "labels": list(self.labels)}).encode("utf-8")
+        parts = [meta] + [self.columns[name][:self.rows].reshape(-1).view(np.uint8) for name, _, _ in COLUMNS]
+        crc = 0
+        for part in parts:
+            crc = zlib.crc32(part, crc)
+        return BLOCK_HEADER.pack(BLOCK_MAGIC, self.rows, len(meta), crc), parts
+
+
+class SensorRecorder:
+    """
+    Tees decoded glove frames from every transport into an on-disk log.
+
+    `record()` (the ingest hot path) only copies the frame into a
+    preallocated chunk. Full chunks, and partial chunks older than
+    `flush_interval`, are written by a background thread as columnar
+    blocks. The file is fsynced at most every `fsync_interval` seconds, and
+    the segment is rotated at `max_segment_bytes` or `max_segment_seconds`.
+    If the disk falls behind by more than `max_pending` chunks, frames are
+    dropped and counted rather than stalling ingest.
+    """
+
+    def __init__(self, root, chunk_frames=4096, flush_interval=1.0, fsync_interval=5.0,
+                 max_segment_bytes=64 * 1024 * 1024, max_segment_seconds=600.0, max_pending=256):
+        self.root = root
+        self.chunk_frames = chunk_frames
+        self.flush_interval = flush_interval
+        self.fsync_interval = fsync_interval
+        self.max_segment_bytes = max_segment_bytes
+        self.max_segment_seconds = max_segment_seconds
+
+        self.active = False
+        self.path = None
+        self.lock = threading.Lock()
+        self.chunk = None
+        self.pending = queue.Queue(maxsize=max_pending)
+        self.free = queue.Queue()
+        self.thread = None
+        self.error = None  # Why the writer thread died, if it did
+
+        # Labels: per device, falling back to the default label
+        self.default_label = None
+        self.labels = {}
+
+        # Writer state (writer thread only)
+        self.file = None
+        self.segment_index = 0
+        self.segment_bytes = 0
+        self.segment_opened = 0.0
+        self.last_sync = 0.0
+        self.unsynced = False
+
+        self.frames_recorded = 0
+        self.frames_written = 0
+        self.frames_dropped = 0
+
+    # ---------------- CONTROL ---------------- #
+    def start(self, name=None, label=None):
+        with self.lock:
+            if self.active:
+                return self.path
+
+            name = name or time.strftime("%Y%m%d-%H%M%S")
+            if not RECORDING_NAME.fullmatch(name):
+                # A plain directory name under root: no separators, no "..", no dotfiles
+                raise ValueError(f"Invalid recording name: {name!r}")
+            self.path = os.path.join(self.root, name)
+            os.makedirs(self.path, exist_ok=True)
+
+            # Chunks a crashed writer never got to
+            while not self.pending.empty():
+                chunk = self.pending.get_nowait()
+                if chunk is not None:
+                    self.free.put(chunk)
+
+            existing = [f for f in os.listdir(self.path) if f.endswith(".srec")]
+            self.segment_index = len(existing)
+            self.default_label = label
+            self.labels = {}
+            self.frames_recorded = self.frames_written = self.frames_dropped = 0
+            self.error = None
+            self.chunk = self._new_chunk()
+
+            self.active = True
+            self.thread = threading.Thread(target=self._run, name="sensor-recorder", daemon=True)
+            self.thread.start()
+
+        logger.info(f"⏺️ RECORDING to {self.path}")
+        return self.path
+
+    def stop(self):
+        """Ends the recording; stats()["error"] is set if the writer failed."""
+        with self.lock:
+            active, self.active = self.active, False
+            chunk, self.chunk = self.chunk, None
+            thread, self.thread = self.thread, None
+        if thread is None:
+            return self.stats()
+
+        if active:
+            if chunk.rows:
+                self.pending.put(chunk)
+            self.pending.put(None)
+        thread.join()  # Also a writer that died on its own
+
+        if self.error is not None:
+            logger.error(f"❌ RECORDING FAILED: {self.error!r} ({self.stats()})")
+        else:
+            logger.info(f"⏹️ RECORDING STOPPED ({self.stats()})")
+        return self.stats()
+
+    def set_label(self, label, device=None):
+        """Label for subsequent frames of `device` (or every device)."""
+        with self.lock:
+            if device is None:
+                self.default_label = label
+                self.labels = {}
+            elif label is None:
+                self.labels.pop(device, None)
+            else:
+                self.labels[device] = label
+
+    def stats(self):
+        return {
+            "active": self.active,
+            "path": self.path,
+            "segments": self.segment_index,
+            "recorded": self.frames_recorded,
+            "written": self.frames_written,
+            "dropped": self.frames_dropped,
+            "error": None if self.error is None else repr(self.error),
+        }
+
+    # ---------------- INGEST (any thread) ---------------- #
+    def record(self, device, frame, t=None):
+        """device: session key (None = the single-glove default session)."""
+        if not self.active:
+            return
+        if t is None:
+            t = time.time()
+        device = device or DEFAULT_DEVICE
+
+        with self.lock:
+            if not self.active:
+                return
+            label = self.labels.get(device, self.default_label)
+            self.frames_recorded += 1
+            if self.chunk.append(t, device, frame, label):
+                self._submit_locked()
+
+    def _new_chunk(self):
+        try:
+            chunk = self.free.get_nowait()
+            chunk.reset()
+            return chunk
+        except queue.Empty:
+            return _Chunk(self.chunk_frames)
+
+    def _submit_locked(self):
+        chunk, self.chunk = self.chunk, self._new_chunk()
+        try:
+            self.pending.put_nowait(chunk)
+        except queue.Full:
+            self.frames_dropped += chunk.rows
+            self.free.put(chunk)
+            logger.warning("⚠️ Recorder falling behind the disk, frames dropped")
+
+    # ---------------- WRITER THREAD ---------------- #
+    def _run(self):
+        try:
+            while True:
+                try:
+                    chunk = self.pending.get(timeout=self.flush_interval)
+                except queue.Empty:
+                    # Idle or slow stream: write out a stale partial chunk
+                    with self.lock:
+                        if self.active and self.chunk.rows and \
+                                time.monotonic() - self.chunk.opened >= self.flush_interval:
+                            self._submit_locked()
+                    self._sync(force=False)
+                    continue
+
+                if chunk is None:
+                    break
+                self._write(chunk)
+                self.free.put(chunk)
+                self._sync(force=False)
+        except Exception as e:
+            logger.exception("❌ Recorder write failed")
+            self.error = e
+            with self.lock:
+                # Stop taking frames; stats() shows the recording ended
+                self.active = False
+                self.chunk = None
+        finally:
+            try:
+                self._close_segment()
+            except OSError:
+                logger.exception("❌ Recorder close failed")
+                self.file = None
+
+    def _write(self, chunk):
+        now = time.monotonic()
+        if self.file is None or self.segment_bytes >= self.max_segment_bytes or \
+                now - self.segment_opened >= self.max_segment_seconds:
+            self._close_segment()
+            self._open_segment()
+
+        header, parts = chunk.encode()
+        self.file.write(header)
+        size = len(header)
+        for part in parts:
+            self.file.write(part)
+            size += len(part)
+
+        self.segment_bytes += size
+        self.frames_written += chunk.rows
+        self.unsynced = True
+
+    def _open_segment(self):
+        self.segment_index += 1
+        path = os.path.join(self.path, SEGMENT_PATTERN.format(self.segment_index))
+        self.file = open(path, "ab")
+        self.segment_bytes = 0
+        self.segment_opened = self.last_sync = time.monotonic()
+        _fsync_dir(self.path)
+
+    def _sync(self, force):
+        if not self.unsynced or self.file is None:
+            return
+        if force or time.monotonic() - self.last_sync >= self.fsync_interval:
+            self.file.flush()
+            os.fsync(self.file.fileno())
+            self.last_sync = time.monotonic()
+            self.unsynced = False
+
+    def _close_segment(self):
+        if self.file is None:
+            return
+        self._sync(force=True)
+        self.file.close()
+        self.file = None
+
+
+# ---------------- READING ---------------- #
+def read_segment(path):
+    """Yields (meta, columns) per intact block; stops at a torn/corrupt tail."""
+    with open(path, "rb") as f:
+        data = f.read()
+
+    offset = 0
+    while offset + BLOCK_HEADER.size <= len(data):
+        magic, rows, meta_len, crc = BLOCK_HEADER.unpack_from(data, offset)
+        if magic != BLOCK_MAGIC:
+            logger.warning(f"⚠️ {path}: bad block at byte {offset}, rest ignored")
+            return
+        start = offset + BLOCK_HEADER.size
+        size = meta_len + sum(rows * np.dtype(dtype).itemsize * int(np.prod(shape)) for _, dtype, shape in COLUMNS)
+        if start + size > len(data):
+            return  # Truncated last block (crash mid-write)
+        if zlib.crc32(memoryview(data)[start:start + size]) != crc:
+            logger.warning(f"⚠️ {path}: checksum mismatch at byte {offset}, rest ignored")
+            return
+
+        meta = json.loads(data[start:start + meta_len].decode("utf-8"))
+        pos = start + meta_len
+        columns = {}
+        for name, dtype, shape in COLUMNS:
+            count = rows * int(np.prod(shape))
+            columns[name] = np.frombuffer(data, dtype=dtype, count=count, offset=pos).reshape((rows,) + shape)
+            pos += count * np.dtype(dtype).itemsize
+
+        yield meta, columns
+        offset = start + size
+
+
+def load_recording(path):
+    """
+    All frames of a recording directory (or one segment file) as columns;
+    `device` and `label` are resolved to string arrays.
+    """
+    if os.path.isdir(path):
+        files = [os.path.join(path, f) for f in sorted(os.listdir(path)) if f.endswith(".srec")]
+    else:
+        files = [path]
+
+    blocks = {name: [] for name, _, _ in COLUMNS}
+    for file in files:
+        for meta, columns in read_segment(file):
+            for name, _, _ in COLUMNS:
+                values = columns[name]
+                if name in ("device", "label"):
+                    values = np.asarray(meta[name + "s"], dtype=object)[values]
+                blocks[name].append(values)
+
+    out = {}
+    for name, dtype, shape in COLUMNS:
+        if blocks[name]:
+            out[name] = np.concatenate(blocks[name])
+        elif name in ("device", "label"):
+            out[name] = np.empty(0, dtype=object)
+        else:
+            out[name] = np.empty((0,) + shape, dtype=dtype)
+    return out
+
+
+# Global instance
+_base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sensor_recorder = SensorRecorder(os.path.join(_base_dir, "recordings"))
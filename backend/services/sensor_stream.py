@@ -0,0 +1,68 @@
+import asyncio
+import time
+
+
+class SensorStream:
+    """
+    Pushes DataStore changes to one client (WebSocket or SSE).
+
+    DataStore.update only sets an asyncio.Event, so any number of updates
+    between two messages are coalesced: the client receives one delta with
+    every key written since its previous message (DataStore.changes_since),
+    at most `max_hz` times per second. The first message is the full
+    snapshot; every message carries the store `version` it reflects.
+    """
+
+    def __init__(self, store, max_hz=20.0, heartbeat=15.0):
+        self.store = store
+        self.min_interval = 1.0 / max_hz
+        self.heartbeat = heartbeat
+        self.loop = asyncio.get_running_loop()
+        self.changed = asyncio.Event()
+        self.wakeup_pending = False
+        self.version = None
+
+    def _on_update(self):
+        # Called on the updating thread; one loop wakeup per pending change
+        if not self.wakeup_pending:
+            self.wakeup_pending = True
+            self.loop.call_soon_threadsafe(self.changed.set)
+
+    def _delta(self):
+        version, changed = self.store.changes_since(self.version)
+        self.version = version
+        if changed:
+            changed["version"] = version
+        return changed
+
+    async def deltas(self):
+        """
+        Yields change dicts, or None after `heartbeat` seconds without
+        changes (so SSE can send a keep-alive comment).
+        """
+        self.store.subscribe(self._on_update)
+        try:
+            yield self._delta()
+            last_sent = time.monotonic()
+
+            while True:
+                try:
+                    await asyncio.wait_for(self.changed.wait(), self.heartbeat)
+                except asyncio.TimeoutError:
+                    yield None
+                    continue
+
+                # Rate limit: later updates keep landing in the same delta
+                wait = self.min_interval - (time.monotonic() - last_sent)
+                if wait > 0:
+                    await asyncio.sleep(wait)
+
+                self.changed.clear()
+                self.wakeup_pending = False
+
+                delta = self._delta()
+                if delta:
+                    yield delta
+                    last_sent = time.monotonic()
+        finally:
+            self.store.unsubscribe(self._on_update)
@@ -0,0 +1,146 @@
+import functools
+import json
+import re
+from collections import namedtuple
+
+# Words of an ML word stream: gesture labels like TEAM_FSOCITY split on "_"
+_TOKEN = re.compile(r"[^\W_]+(?:'[^\W_]+)*")
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+WILDCARD = "*"
+
+# key: what patterns match, text: what is spoken, tag: matched by "<tag>"
+Unit = namedtuple("Unit", "key text tag")
+
+
+def tokenize(text):
+    return _TOKEN.findall(str(text).lower())
+
+
+def finish(text):
+    """Sentence case and a final full stop (TTS pauses on punctuation)."""
+    text = text.strip().rstrip(",").strip()
+    if not text:
+        return ""
+    if text[-1] not in ".!?":
+        text += "."
+    return " ".join(s[0].upper() + s[1:] for s in _SENTENCE_END.split(text))
+
+
+class _Node:
+    __slots__ = ("children", "value")
+
+    def __init__(self):
+        self.children = {}
+        self.value = None
+
+
+class SentenceRules:
+    """
+    Rule-based sentence builder for recognised word streams.
+
+    labels:    token phrases ("team fsocity") turned into one spoken unit
+               ("Team Fsociety") with a tag ("name").
+    templates: unit patterns with literal words, "<tag>" and "*" (any unit),
+               and an output with {0}, {1}... for the matched units'
+               text, e.g. {"pattern": "i *", "output": "I am {1}."}.
+
+    Both live in token tries, so a sentence is matched in one left-to-right
+    pass: at each position only the patterns that share a prefix with the
+    upcoming units are tried (at most the longest pattern's length), and
+    the longest match wins (the earliest rule on ties). Results are memoized.
+    """
+
+    def __init__(self, labels=(), templates=(), cache_size=4096):
+        self.labels = _Node()
+        self.templates = _Node()
+        self.label_words = 0
+        self.rules = 0
+        for label in labels:
+            self.add_label(label["phrase"], label["text"], label.get("tag", "word"))
+        for template in templates:
+            self.add_template(template["pattern"], template["output"])
+        self.correct = functools.lru_cache(maxsize=cache_size)(self._correct)
+
+    @classmethod
+    def load(cls, path, **kwargs):
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(data.get("labels", ()), data.get("templates", ()), **kwargs)
+
+    # ---------------- RULES ---------------- #
+    def add_label(self, phrase, text, tag="word"):
+        tokens = tokenize(phrase)
+        if not tokens:
+            raise ValueError(f"Empty label phrase: {phrase!r}")
+        node = self.labels
+        for token in tokens:
+            node = node.children.setdefault(token, _Node())
+        node.value = Unit(text.lower(), text, tag)
+        self.label_words = max(self.label_words, len(tokens))
+
+    def add_template(self, pattern, output):
+        keys = pattern.lower().split()
+        if not keys:
+            raise ValueError(f"Empty template pattern: {pattern!r}")
+        node = self.templates
+        for key in keys:
+            node = node.children.setdefault(key, _Node())
+        if node.value is None:  # The first rule for a pattern wins
+            node.value = (self.rules, output)
+        self.rules += 1
+
+    # ---------------- MATCHING ---------------- #
+    def units(self, text):
+        """Labelled, de-duplicated units of `text` (repeats of a gesture collapse)."""
+        tokens = tokenize(text)
+        units = []
+        i = 0
+        while i < len(tokens):
+            node, unit, length = self.labels, None, 1
+            for j in range(i, min(i + self.label_words, len(tokens))):
+                node = node.children.get(tokens[j])
+                if node is None:
+                    break
+                if node.value is not None:
+                    unit, length = node.value, j - i + 1
+            if unit is None:
+                unit = Unit(tokens[i], tokens[i], "word")
+            if not units or units[-1].key != unit.key:
+                units.append(unit)
+            i += length
+        return units
+
+    def _match(self, units, i):
+        """(length, output) of the best template starting at units[i], or None."""
+        best = None
+        stack = [(self.templates, i)]
+        while stack:
+            node, j = stack.pop()
+            if node.value is not None:
+                order, output = node.value
+                if best is None or j - i > best[0] or (j - i == best[0] and order < best[1]):
+                    best = (j - i, order, output)
+            if j == len(units):
+                continue
+            unit = units[j]
+            for key in (unit.key, f"<{unit.tag}>", WILDCARD):
+                child = node.children.get(key)
+                if child is not None:
+                    stack.append((child, j + 1))
+        return (best[0], best[2]) if best else None
+
+    def _correct(self, text):
+        units = self.units(text)
+        pieces = []
+        i = 0
+        while i < len(units):
+            match = self._match(units, i)
+            if match:
+                length, output = match
+                pieces.append(output.format(*(u.text for u in units[i:i + length])))
+                i += length
+            else:
+                pieces.append(units[i].text)
+                i += 1
+        return finish(" ".join(pieces))
@@ -4,6 +4,8 @@ import threading
 import time
 import logging
 from services.data_store import data_store
+from services.sensor_recorder import sensor_recorder
+from services.wire_protocol import FrameDecoder
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -18,6 +20,7 @@ class SerialService:
         self.thread = None
         self.lock = threading.Lock()
         self.on_data_callback = None # Callback function(flex_vals, acc_vals)
+        self.decoder = FrameDecoder()
 
     def register_callback(self, callback):
         """Register a function to be called when valid data is received"""
@@ -69,31 +72,29 @@ class SerialService:
     def _read_loop(self):
         while self.running and self.ser and self.ser.is_open:
             try:
-                line = self.ser.readline().decode('utf-8', errors='ignore').strip()
+                line = self.ser.readline()
                 if not line:
                     continue
-                
+
                 # Expecting format: "f1,f2,f3,f4,ax,ay,az" (7 values)
-                if "," in line:
-                    parts = line.split(',')
-                    if len(parts) >= 7:
-                        # Parse values
-                        vals = [float(x) for x in parts[:7]]
-                        
-                        flex_vals = vals[0:4]
-                        acc_vals = vals[4:7] # ax, ay, az
+                frame = self.decoder.decode(line)
+                if frame is not None:
+                    sensor_recorder.record(None, frame)
+                if frame is not None and len(frame.flex) == 4:
+                    flex_vals = frame.flex.tolist()
+                    acc_vals = frame.acc.tolist()
 
-                        # Update Global Data Store (Legacy support for frontend)
-                        data_store.update({
-                            "flex": flex_vals,
-                            "ax": acc_vals[0], "ay": acc_vals[1], "az": acc_vals[2],
-                            # Zero out gyro/others if not present in this format
-                            "gx": 0, "gy": 0, "gz": 0
-                        })
+                    # Update Global Data Store (Legacy support for frontend)
+                    data_store.update({
+                        "flex": flex_vals,
+                        "ax": acc_vals[0], "ay": acc_vals[1], "az": acc_vals[2],
+                        # Zero out gyro/others if not present in this format
+                        "gx": 0, "gy": 0, "gz": 0
+                    })
 
-                        # Trigger Callback for ML
-                        if self.on_data_callback:
-                            self.on_data_callback(flex_vals, acc_vals)
+                    # Trigger Callback for ML
+                    if self.on_data_callback:
+                        self.on_data_callback(flex_vals, acc_vals)
 
             except (ValueError, IndexError):
                 continue # Ignore parse errors (common during startup)
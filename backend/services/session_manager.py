@@ -0,0 +1,154 @@
+import threading
+import time
+from collections import deque
+
+from services.data_store import DataStore
+from services.metrics import metrics
+from services.motion_segmenter import MotionSegmenter
+
+DEFAULT_DEVICE = "default"
+
+# Kept in the registry, not the session, so it survives session expiry
+_FRAMES_LOST = metrics.counter(
+    "signspeak_frames_lost_total", "Frames missing from binary sequence numbers", labels=("device",))
+
+
+class GloveSession:
+    """
+    Everything that belongs to one glove: its DataStore snapshot, packet
+    sequence tracking, the motion segmenter, rolling feature window and
+    stability state used by MLService, and the words recognised so far.
+
+    The ML fields are only touched by the inference shard the session is
+    hashed to, so they need no lock of their own.
+    """
+
+    def __init__(self, key, max_words=20):
+        self.key = key
+        self.store = DataStore()
+        self.created = time.time()
+        self.last_seen = self.created
+
+        # Decoder state (binary frames only)
+        self.last_seq = None
+        self.lost = 0
+
+        # Rolling window, rebuilt whenever a new model generation is active
+        self.window = None
+        self.window_generation = None
+
+        # Stability
+        self.last_prediction = None
+        self.stability_counter = 0
+        self.last_stable_word = None
+
+        # Sentence buffer
+        self.words = deque(maxlen=max_words)
+        self.last_spoken_sentence = None
+
+        # Calibration: the assigned profile (resolved by MLService) and an
+        # in-progress capture for a new one
+        self.profile = None
+        self.profile_version = None
+        self.capture = None
+
+        # Sign onset / hold / rest from motion energy
+        self.segmenter = MotionSegmenter()
+
+        # Beam-search decoder (rebuilt with the model's language model)
+        self.decoder = None
+        self.hypothesis = []
+        self.last_frame_time = 0.0
+
+        # Demo sequence state
+        self.demo_index = 0
+        self.demo_sentence = []
+        self.last_trigger_time = 0
+
+    @property
+    def sentence(self):
+        return " ".join(self.words)
+
+    def update(self, values):
+        self.last_seen = time.time()
+        self.store.update(values)
+
+    def track_seq(self, seq):
+        """Counts frames lost between consecutive sequence numbers."""
+        if seq is None:
+            return
+        if self.last_seq is not None:
+            gap = (seq - self.last_seq - 1) & 0xFFFFFFFF
+            if gap >= 0x80000000:
+                return  # Late (reordered) or replayed frame
+            self.lost += gap
+            if gap:
+                _FRAMES_LOST.inc(gap, self.key)
+        self.last_seq = seq
+
+    def snapshot(self):
+        data = self.store.get()
+        data.update({
+            "device": self.key,
+            "lost": self.lost,
+        })
+        return data
+
+
+class SessionManager:
+    """Glove sessions keyed by device id (binary frames) or source address."""
+
+    def __init__(self, idle_timeout=60.0):
+        self.idle_timeout = idle_timeout
+        self.sessions = {}
+        self.lock = threading.Lock()
+        self.expire_callbacks = []
+
+    @staticmethod
+    def key_for(frame, addr=None):
+        if frame is not None and frame.binary:
+            return f"glove-{frame.device_id}"
+        if addr:
+            return addr[0]
+        return DEFAULT_DEVICE
+
+    def get(self, key=None):
+        key = key or DEFAULT_DEVICE
+        session = self.sessions.get(key)
+        if session is None:
+            with self.lock:
+                session = self.sessions.get(key)
+                if session is None:
+                    session = self.sessions[key] = GloveSession(key)
+        return session
+
+    def find(self, key=None):
+        """An existing session, or None (only ingest creates sessions)."""
+        return self.sessions.get(key or DEFAULT_DEVICE)
+
+    def expire(self, now=None):
+        """Drops sessions that have been silent for `idle_timeout` seconds."""
+        if now is None:
+            now = time.time()
+        with self.lock:
+            stale = [k for k, s in self.sessions.items() if now - s.last_seen > self.idle_timeout]
+            for key in stale:
+                del self.sessions[key]
+        for key in stale:
+            for callback in self.expire_callbacks:
+                callback(key)
+        return stale
+
+    def on_expire(self, callback):
+        """callback(key) for every expired session (per-glove state held elsewhere)."""
+        if callback not in self.expire_callbacks:
+            self.expire_callbacks.append(callback)
+
+    def snapshot(self):
+        with self.lock:
+            sessions = list(self.sessions.values())
+        return {s.key: s.snapshot() for s in sessions}
+
+
+# Global Instance
+session_manager = SessionManager()
@@ -2,6 +2,8 @@ import socket
 import threading
 import logging
 from services.data_store import data_store
+from services.sensor_recorder import sensor_recorder
+from services.wire_protocol import TCP_CSV_LAYOUTS, FrameDecoder
 
 logger = logging.getLogger(__name__)
 
@@ -12,6 +14,7 @@ class TcpService:
         self.server_socket = None
         self.running = False
         self.thread = None
+        self.decoder = FrameDecoder(TCP_CSV_LAYOUTS)
 
     def start(self):
         if self.running:
@@ -71,39 +74,26 @@ class TcpService:
             logger.info("📱 ESP32 DISCONNECTED")
 
     def _parse_line(self, line):
-        try:
-            # Expected: f1,f2,f3,ax,ay,az,gx,gy,gz (9 values)
-            parts = line.split(',')
-            
-            # Support both 9 (3 Flex) and 11 (5 Flex) formats
-            if len(parts) == 9:
-                flex_raw = [float(x) for x in parts[:3]]
-                # Map 3 sensors to 5-slot array
-                # Assuming setup: [Thumb, Index, Middle, Ring, Pinky]
-                # Firmware sends: [Flex1, Flex2, Flex3]
-                # Map to: [0, Flex1, Flex2, Flex3, 0] (Adjust as needed!)
-                flex = [flex_raw[0], flex_raw[1], flex_raw[2], 0, 0] 
+        # Expected: f1,f2,f3,ax,ay,az,gx,gy,gz (9 values)
+        # Support both 9 (3 Flex) and 11 (5 Flex) formats
+        frame = self.decoder.decode(line)
+        if frame is None or not frame.has_gyro:
+            return  # Ignore corrupt packets
+        sensor_recorder.record(None, frame)
 
-                imu = [float(x) for x in parts[3:]]
-                
-                data_store.update({
-                    "flex": flex,
-                    "ax": imu[0], "ay": imu[1], "az": imu[2],
-                    "gx": imu[3], "gy": imu[4], "gz": imu[5]
-                })
-
-            elif len(parts) == 11:
-                flex = [float(x) for x in parts[:5]]
-                imu = [float(x) for x in parts[5:]]
-                
-                data_store.update({
-                    "flex": flex,
-                    "ax": imu[0], "ay": imu[1], "az": imu[2],
-                    "gx": imu[3], "gy": imu[4], "gz": imu[5]
-                })
+        # Map sensors to the 5-slot array
+        # Assuming setup: [Thumb, Index, Middle, Ring, Pinky]
+        # Firmware sends: [Flex1, Flex2, Flex3]
+        # Map to: [Flex1, Flex2, Flex3, 0, 0] (Adjust as needed!)
+        flex = frame.flex.tolist()
+        flex += [0] * (5 - len(flex))
+        imu = frame.acc.tolist() + frame.gyro.tolist()
 
-        except ValueError:
-            pass # Ignore corrupt packets
+        data_store.update({
+            "flex": flex,
+            "ax": imu[0], "ay": imu[1], "az": imu[2],
+            "gx": imu[3], "gy": imu[4], "gz": imu[5]
+        })
 
 # Global Instance
 tcp_service = TcpService()
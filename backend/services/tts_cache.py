@@ -0,0 +1,154 @@
+import hashlib
+import logging
+import os
+import threading
+import uuid
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+
+def cache_key(text, lang, voice):
+    """Content address of one utterance (whitespace-normalised text)."""
+    text = " ".join(str(text).split())
+    return hashlib.blake2b(f"{voice}\0{lang}\0{text}".encode("utf-8"), digest_size=16).hexdigest()
+
+
+class TTSCache:
+    """
+    Synthesized speech, content-addressed by (text, lang, voice).
+
+    Layout:
+        <root>/<key>.mp3
+
+    Recently played clips are also kept in memory, up to `max_memory_bytes`.
+    The disk copy is capped at `max_disk_bytes`. Both evict least recently
+    used first. Files are written under a temporary name and renamed into
+    place, so a crash never leaves a truncated clip behind.
+    """
+
+    def __init__(self, root, max_memory_bytes=16 * 1024 * 1024, max_disk_bytes=256 * 1024 * 1024):
+        self.root = root
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self.lock = threading.Lock()
+
+        self.memory = OrderedDict()  # key -> bytes
+        self.memory_bytes = 0
+        self.disk = OrderedDict()    # key -> size, least recently used first
+        self.disk_bytes = 0
+
+        self.hits = 0
+        self.misses = 0
+        self._scan()
+
+    def _path(self, key):
+        return os.path.join(self.root, f"{key}.mp3")
+
+    def _scan(self):
+        if not os.path.isdir(self.root):
+            return
+        entries = []
+        for name in os.listdir(self.root):
+            path = os.path.join(self.root, name)
+            if name.startswith(".tmp-"):
+                os.remove(path)  # Left over from an interrupted write
+            elif name.endswith(".mp3"):
+                stat = os.stat(path)
+                entries.append((stat.st_mtime, name[:-4], stat.st_size))
+        for _, key, size in sorted(entries):
+            self.disk[key] = size
+            self.disk_bytes += size
+
+    # ---------------- READ ---------------- #
+    def get(self, key):
+        """Audio bytes for `key`, or None (counted as a miss)."""
+        with self.lock:
+            data = self.memory.get(key)
+            if data is not None:
+                self.memory.move_to_end(key)
+                if key in self.disk:
+                    self.disk.move_to_end(key)
+                self.hits += 1
+                return data
+            on_disk = key in self.disk
+
+        if on_disk:
+            try:
+                with open(self._path(key), "rb") as f:
+                    data = f.read()
+                os.utime(self._path(key))  # LRU order survives restarts
+            except OSError:
+                data = None
+            with self.lock:
+                if data is None:
+                    self.disk_bytes -= self.disk.pop(key, 0)
+                else:
+                    self.disk.move_to_end(key)
+                    self._remember_locked(key, data)
+                    self.hits += 1
+                    return data
+
+        with self.lock:
+            self.misses += 1
+        return None
+
+    def __contains__(self, key):
+        with self.lock:
+            return key in self.memory or key in self.disk
+
+    # ---------------- WRITE ---------------- #
+    def put(self, key, data):
+        os.makedirs(self.root, exist_ok=True)
+        tmp = os.path.join(self.root, f".tmp-{uuid.uuid4().hex}")
+        try:
+            with open(tmp, "wb") as f:
+                f.write(data)
+            os.replace(tmp, self._path(key))
+        except OSError as e:
+            logger.error(f"❌ TTS cache write failed: {e}")
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            evicted = []
+        else:
+            with self.lock:
+                self.disk_bytes += len(data) - self.disk.pop(key, 0)
+                self.disk[key] = len(data)
+                evicted = self._evict_disk_locked()
+
+        with self.lock:
+            self._remember_locked(key, data)
+
+        for old in evicted:
+            try:
+                os.remove(self._path(old))
+            except OSError:
+                pass
+
+    def _remember_locked(self, key, data):
+        if len(data) > self.max_memory_bytes:
+            return
+        self.memory_bytes += len(data) - len(self.memory.pop(key, b""))
+        self.memory[key] = data
+        while self.memory_bytes > self.max_memory_bytes:
+            _, old = self.memory.popitem(last=False)
+            self.memory_bytes -= len(old)
+
+    def _evict_disk_locked(self):
+        evicted = []
+        while self.disk_bytes > self.max_disk_bytes and len(self.disk) > 1:
+            key, size = self.disk.popitem(last=False)
+            self.disk_bytes -= size
+            evicted.append(key)
+        return evicted
+
+    def stats(self):
+        with self.lock:
+            return {
+                "entries": len(self.disk),
+                "disk_bytes": self.disk_bytes,
+                "memory_entries": len(self.memory),
+                "memory_bytes": self.memory_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
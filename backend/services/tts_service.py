@@ -3,13 +3,33 @@ import threading
 import logging
 import asyncio
 import edge_tts
+import heapq
+import io
+import itertools
 import os
-import tempfile
-import uuid
+import time
 import pygame
+from services.audio_stream import StreamPlayer
+from services.metrics import metrics, stage_seconds
+from services.phrase_bank import PhraseBank, to_format
+from services.tts_cache import TTSCache, cache_key
 
 logger = logging.getLogger(__name__)
 
+# Cached clips are streamed to HTTP clients in pieces of this size
+STREAM_CHUNK_BYTES = 16 * 1024
+
+# Utterance priorities (lower plays first)
+PRIORITY_SENTENCE = 0
+PRIORITY_NORMAL = 1
+
+_SYNTHESIS = stage_seconds.labels("tts_synthesis")
+_PLAYBACK = stage_seconds.labels("tts_playback")
+_FALLBACK = stage_seconds.labels("tts_fallback")
+_LOCAL = stage_seconds.labels("tts_local")
+_FIRST_AUDIO = stage_seconds.labels("tts_first_audio")
+_REQUESTS = metrics.counter("signspeak_tts_requests_total", "Sentences sent to text-to-speech")
+
 
 # =========================================================
 # OFFLINE TRANSLATION MAP (FIXED SENTENCE TRANSLATION)
@@ -30,9 +50,70 @@ OFFLINE_SENTENCE_TRANSLATIONS = {
 }
 
 
+class StreamInterrupted(RuntimeError):
+    """Edge TTS failed after part of the utterance had already been played."""
+
+
+class Utterance:
+    """One queued speak() request."""
+
+    __slots__ = ("text", "lang", "play", "output_file", "priority", "key", "seq")
+
+    def __init__(self, text, lang, play, output_file, priority, key, seq):
+        self.text = text
+        self.lang = lang
+        self.play = play
+        self.output_file = output_file
+        self.priority = priority
+        self.key = key
+        self.seq = seq
+
+    def same_as(self, other):
+        return (self.text, self.lang, self.play, self.output_file) == \
+               (other.text, other.lang, other.play, other.output_file)
+
+
 class TTSService:
-    def __init__(self):
-        self.lock = threading.Lock()
+    """
+    Text-to-speech on one long-lived worker thread with its own event loop.
+
+    speak() only queues an Utterance. The queue is ordered by priority,
+    then arrival, and holds at most `max_queue` entries (the least urgent,
+    oldest one is dropped). A request identical to one already queued or
+    playing is coalesced, and one with the same `key` (e.g. the sentence of
+    one glove) supersedes the older one: it is removed from the queue, or
+    cut off if it is already playing. stop() cancels everything.
+    """
+
+    def __init__(self, cache_dir="tts_cache", streaming=True, max_queue=8,
+                 bank_file=os.path.join("phrase_bank", "phrases.pack")):
+        self.lock = threading.Condition()
+
+        # Play uncached speech while it is still being synthesized
+        self.streaming = streaming
+        self.player = None
+
+        # Worker state (started on the first speak())
+        self.max_queue = max_queue
+        self.queue = []          # heap of (priority, seq, Utterance)
+        self.seq = itertools.count()
+        self.current = None
+        self.current_task = None
+        self.loop = None
+        self.thread = None
+        self.running = False
+        self.superseded = 0
+        self.dropped = 0
+
+        # Synthesized clips, reused for every repeat of a phrase
+        base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        self.cache = TTSCache(os.path.join(base_dir, cache_dir))
+        self._prewarm_thread = None
+
+        # Pre-rendered clips for offline speech (scripts/build_phrase_bank.py)
+        self.bank = PhraseBank.open(os.path.join(base_dir, bank_file))
+        if self.bank:
+            logger.info(f"✅ Phrase bank loaded ({', '.join(self.bank.languages())})")
 
         # ---------- Init pygame ----------
         try:
@@ -69,36 +150,144 @@ class TTSService:
     # =====================================================
     # PUBLIC API
     # =====================================================
-    def speak(self, text, lang="en", play=True, output_file=None):
+    def speak(self, text, lang="en", play=True, output_file=None, priority=PRIORITY_NORMAL, key=None):
+        """
+        Queues `text` for the TTS worker. Returns False if it was coalesced
+        with an identical request already queued or playing.
+        """
         if not text:
             return None
 
         lang = str(lang).lower().strip()
+        _REQUESTS.inc()
 
-        thread = threading.Thread(
-            target=self._speak_worker,
-            args=(text, lang, play, output_file),
-            daemon=True
-        )
-        thread.start()
+        with self.lock:
+            utterance = Utterance(text, lang, play, output_file, priority, key, next(self.seq))
+            if any(u.same_as(utterance) for _, _, u in self.queue) or \
+                    (self.current and self.current.same_as(utterance)):
+                return False
+
+            if key is not None:
+                kept = [entry for entry in self.queue if entry[2].key != key]
+                self.superseded += len(self.queue) - len(kept)
+                if len(kept) != len(self.queue):
+                    self.queue = kept
+                    heapq.heapify(self.queue)
+                if self.current and self.current.key == key:
+                    self.superseded += 1
+                    self._cancel_current_locked()
+
+            heapq.heappush(self.queue, (priority, utterance.seq, utterance))
+            if len(self.queue) > self.max_queue:
+                # Least urgent first, and the stalest of those
+                worst = max(self.queue, key=lambda e: (e[0], -e[1]))
+                self.queue.remove(worst)
+                heapq.heapify(self.queue)
+                self.dropped += 1
+                logger.warning(f"⚠️ TTS queue full, dropped: {worst[2].text}")
+
+            self._ensure_worker_locked()
+            self.lock.notify()
+        return True
+
+    def prewarm(self, phrases=(), lang="en"):
+        """
+        Synthesizes `phrases` (e.g. the gesture vocabulary) and every entry of
+        OFFLINE_SENTENCE_TRANSLATIONS into the cache on a background thread,
+        so their first playback does not wait for Edge TTS.
+        """
+        items = [(p, lang) for p in phrases if p]
+        for target_lang, sentences in OFFLINE_SENTENCE_TRANSLATIONS.items():
+            for english, translated in sentences.items():
+                items += [(english, "en"), (translated, target_lang)]
+
+        self._prewarm_thread = threading.Thread(target=self._prewarm_worker, args=(items,), daemon=True)
+        self._prewarm_thread.start()
+        return self._prewarm_thread
+
+    def _prewarm_worker(self, items):
+        loop = asyncio.new_event_loop()
+        done = 0
+        try:
+            for text, lang in dict.fromkeys(items):
+                voice = self.voices.get(lang)
+                if not voice or cache_key(text, lang, voice) in self.cache:
+                    continue
+                try:
+                    loop.run_until_complete(self._synthesize(text, lang, voice))
+                    done += 1
+                except Exception as e:
+                    logger.warning(f"⚠️ TTS pre-warm failed for '{text}' ({lang}): {e}")
+                    break  # Most likely offline; the rest would fail too
+        finally:
+            loop.close()
+        logger.info(f"🔥 TTS cache pre-warmed ({done} new clips, {self.cache.stats()['entries']} cached)")
 
     # =====================================================
     # WORKER
     # =====================================================
-    def _speak_worker(self, text, lang, play, output_file):
+    def _ensure_worker_locked(self):
+        if self.running:
+            return
+        self.running = True
+        self.thread = threading.Thread(target=self._run, name="tts-worker", daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        self.loop = asyncio.new_event_loop()
+        try:
+            while True:
+                with self.lock:
+                    while self.running and not self.queue:
+                        self.lock.wait()
+                    if not self.running:
+                        return
+                    _, _, utterance = heapq.heappop(self.queue)
+                    self.current = utterance
+                    self.current_task = self.loop.create_task(self._speak_edge(
+                        utterance.text, utterance.lang, utterance.play, utterance.output_file))
+
+                try:
+                    self.loop.run_until_complete(self.current_task)
+                except asyncio.CancelledError:
+                    logger.info(f"⏹️ TTS cancelled: {utterance.text}")
+                except StreamInterrupted as e:
+                    # A fallback would start over and repeat the words already heard
+                    logger.error(f"❌ Edge TTS failed mid-sentence, not repeating it: {e.__cause__!r}")
+                except Exception as e:
+                    logger.error(f"❌ Edge TTS failed: {e}")
+                    if utterance.play and not self._speak_local(utterance.text, utterance.lang):
+                        self._speak_fallback(utterance.text)
+                finally:
+                    with self.lock:
+                        self.current = None
+                        self.current_task = None
+        finally:
+            self.loop.close()
+
+    def _cancel_current_locked(self):
+        task = self.current_task
+        if task is not None:
+            self.loop.call_soon_threadsafe(task.cancel)
+        # Playback blocks the worker's loop, so cut the audio directly too
+        player = self.player
+        if player:
+            player.stop()
+        try:
+            pygame.mixer.music.stop()
+            pygame.mixer.stop()
+        except Exception:
+            pass
+
+    def queued(self):
         with self.lock:
-            try:
-                asyncio.new_event_loop().run_until_complete(
-                    self._speak_edge(text, lang, play, output_file)
-                )
-            except Exception as e:
-                logger.error(f"❌ Edge TTS failed: {e}")
-                self._speak_fallback(text)
+            return len(self.queue)
 
     # =====================================================
     # EDGE TTS (WITH OFFLINE TRANSLATION)
     # =====================================================
-    async def _speak_edge(self, text, lang, play, output_file):
+    def _resolve(self, text, lang):
+        """(text, voice) actually synthesized for `lang`."""
 
         # ---------- TRANSLATE FIXED SENTENCE ----------
         original_text = text.strip().lower()
@@ -114,37 +303,151 @@ class TTSService:
         if lang not in self.voices:
             raise ValueError(f"No TTS voice for language: {lang}")
 
-        voice = self.voices[lang]
+        return text, self.voices[lang]
 
-        if not output_file:
-            filename = f"signspeak_{uuid.uuid4().hex}.mp3"
-            output_file = os.path.join(tempfile.gettempdir(), filename)
+    async def _speak_edge(self, text, lang, play, output_file):
+        start = time.perf_counter()
+        text, voice = self._resolve(text, lang)
 
         logger.info(f"🗣️ TTS | LANG={lang} | VOICE={voice} | TEXT={text}")
 
-        communicate = edge_tts.Communicate(text, voice)
-        await communicate.save(output_file)
+        # ---------- PHRASE BANK (whole phrase, no decoding) ----------
+        if play and not output_file and self._play_local(text, lang, start, whole_only=True):
+            return None
+
+        # ---------- CACHE (synthesize only on a miss) ----------
+        audio = self.cache.get(cache_key(text, lang, voice))
+        if audio is None:
+            if play and not output_file and self.streaming:
+                # ---------- STREAM (play while synthesizing) ----------
+                await self._play_stream(self._synthesize_stream(text, lang, voice), start)
+                return None
+            audio = await self._synthesize(text, lang, voice)
+        else:
+            logger.info("⚡ TTS cache hit")
+
+        if output_file:
+            with open(output_file, "wb") as f:
+                f.write(audio)
 
         if play:
-            self._play_audio(output_file)
+            _FIRST_AUDIO.since(start)
+            self._play_audio(audio)
 
         return output_file
 
+    async def stream(self, text, lang="en"):
+        """
+        MP3 chunks for `text` as Edge TTS produces them (or straight from
+        the cache). Used by the /audio/speak streaming route.
+        """
+        lang = str(lang).lower().strip()
+        text, voice = self._resolve(text, lang)
+
+        audio = self.cache.get(cache_key(text, lang, voice))
+        if audio is not None:
+            for i in range(0, len(audio), STREAM_CHUNK_BYTES):
+                yield audio[i:i + STREAM_CHUNK_BYTES]
+            return
+
+        async for chunk in self._synthesize_stream(text, lang, voice):
+            yield chunk
+
+    async def _synthesize_stream(self, text, lang, voice):
+        """
+        Edge TTS audio chunks as they arrive, kept in memory (no temp files);
+        the complete clip goes into the cache.
+        """
+        start = time.perf_counter()
+        chunks = []
+        async for chunk in edge_tts.Communicate(text, voice).stream():
+            if chunk["type"] == "audio":
+                chunks.append(chunk["data"])
+                yield chunk["data"]
+
+        audio = b"".join(chunks)
+        if not audio:
+            raise RuntimeError("Edge TTS returned no audio")
+        _SYNTHESIS.since(start)
+        self.cache.put(cache_key(text, lang, voice), audio)
+
+    async def _synthesize(self, text, lang, voice):
+        return b"".join([chunk async for chunk in self._synthesize_stream(text, lang, voice)])
+
     # =====================================================
     # PLAYBACK
     # =====================================================
-    def _play_audio(self, file_path):
+    async def _play_stream(self, chunks, start):
+        """Plays MP3 chunks as they arrive (see services/audio_stream.py)."""
+        player = StreamPlayer(on_start=lambda: _FIRST_AUDIO.since(start))
+        self.player = player
+        fed = False
         try:
-            pygame.mixer.music.load(file_path)
+            async for chunk in chunks:
+                player.feed(chunk)
+                fed = True
+        except Exception as e:
+            if fed:
+                # finish() still plays what was fed: the opening words are heard
+                raise StreamInterrupted("Edge TTS stream broke off") from e
+            raise
+        finally:
+            player.finish()
+            self.player = None
+        _PLAYBACK.since(start)
+
+    def _play_audio(self, audio):
+        """audio: MP3 bytes (from the cache) or a file path."""
+        try:
+            start = time.perf_counter()
+            if isinstance(audio, (bytes, bytearray)):
+                pygame.mixer.music.load(io.BytesIO(audio), "mp3")
+            else:
+                pygame.mixer.music.load(audio)
             pygame.mixer.music.play()
 
             while pygame.mixer.music.get_busy():
                 pygame.time.Clock().tick(10)
 
             pygame.mixer.music.unload()
+            _PLAYBACK.since(start)
         except Exception as e:
             logger.error(f"❌ Playback Error: {e}")
 
+    # =====================================================
+    # LOCAL (PHRASE BANK)
+    # =====================================================
+    def _speak_local(self, text, lang):
+        """Speaks `text` from the phrase bank, word by word if needed. False if it can't."""
+        if self.bank is None:
+            return False
+        try:
+            text, _ = self._resolve(text, lang)
+        except ValueError:
+            return False
+        return self._play_local(text, lang, time.perf_counter())
+
+    def _play_local(self, text, lang, start, whole_only=False):
+        bank = self.bank
+        if bank is None:
+            return False
+        pcm = bank.clip(text, lang) if whole_only else bank.render(text, lang)
+        if pcm is None:
+            return False
+        try:
+            freq, _, channels = pygame.mixer.get_init()
+            sound = pygame.mixer.Sound(buffer=to_format(pcm, bank.sample_rate, bank.channels, freq, channels).tobytes())
+            logger.info("📦 Speaking from phrase bank")
+            channel = sound.play()
+            _FIRST_AUDIO.since(start)
+            while channel is not None and channel.get_busy():
+                pygame.time.Clock().tick(100)
+            _LOCAL.since(start)
+            return True
+        except Exception as e:
+            logger.error(f"❌ Phrase bank playback error: {e}")
+            return False
+
     # =====================================================
     # FALLBACK (ENGLISH)
     # =====================================================
@@ -153,8 +456,10 @@ class TTSService:
             return
         try:
             logger.warning("🗣️ Using offline pyttsx3 fallback")
+            start = time.perf_counter()
             self.engine.say(text)
             self.engine.runAndWait()
+            _FALLBACK.since(start)
         except Exception as e:
             logger.error(f"❌ Fallback Error: {e}")
 
@@ -162,10 +467,10 @@ class TTSService:
     # STOP
     # =====================================================
     def stop(self):
-        try:
-            pygame.mixer.music.stop()
-        except Exception:
-            pass
+        """Cancels the current utterance and everything queued."""
+        with self.lock:
+            self.queue.clear()
+            self._cancel_current_locked()
 
         if self.engine:
             try:
@@ -173,6 +478,15 @@ class TTSService:
             except Exception:
                 pass
 
+    def shutdown(self, timeout=2.0):
+        """stop(), then ends the worker thread."""
+        self.stop()
+        with self.lock:
+            self.running = False
+            self.lock.notify_all()
+        if self.thread:
+            self.thread.join(timeout)
+
 
 # -------- GLOBAL INSTANCE --------
 tts_service = TTSService()
@@ -1,27 +1,91 @@
+import asyncio
 import socket
-import threading
 import logging
 import time
 from services.data_store import data_store
+from services.frame_ring import ACC, FLEX4, GYRO, frame_rings, frame_values
+from services.metrics import stage_seconds
+from services.sensor_recorder import sensor_recorder
+from services.session_manager import session_manager
+from services.wire_protocol import FrameDecoder
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+_PARSE = stage_seconds.labels("udp_parse")
+_QUEUE = stage_seconds.labels("udp_queue")
+
+
+class _GloveDatagramProtocol(asyncio.DatagramProtocol):
+    """Fallback for loops without add_reader (Windows Proactor): one datagram per call."""
+
+    def __init__(self, service):
+        self.service = service
+
+    def datagram_received(self, data, addr):
+        self.service._on_datagram(data, addr)
+
+    def error_received(self, exc):
+        logger.error(f"Error in UDP transport: {exc}")
+
+
 class UDPService:
-    def __init__(self, host="0.0.0.0", port=5005):
+    """
+    UDP glove receiver running on the asyncio event loop.
+
+    Several gloves can share the port: each packet is routed to the glove
+    session for its device id (binary frames) or source address.
+    The socket is a plain non-blocking one watched with loop.add_reader:
+    each wakeup drains every pending datagram (up to `max_drain`) before
+    control returns to the loop. Loops without add_reader fall back to a
+    DatagramTransport, which delivers one datagram per callback.
+    Decoded frames go through a bounded queue to the inference worker;
+    when it falls behind, the oldest queued frame is dropped (and counted)
+    so predictions always follow the most recent glove movement.
+
+    Each glove's frames are written once into its shared-memory FrameRing;
+    the queue carries only (device, ring seq) and the callback gets
+    zero-copy views of the ring row. The dashboard stores are refreshed at
+    most `publish_hz` times a second per glove (SensorStream never pushes
+    faster), plus once after each drained burst, so the newest frame is
+    always shown.
+    """
+
+    def __init__(self, host="0.0.0.0", port=5005, queue_size=64, max_drain=64,
+                 publish_hz=100, rings=None):
         self.host = host
         self.port = port
         self.sock = None
+        self.transport = None
+        self.loop = None  # Set while the socket is watched with add_reader
         self.running = False
-        self.thread = None
-        self.lock = threading.Lock()
         self.on_data_callback = None
 
+        # Reused for every drained datagram (binary frames and ASCII CSV)
+        self.recv_buffer = bytearray(1024)
+        self.decoder = FrameDecoder()
+
+        # Backpressure between the receiver and the inference worker
+        self.queue_size = queue_size
+        self.max_drain = max_drain
+        self.queue = None
+        self.worker = None
+
+        self.rings = rings if rings is not None else frame_rings
+        self.publish_interval = 1.0 / publish_hz if publish_hz else 0.0
+        self.published = {}   # device -> time of its last dashboard update
+        self.unpublished = set()
+
+        self.received = 0
+        self.corrupt = 0
+        self.dropped = 0
+        self.processed = 0
+
     def register_callback(self, callback):
         self.on_data_callback = callback
 
-    def start(self):
+    async def start(self):
         if self.running:
             return
 
@@ -29,83 +93,161 @@ class UDPService:
             self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
             self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
             self.sock.bind((self.host, self.port))
-            # Set timeout to allow check for 'running' flag periodically
-            self.sock.settimeout(1.0) 
-            
+            self.sock.setblocking(False)
+
+            loop = asyncio.get_running_loop()
+            self.queue = asyncio.Queue(maxsize=self.queue_size)
+            try:
+                loop.add_reader(self.sock.fileno(), self._on_readable)
+                self.loop = loop
+            except NotImplementedError:
+                self.transport, _ = await loop.create_datagram_endpoint(
+                    lambda: _GloveDatagramProtocol(self), sock=self.sock
+                )
+            session_manager.on_expire(self._forget)
+            self.worker = loop.create_task(self._inference_worker())
+
             self.running = True
-            self.thread = threading.Thread(target=self._read_loop, daemon=True)
-            self.thread.start()
             logger.info(f"✅ UDP SERVICE STARTED: Listening on {self.host}:{self.port}")
         except Exception as e:
             logger.error(f"❌ UDP START ERROR: {e}")
 
     def stop(self):
         self.running = False
-        if self.thread:
-            self.thread.join()
-        if self.sock:
+        if self._forget in session_manager.expire_callbacks:
+            session_manager.expire_callbacks.remove(self._forget)
+        if self.worker:
+            self.worker.cancel()
+            self.worker = None
+        if self.transport:
+            self.transport.close()
+            self.transport = None
+        elif self.sock:
+            if self.loop:
+                self.loop.remove_reader(self.sock.fileno())
+                self.loop = None
             self.sock.close()
-        logger.info("UDP SERVICE STOPPED")
+        self.sock = None
+        logger.info(f"UDP SERVICE STOPPED ({self.stats()})")
+
+    def stats(self):
+        return {
+            "received": self.received,
+            "corrupt": self.corrupt,
+            "dropped": self.dropped,
+            "processed": self.processed,
+            "queued": self.queue.qsize() if self.queue else 0,
+        }
 
-    def _read_loop(self):
-        while self.running:
+    # ---------------- RECEIVE (event loop) ---------------- #
+    def _on_readable(self):
+        # Bulk drain: a burst of packets costs one loop wakeup, not one each
+        view = memoryview(self.recv_buffer)
+        for _ in range(self.max_drain):
             try:
-                data, addr = self.sock.recvfrom(1024)
-                line = data.decode('utf-8', errors='ignore').strip()
-                
-                if not line:
-                    continue
-
-                # Expecting format: "f1,f2,f3,f4,ax,ay,az" (7 values)
-                if "," in line and "|" not in line:
-                    parts = line.split(',')
-                    if len(parts) >= 7:
-                        # Parse values
-                        vals = [float(x) for x in parts[:7]]
-                        
-                        flex_vals = vals[0:4]
-                        acc_vals = vals[4:7] # ax, ay, az
-
-                        # Update Global Data Store
-                        data_store.update({
-                            "flex": flex_vals,
-                            "ax": acc_vals[0], "ay": acc_vals[1], "az": acc_vals[2],
-                            "gx": 0, "gy": 0, "gz": 0
-                        })
-                        
-                        if self.on_data_callback:
-                            self.on_data_callback(flex_vals, acc_vals)
-                            
-                        # Debug: Show we received it (similar to Serial)
-                        print(f"UDP Recv: {flex_vals} | ACC: {acc_vals}") 
-                        # return # Skip legacy check
-
-                # Old Format: "FLEX:f1,f2,f3,f4 | ACC:ax,ay,az | GYR:gx,gy,gz"
-                if "FLEX:" in line and "| ACC:" in line:
-                    parts = line.split('|')
-                    
-                    flex_str = parts[0].split(':')[1]
-                    acc_str = parts[1].split(':')[1]
-                    gyr_str = parts[2].split(':')[1]
-
-                    flex_vals = [float(x) for x in flex_str.split(',')]
-                    acc_vals = [float(x) for x in acc_str.split(',')]
-                    gyr_vals = [float(x) for x in gyr_str.split(',')]
-
-                    # Update Global Data Store
-                    data_store.update({
-                        "flex": flex_vals,
-                        "ax": acc_vals[0], "ay": acc_vals[1], "az": acc_vals[2],
-                        "gx": gyr_vals[0], "gy": gyr_vals[1], "gz": gyr_vals[2]
-                    })
-                    print(f"RAW DATA | FLEX: {flex_vals} | ACC: {acc_vals} | GYR: {gyr_vals}")
-                    
-            except socket.timeout:
-                continue
-            except Exception as e:
+                size, addr = self.sock.recvfrom_into(self.recv_buffer)
+            except (BlockingIOError, InterruptedError):
+                break
+            except OSError as e:
                 if self.running:
-                    logger.error(f"Error in UDP loop: {e}")
-                time.sleep(0.1)
+                    logger.error(f"Error draining UDP socket: {e}")
+                break
+            self._handle(view[:size], addr)
+
+        if self.unpublished:
+            self._publish_pending()
+
+    def _on_datagram(self, data, addr):
+        self._handle(data, addr)
+        if self.unpublished:
+            self._publish_pending()
+
+    def _forget(self, device):
+        """Session expired: drop its per-glove state (spoofed sources never return)."""
+        self.published.pop(device, None)
+        self.unpublished.discard(device)
+        self.rings.release(device)
+
+    def _handle(self, data, addr=None):
+        self.received += 1
+        start = time.perf_counter()
+        frame = self.decoder.decode(data)
+        _PARSE.since(start)
+        if frame is None:
+            self.corrupt += 1
+            return
+
+        device = session_manager.key_for(frame, addr)
+        session = session_manager.get(device)
+        session.track_seq(frame.seq)
+        sensor_recorder.record(device, frame)
+
+        gyro = frame.gyro if frame.has_gyro else None
+        seq = self.rings.get(device).write(frame.flex, frame.acc, gyro)
+
+        # Per-glove snapshot, plus the Global Data Store (latest of any glove)
+        now = time.monotonic()
+        if now - self.published.get(device, -1e9) >= self.publish_interval:
+            self._publish(device, frame_values(frame.flex, frame.acc, gyro), now)
+        else:
+            self.unpublished.add(device)
+
+        # ML expects 4 flex + 3 accel
+        if self.on_data_callback and len(frame.flex) == 4 and len(frame.acc) == 3:
+            self._enqueue((device, seq, time.perf_counter()))
+
+    def _publish(self, device, values, now):
+        session_manager.get(device).update(values)
+        data_store.update(values)
+        self.published[device] = now
+        self.unpublished.discard(device)
+        logger.debug(f"UDP Recv [{device}]: {values}")
+
+    def _publish_pending(self):
+        """Shows the newest frame of gloves whose last update was throttled."""
+        now = time.monotonic()
+        for device in list(self.unpublished):
+            ring = self.rings.get(device)
+            _, row = ring.latest()
+            if row is not None:
+                self._publish(device, ring.values(row), now)
+
+    def _enqueue(self, item):
+        if self.queue.full():
+            # Drop the stalest frame rather than blocking the receiver
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(item)
+
+    # ---------------- INFERENCE WORKER ---------------- #
+    async def _inference_worker(self):
+        """Single consumer, so frames reach the callback in arrival order."""
+        while True:
+            self._dispatch(*await self.queue.get())
+
+            # Work through the backlog without a loop round-trip per frame
+            while not self.queue.empty():
+                self._dispatch(*self.queue.get_nowait())
+            await asyncio.sleep(0)
+
+    def _dispatch(self, device, seq, queued_at=None):
+        if queued_at is not None:
+            _QUEUE.since(queued_at)
+        ring = self.rings.get(device)
+        row = ring.frame(seq)
+        if row is None:
+            self.dropped += 1  # Lapped by the writer while queued
+            return
+        try:
+            # Views of the ring row; the ring (and its seq) go along so the
+            # inference shard can check the row was not overwritten meanwhile
+            gyro = row[GYRO]
+            if gyro[0] != gyro[0]:  # NaN: no gyroscope
+                gyro = None
+            self.on_data_callback(row[FLEX4], row[ACC], device, gyro, (ring, seq))
+            self.processed += 1
+        except Exception as e:
+            logger.error(f"Error in UDP inference callback: {e}")
 
 # Global instance
 udp_service = UDPService()
@@ -0,0 +1,127 @@
+import numpy as np
+
+# Per-channel statistics appended after the raw frame, in this order
+WINDOW_STATS = ("mean", "var", "delta", "jerk")
+
+
+def window_columns(columns):
+    """Feature names produced for a window over `columns`."""
+    names = list(columns)
+    for stat in WINDOW_STATS:
+        names.extend(f"{c}_{stat}" for c in columns)
+    return names
+
+
+class RollingWindow:
+    """
+    Streaming window statistics for one device, O(1) per frame.
+
+    Keeps the last `size` frames in a ring buffer together with running sums,
+    so the rolling mean/variance only add the incoming frame and subtract the
+    outgoing one. `delta` is the first difference (x[t] - x[t-1]) and `jerk`
+    the second difference of the newest frames.
+    """
+
+    # Running sums are recomputed from the ring every RESYNC_EVERY frames to
+    # stop float error from accumulating over long sessions
+    RESYNC_EVERY = 4096
+
+    def __init__(self, n_channels, size):
+        if size < 3:
+            raise ValueError("Window size must be >= 3 (jerk needs three frames)")
+
+        self.n_channels = n_channels
+        self.size = size
+        self.ring = np.zeros((size, n_channels), dtype=np.float64)
+        self.sum = np.zeros(n_channels, dtype=np.float64)
+        self.sumsq = np.zeros(n_channels, dtype=np.float64)
+        self.prev_delta = np.zeros(n_channels, dtype=np.float64)
+        self.count = 0
+        self.pos = 0
+        self.since_resync = 0
+
+        # Reusable output vector: [raw | mean | var | delta | jerk]
+        self.features = np.zeros(n_channels * (1 + len(WINDOW_STATS)), dtype=np.float64)
+
+    @property
+    def ready(self):
+        return self.count >= self.size
+
+    def reset(self):
+        self.ring[:] = 0.0
+        self.sum[:] = 0.0
+        self.sumsq[:] = 0.0
+        self.prev_delta[:] = 0.0
+        self.count = 0
+        self.pos = 0
+        self.since_resync = 0
+
+    def push(self, frame):
+        """
+        Add one frame. Returns the feature vector (a view that is overwritten
+        by the next push) once the window is full, else None.
+        """
+        n = self.n_channels
+        newest = self.ring[self.pos - 1] if self.count else None
+        outgoing = self.ring[self.pos]
+
+        if self.count >= self.size:
+            self.sum -= outgoing
+            self.sumsq -= outgoing * outgoing
+
+        f = self.features
+        raw = f[:n]
+        raw[:] = frame
+        delta = f[3 * n:4 * n]
+        if newest is not None:
+            np.subtract(raw, newest, out=delta)
+        else:
+            delta[:] = 0.0
+        np.subtract(delta, self.prev_delta, out=f[4 * n:])
+        self.prev_delta[:] = delta
+
+        outgoing[:] = raw
+        self.sum += raw
+        self.sumsq += raw * raw
+        self.pos = (self.pos + 1) % self.size
+        self.count += 1
+
+        self.since_resync += 1
+        if self.since_resync >= self.RESYNC_EVERY and self.count >= self.size:
+            self.sum[:] = self.ring.sum(axis=0)
+            self.sumsq[:] = (self.ring * self.ring).sum(axis=0)
+            self.since_resync = 0
+
+        if self.count < self.size:
+            return None
+
+        mean = f[n:2 * n]
+        np.divide(self.sum, self.size, out=mean)
+        var = f[2 * n:3 * n]
+        np.divide(self.sumsq, self.size, out=var)
+        var -= mean * mean
+        np.maximum(var, 0.0, out=var)
+        return f
+
+
+def window_features(X, size):
+    """
+    Vectorised equivalent of feeding the rows of one continuous recording
+    through RollingWindow.push. Returns one feature row per full window,
+    i.e. for rows size-1 .. len(X)-1.
+    """
+    X = np.asarray(X, dtype=np.float64)
+    if len(X) < size:
+        return np.empty((0, X.shape[1] * (1 + len(WINDOW_STATS))))
+
+    zero = np.zeros((1, X.shape[1]))
+    csum = np.concatenate([zero, np.cumsum(X, axis=0)])
+    csumsq = np.concatenate([zero, np.cumsum(X * X, axis=0)])
+    mean = (csum[size:] - csum[:-size]) / size
+    var = np.maximum((csumsq[size:] - csumsq[:-size]) / size - mean * mean, 0.0)
+
+    delta = np.diff(X, axis=0, prepend=X[:1])
+    jerk = np.diff(delta, axis=0, prepend=np.zeros((1, X.shape[1])))
+
+    tail = slice(size - 1, None)
+    return np.hstack([X[tail], mean, var, delta[tail], jerk[tail]])
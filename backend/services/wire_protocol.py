@@ -0,0 +1,193 @@
+import struct
+
+import numpy as np
+
+# =========================================================
+# BINARY GLOVE FRAME (little-endian)
+# =========================================================
+#   offset  size  field
+#   0       2     magic  b"SG"
+#   2       1     version (1)
+#   3       1     flags  (FLAG_FLOAT32 | FLAG_GYRO)
+#   4       2     device_id   uint16
+#   6       4     seq         uint32 (wraps)
+#   10      4     timestamp   uint32, device millis()
+#   14      ...   channels: f1..f4, ax, ay, az [, gx, gy, gz]
+#                 int16 (scaled, see INT16_SCALE) or float32
+#
+# 28 bytes for a 7-channel int16 frame vs ~35-60 bytes of ASCII CSV.
+MAGIC = b"SG"
+VERSION = 1
+FLAG_FLOAT32 = 0x01
+FLAG_GYRO = 0x02
+
+HEADER = struct.Struct("<2sBBHII")
+
+N_FLEX = 4
+N_CHANNELS = 7          # f1..f4, ax, ay, az
+N_CHANNELS_GYRO = 10    # + gx, gy, gz
+
+# int16 fixed point: flex is the raw 12-bit ADC value, accel (m/s^2) and
+# gyro (rad/s) are sent as hundredths
+INT16_SCALE = np.array([1, 1, 1, 1, 0.01, 0.01, 0.01, 0.01, 0.01, 0.01], dtype=np.float64)
+
+# CSV layouts by field count: (n_flex, n_acc, n_gyro). A line with an
+# unlisted count is read with the decoder's `fallback` layout, followed by
+# ignored extras: f1..f4, ax, ay, az by default.
+CSV_LAYOUTS = {
+    7: (4, 3, 0),    # f1..f4, ax, ay, az            (UDP / Serial firmware)
+    10: (4, 3, 3),   # f1..f4, ax..az, gx..gz        (HTTP polling firmware)
+}
+
+# The polling firmware's longer lines carry gyro in fields 8-10
+POLLING_FALLBACK = CSV_LAYOUTS[10]
+
+# The TCP firmware's own line formats; 9 and 11 fields mean something
+# else on UDP and Serial, so only the TCP server decodes them this way
+TCP_CSV_LAYOUTS = {
+    **CSV_LAYOUTS,
+    9: (3, 3, 3),    # f1..f3, ax..az, gx..gz
+    11: (5, 3, 3),   # f1..f5, ax..az, gx..gz
+}
+
+
+class SensorFrame:
+    """
+    One decoded glove packet. `flex`, `acc` and `gyro` are views into the
+    decoder's reusable channel buffer and are overwritten by the next
+    decode; copy (e.g. `.tolist()`) anything that must outlive it.
+    """
+
+    __slots__ = ("device_id", "seq", "timestamp_ms", "binary", "flex", "acc", "gyro")
+
+    def __init__(self):
+        self.device_id = 0
+        self.seq = None
+        self.timestamp_ms = None
+        self.binary = False
+        self.flex = None
+        self.acc = None
+        self.gyro = None
+
+    @property
+    def has_gyro(self):
+        return len(self.gyro) > 0
+
+
+class FrameDecoder:
+    """
+    Decodes binary frames and all legacy ASCII formats into one reusable
+    buffer. The format is auto-detected per packet from the magic bytes;
+    CSV lines are split by field count using `layouts` (the transport's
+    firmware format, e.g. TCP_CSV_LAYOUTS), and longer unlisted lines by
+    `fallback`.
+    Not thread-safe: use one decoder per reader thread.
+    """
+
+    def __init__(self, layouts=CSV_LAYOUTS, fallback=CSV_LAYOUTS[N_CHANNELS]):
+        self.channels = np.zeros(11, dtype=np.float64)
+        self.frame = SensorFrame()
+        self.layouts = layouts
+        self.fallback = fallback
+
+    def decode(self, data):
+        """
+        data: bytes / bytearray / memoryview (one datagram) or str (one line).
+        Returns the shared SensorFrame, or None for anything unparseable.
+        """
+        if isinstance(data, str):
+            return self.decode_text(data)
+
+        if len(data) >= HEADER.size and bytes(data[:2]) == MAGIC:
+            return self.decode_binary(data)
+
+        return self.decode_text(bytes(data).decode("utf-8", errors="ignore"))
+
+    # ---------------- BINARY ---------------- #
+    def decode_binary(self, data):
+        try:
+            magic, version, flags, device_id, seq, timestamp_ms = HEADER.unpack_from(data)
+        except struct.error:
+            return None
+        if magic != MAGIC or version != VERSION:
+            return None
+
+        n = N_CHANNELS_GYRO if flags & FLAG_GYRO else N_CHANNELS
+        dtype = "<f4" if flags & FLAG_FLOAT32 else "<i2"
+        if len(data) < HEADER.size + n * np.dtype(dtype).itemsize:
+            return None
+
+        raw = np.frombuffer(data, dtype=dtype, count=n, offset=HEADER.size)
+        out = self.channels[:n]
+        if flags & FLAG_FLOAT32:
+            out[:] = raw
+        else:
+            np.multiply(raw, INT16_SCALE[:n], out=out)
+
+        return self._fill(N_FLEX, 3, n - N_CHANNELS, device_id, seq, timestamp_ms, True)
+
+    # ---------------- ASCII ---------------- #
+    def decode_text(self, line):
+        line = line.strip()
+        if not line:
+            return None
+
+        try:
+            # Old Format: "FLEX:f1,f2,f3,f4 | ACC:ax,ay,az | GYR:gx,gy,gz"
+            if line.startswith("FLEX:"):
+                groups = [part.split(":", 1)[1].split(",") for part in line.split("|")]
+                if len(groups) < 2:
+                    return None
+                flex, acc = groups[0], groups[1]
+                gyro = groups[2] if len(groups) > 2 else []
+                values = flex + acc + gyro
+                if len(values) > len(self.channels):
+                    return None
+                self.channels[:len(values)] = np.asarray(values, dtype=np.float64)
+                return self._fill(len(flex), len(acc), len(gyro))
+
+            if "," not in line or "|" in line:
+                return None
+
+            parts = line.split(",")
+            layout = self.layouts.get(len(parts))
+            if layout is None:
+                layout = self.fallback  # Extra trailing fields are ignored
+                if len(parts) < sum(layout):
+                    return None
+
+            n = sum(layout)
+            self.channels[:n] = np.asarray(parts[:n], dtype=np.float64)
+            return self._fill(*layout)
+
+        except (ValueError, IndexError):
+            return None  # Corrupt packet (common during startup)
+
+    def _fill(self, n_flex, n_acc, n_gyro, device_id=0, seq=None, timestamp_ms=None, binary=False):
+        frame = self.frame
+        c = self.channels
+        frame.device_id = device_id
+        frame.seq = seq
+        frame.timestamp_ms = timestamp_ms
+        frame.binary = binary
+        frame.flex = c[:n_flex]
+        frame.acc = c[n_flex:n_flex + n_acc]
+        frame.gyro = c[n_flex + n_acc:n_flex + n_acc + n_gyro]
+        return frame
+
+
+def encode_frame(flex, acc, gyro=None, device_id=0, seq=0, timestamp_ms=0, float32=False):
+    """Builds a binary frame (used by the simulators and tests)."""
+    values = list(flex) + list(acc) + (list(gyro) if gyro is not None else [])
+    if len(values) not in (N_CHANNELS, N_CHANNELS_GYRO):
+        raise ValueError("Expected 4 flex + 3 accel (+ 3 gyro) channels")
+
+    flags = (FLAG_FLOAT32 if float32 else 0) | (FLAG_GYRO if gyro is not None else 0)
+    header = HEADER.pack(MAGIC, VERSION, flags, device_id & 0xFFFF, seq & 0xFFFFFFFF, timestamp_ms & 0xFFFFFFFF)
+
+    if float32:
+        body = np.asarray(values, dtype="<f4")
+    else:
+        scaled = np.asarray(values, dtype=np.float64) / INT16_SCALE[:len(values)]
+        body = np.clip(np.rint(scaled), -32768, 32767).astype("<i2")
+    return header + body.tobytes()
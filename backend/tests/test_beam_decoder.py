@@ -0,0 +1,134 @@
+import os
+import sys
+
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+
+# Add backend to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from services import ml_service as ml_module
+from services.beam_decoder import BeamDecoder, BigramLM, label_bigrams, template_bigrams
+from services.compiled_forest import compile_forest
+from services.ml_service import MLService
+from services.model_store import ModelStore
+from services.session_manager import session_manager
+
+CLASSES = ["HELLO", "I", "AM", "YASH"]
+COLUMNS = ['f1', 'f2', 'f3', 'f4', 'ax', 'ay', 'az']
+
+
+def frames(word, count, p=0.9):
+    row = np.full(len(CLASSES), (1 - p) / (len(CLASSES) - 1))
+    row[CLASSES.index(word)] = p
+    return [row] * count
+
+
+def test_bigrams_from_label_runs_and_templates():
+    y = np.repeat(["HELLO", "I", "AM", "HELLO", "I"], 3)
+    assert label_bigrams(y) == {"<s>": {"HELLO": 1}, "HELLO": {"I": 2}, "I": {"AM": 1}, "AM": {"HELLO": 1}}
+    # Sources are not bridged
+    assert label_bigrams(y, {"a": 9, "b": 6}) == {
+        "<s>": {"HELLO": 2}, "HELLO": {"I": 2}, "I": {"AM": 1}}
+
+    assert template_bigrams(["i am *", "we are <name>", "hello"], CLASSES) == {"I": {"AM": 1}}
+
+    lm = BigramLM(CLASSES, {"I": {"AM": 3}})
+    assert np.isneginf(lm.logp[1, 1])  # A held sign is one word
+    assert np.allclose(np.exp(lm.logp).sum(axis=1), 1.0)
+    assert lm.logp[1, 2] > lm.logp[1, 3]
+
+
+def test_noise_is_absorbed_and_words_commit_quickly():
+    lm = BigramLM(CLASSES, label_bigrams(np.repeat(CLASSES, 2)))
+    decoder = BeamDecoder(lm)
+
+    stream = frames("HELLO", 6) + frames("I", 6) + frames("AM", 6) + frames("YASH", 6)
+    stream[3] = frames("YASH", 1)[0]   # One misclassified frame inside a sign
+    stream[14] = frames("HELLO", 1)[0]
+
+    commits = {}
+    for t, proba in enumerate(stream):
+        for word in decoder.step(proba):
+            commits[word] = t
+
+    assert list(commits) == ["HELLO", "I", "AM", "YASH"]
+    # Committed within two frames of the sign starting (stability needs 5)
+    assert all(commits[w] - onset <= 1 for w, onset in zip(CLASSES, (0, 6, 12, 18)))
+    assert decoder.hypothesis() == CLASSES
+    assert decoder.finish() == ([], CLASSES)
+    assert decoder.hypothesis() == []
+
+
+def test_language_model_resolves_ambiguous_frames():
+    lm = BigramLM(CLASSES, {"<s>": {"I": 5}, "I": {"AM": 5}})
+    decoder = BeamDecoder(lm)
+    ambiguous = np.array([0.05, 0.05, 0.45, 0.45])  # AM or YASH?
+    for proba in frames("I", 5) + [ambiguous] * 4:
+        decoder.step(proba)
+    assert decoder.hypothesis() == ["I", "AM"]
+
+
+def test_ml_service_emits_words_and_final_sentence(tmp_path, monkeypatch):
+    monkeypatch.setattr(ml_module, "DEMO_MODE", False)
+
+    rng = np.random.default_rng(0)
+    centers = {"HELLO": [3000, 3000, 3000, 3000, 0, 0, 9.8], "WE": [1000, 1000, 1000, 1000, 5, 5, 0]}
+    X = np.vstack([rng.normal(c, 1.0, size=(40, 7)) for c in centers.values()])
+    y = np.repeat(list(centers), 40)
+    model = RandomForestClassifier(n_estimators=5, random_state=0).fit(X, y)
+    ModelStore(str(tmp_path)).publish(compile_forest(model), COLUMNS, {"bigrams": label_bigrams(y)})
+
+    ml = MLService(store_path=str(tmp_path), workers=1, batch_size=1, sentence_gap=1.0, segment=False)
+    events = []
+    ml.register_callback(events.append)
+    with session_manager.lock:
+        session_manager.sessions.pop("beam-test", None)
+
+    for row in X[::4]:
+        ml.process_data(row[:4], row[4:], "beam-test")
+    words = [e["word"] for e in events if not e.get("partial")]
+    assert words == ["HELLO", "WE"]
+
+    session = session_manager.get("beam-test")
+    ml._end_sentences(ml.shards[0], now=session.last_frame_time + 0.5)
+    assert not events[-1]["final"]
+    ml._end_sentences(ml.shards[0], now=session.last_frame_time + 1.0)
+    assert events[-1]["final"] and events[-1]["words"] == ["HELLO", "WE"]
+    assert session.decoder.frames == 0 and not session.words
+
+
+def test_word_boundary_lets_the_same_sign_repeat():
+    lm = BigramLM(CLASSES, label_bigrams(np.repeat(CLASSES, 2)))
+
+    # One long hold is one word
+    decoder = BeamDecoder(lm)
+    for proba in frames("HELLO", 20):
+        decoder.step(proba)
+    assert decoder.finish()[1] == ["HELLO"]
+
+    # The segmenter saw the hand move in between: HELLO HELLO
+    committed = []
+    for proba in frames("HELLO", 10):
+        committed += decoder.step(proba)
+    decoder.boundary()
+    for proba in frames("HELLO", 10) + frames("I", 6):
+        committed += decoder.step(proba)
+    assert committed == ["HELLO", "HELLO", "I"] and decoder.hypothesis() == ["HELLO", "HELLO", "I"]
+
+    # A boundary before anything was signed is a no-op
+    decoder.reset()
+    decoder.boundary()
+    assert not decoder.at_boundary
+
+
+def test_single_class_model_has_a_finite_language_model():
+    lm = BigramLM(["HELLO"], {"<s>": {"HELLO": 2}})
+    assert not np.isnan(lm.logp).any() and lm.logp[1, 0] == 0.0 and np.isneginf(lm.logp[0, 0])
+
+    decoder = BeamDecoder(lm)
+    for _ in range(2):
+        for proba in [[1.0]] * 5:
+            decoder.step(proba)
+        decoder.boundary()
+    assert decoder.finish()[1] == ["HELLO", "HELLO"]
@@ -0,0 +1,46 @@
+import json
+import os
+import sys
+
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+
+# Add backend to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from scripts import benchmark_replay
+from services import ml_service as ml_module
+from services.compiled_forest import compile_forest
+from services.model_store import ModelStore
+
+COLUMNS = ['f1', 'f2', 'f3', 'f4', 'ax', 'ay', 'az']
+
+
+def test_replay_matches_golden_transcript(tmp_path, monkeypatch):
+    monkeypatch.setattr(ml_module, "DEMO_MODE", True)  # main() switches it off
+
+    # Two well separated gestures, 40 frames each
+    rng = np.random.default_rng(0)
+    centers = {"HELLO": [3000, 3000, 3000, 3000, 0, 0, 9.8], "WE": [1000, 1000, 1000, 1000, 5, 5, 0]}
+    X = np.vstack([rng.normal(c, 1.0, size=(40, 7)) for c in centers.values()])
+    y = np.repeat(list(centers), 40)
+    model = RandomForestClassifier(n_estimators=5, random_state=0).fit(X, y)
+    store = tmp_path / "store"
+    ModelStore(str(store)).publish(compile_forest(model), COLUMNS)
+
+    csv = tmp_path / "session.csv"
+    csv.write_text("".join(",".join(map(str, row)) + f",{label}\n" for row, label in zip(X, y)))
+    golden = tmp_path / "golden.json"
+    common = ["--input", str(csv), "--store", str(store), "--speeds", "max", "--verbose"]
+
+    assert benchmark_replay.main(common + ["--write-golden", str(golden), "--json", str(tmp_path / "r.json")]) == 0
+    transcript = json.loads(golden.read_text())["devices"]
+    assert transcript[benchmark_replay.REPLAY_ADDR[0]]["words"] == ["HELLO", "WE"]
+
+    result = json.loads((tmp_path / "r.json").read_text())["results"][0]
+    assert result["frames"] == 80 and result["words"] == 2 and result["word_p99_ms"] is not None
+
+    # A different recognised sequence is a regression
+    transcript[benchmark_replay.REPLAY_ADDR[0]]["words"] = ["WE"]
+    golden.write_text(json.dumps({"devices": transcript}))
+    assert benchmark_replay.main(common + ["--golden", str(golden)]) == 1
@@ -0,0 +1,118 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+
+# Add backend to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from services import calibration as calibration_module
+from services import ml_service as ml_module
+from services.beam_decoder import label_bigrams
+from services.calibration import CalibrationCapture, CalibrationProfile, ProfileStore
+from services.compiled_forest import compile_forest
+from services.ml_service import MLService
+from services.model_store import ModelStore
+from services.session_manager import session_manager
+
+COLUMNS = ['f1', 'f2', 'f3', 'f4', 'ax', 'ay', 'az']
+# Poses in wearer-independent units: bend 0..1 per finger, acceleration in g
+POSES = {"HELLO": [0.1, 0.2, 0.1, 0.1, 0, 0, 1], "WE": [0.9, 0.8, 0.9, 0.7, 0, 1, 0]}
+
+
+class Wearer:
+    """A glove whose flex sensors read lo..hi and whose accelerometer has its own units and bias."""
+
+    def __init__(self, lo, hi, g, bias):
+        self.lo, self.hi, self.g, self.bias = np.array(lo), np.array(hi), g, np.array(bias)
+
+    def frames(self, pose, n, rng):
+        pose = np.asarray(pose, dtype=float)
+        flex = self.lo + (self.hi - self.lo) * pose[:4]
+        acc = pose[4:] * self.g + self.bias
+        return np.hstack((flex, acc)) + rng.normal(0, 0.003, (n, 7)) * np.r_[self.hi - self.lo, [self.g] * 3]
+
+    def capture(self, rng):
+        """The capture routine: open/close the hand, then turn it through six orientations."""
+        bends = [[b] * 4 + [0, 0, 1] for b in np.linspace(0, 1, 10)]
+        turns = [[0.5] * 4 + list(v) for v in np.vstack((np.eye(3), -np.eye(3)))]
+        return np.vstack([self.frames(p, 20, rng) for p in bends + turns])
+
+
+ADC = Wearer([900, 1200, 1000, 800], [3600, 3900, 3300, 3500], 9.81, [0.3, -0.2, 0.1])
+FLOAT = Wearer([0.05, 0.0, 0.1, 0.02], [0.6, 0.7, 0.55, 0.8], 1.0, [0.0, 0.02, -0.01])
+
+
+def test_profiles_map_different_gloves_onto_one_scale():
+    rng = np.random.default_rng(0)
+    profiles = [CalibrationProfile.fit(name, w.capture(rng)) for name, w in (("a", ADC), ("b", FLOAT))]
+
+    for pose in POSES.values():
+        a, b = (p.apply(w.frames(pose, 50, rng)).mean(axis=0) for p, w in zip(profiles, (ADC, FLOAT)))
+        assert np.allclose(a, pose, atol=0.05) and np.allclose(b, pose, atol=0.05)
+
+    # One frame or a batch; flex is clipped to the calibrated range
+    frame = profiles[0].apply([5000, 0, 2000, 2000, 0.3, -0.2, 10.11])
+    assert frame.dtype == np.float32 and frame.shape == (7,)
+    assert frame[0] == 1.0 and frame[1] == 0.0 and abs(frame[6] - 1.0) < 0.05
+
+
+def test_capture_needs_moving_fingers():
+    capture = CalibrationCapture("still", max_frames=100)
+    for _ in range(150):
+        capture.add([2000, 2000, 2000, 2000], [0, 0, 9.8])
+    assert capture.count == 150 and capture.stats()["frames"] == 150
+    with pytest.raises(ValueError, match="did not move"):
+        capture.finish()
+
+
+def test_store_persists_profiles_and_assignments(tmp_path):
+    store = ProfileStore(str(tmp_path))
+    profile = CalibrationProfile.fit("Yash Laptop", ADC.capture(np.random.default_rng(1)))
+    name = store.save(profile)
+    assert name == "Yash_Laptop" and store.names() == [name]
+
+    version = store.version
+    store.assign("glove-7", name)
+    assert store.version > version
+
+    reopened = ProfileStore(str(tmp_path))
+    assert reopened.devices() == {"glove-7": name}
+    assert np.array_equal(reopened.for_device("glove-7").scale, profile.scale)
+    assert reopened.for_device("glove-8") is None
+    with pytest.raises(OSError):
+        reopened.assign("glove-8", "nobody")
+
+
+def test_one_calibrated_model_serves_two_gloves(tmp_path, monkeypatch):
+    monkeypatch.setattr(ml_module, "DEMO_MODE", False)
+    store = ProfileStore(str(tmp_path / "profiles"))
+    monkeypatch.setattr(calibration_module, "profile_store", store)
+    monkeypatch.setattr(ml_module, "profile_store", store)
+
+    # Trained on the ADC glove only
+    rng = np.random.default_rng(2)
+    adc = CalibrationProfile.fit("adc", ADC.capture(rng))
+    X = np.vstack([adc.apply(ADC.frames(pose, 40, rng)) for pose in POSES.values()])
+    y = np.repeat(list(POSES), 40)
+    model = RandomForestClassifier(n_estimators=5, random_state=0).fit(X, y)
+    metadata = {"bigrams": label_bigrams(y), "calibration": {"profiles": {"adc": adc.to_dict()}, "default": "adc"}}
+    ModelStore(str(tmp_path / "models")).publish(compile_forest(model), COLUMNS, metadata)
+
+    store.assign("float-glove", store.save(CalibrationProfile.fit("float", FLOAT.capture(rng))))
+    ml = MLService(store_path=str(tmp_path / "models"), workers=1, batch_size=1, segment=False)
+    events = []
+    ml.register_callback(events.append)
+
+    for device, wearer in (("adc-glove", ADC), ("float-glove", FLOAT)):
+        with session_manager.lock:
+            session_manager.sessions.pop(device, None)
+        for pose in POSES.values():
+            for frame in wearer.frames(pose, 10, rng):
+                ml.process_data(frame[:4], frame[4:], device)
+        words = [e["word"] for e in events if e["device"] == device and not e.get("partial")]
+        assert words == ["HELLO", "WE"]
+    assert session_manager.get("float-glove").profile.name == "float"
+    assert session_manager.get("adc-glove").profile is None  # Falls back to the model's default
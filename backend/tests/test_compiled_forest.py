@@ -0,0 +1,66 @@
+import os
+import sys
+
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+
+# Add backend to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from services.compiled_forest import CompiledForest, compile_forest, merge_forests
+from services.model_store import ModelStore
+
+
+def _fit_forest():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(600, 7))
+    y = np.array(["HELLO", "I", "WE"])[(X[:, 0] > 0).astype(int) + (X[:, 4] > 0.5).astype(int)]
+    model = RandomForestClassifier(n_estimators=25, max_depth=8, random_state=42).fit(X, y)
+    return model, rng.normal(size=(200, 7))
+
+
+def test_compiled_forest_matches_sklearn():
+    model, X = _fit_forest()
+    compiled = compile_forest(model)
+
+    assert np.array_equal(compiled.predict_proba(X), model.predict_proba(X))
+    assert (compiled.predict(X) == model.predict(X)).all()
+    assert compiled.predict(X[0]).shape == (1,)
+
+
+def test_compiled_forest_round_trip(tmp_path):
+    model, X = _fit_forest()
+    compiled = compile_forest(model)
+
+    path = tmp_path / "forest.npz"
+    compiled.save(path)
+    loaded = CompiledForest.load(path)
+
+    assert list(loaded.classes) == list(model.classes_)
+    assert (loaded.predict(X) == compiled.predict(X)).all()
+
+
+def test_merged_forest_learns_new_class(tmp_path):
+    model, X = _fit_forest()
+    base = compile_forest(model)
+
+    # Update trees fitted on a new word plus a replay of the old ones
+    rng = np.random.default_rng(1)
+    X_new = rng.normal(loc=4.0, size=(100, 7))
+    X_update = np.vstack([X_new, X[:100]])
+    y_update = np.concatenate([["YOU"] * 100, model.predict(X[:100])])
+    update = compile_forest(RandomForestClassifier(n_estimators=10, max_depth=8, random_state=0).fit(X_update, y_update))
+
+    merged = merge_forests(base, update, share=0.7)
+
+    assert list(merged.classes) == ["HELLO", "I", "WE", "YOU"]
+    assert merged.n_trees == 35 and np.isclose(merged.weight.sum(), 35)
+    assert np.allclose(merged.predict_proba(X).sum(axis=1), 1.0)
+    assert (merged.predict(rng.normal(loc=4.0, size=(20, 7))) == "YOU").all()
+    assert (merged.predict(X[100:]) == model.predict(X[100:])).mean() > 0.9
+
+    # Weights are persisted with the other tables
+    store = ModelStore(str(tmp_path / "store"))
+    store.publish(merged, columns=[f"c{i}" for i in range(7)])
+    loaded, _ = store.load()
+    assert np.array_equal(loaded.predict_proba(X), merged.predict_proba(X))
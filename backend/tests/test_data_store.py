@@ -0,0 +1,38 @@
+import os
+import sys
+
+# Add backend to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from services.data_store import DataStore
+
+
+def test_published_snapshots_are_immutable():
+    store = DataStore()
+    before = store.snapshot()
+
+    store.update({"ax": 1.0, "gesture": "HELLO"})
+
+    assert before.version == 0 and before.data["ax"] == 0.0 and "gesture" not in before.data
+    assert store.version == 1 and store.get()["gesture"] == "HELLO"
+    assert store.snapshot().config is before.config  # Untouched half is shared
+
+    try:
+        store.snapshot().data["ax"] = 2.0
+        assert False, "snapshot data must be read-only"
+    except TypeError:
+        pass
+
+
+def test_changes_since_version():
+    store = DataStore()
+    store.update({"ax": 1.0})
+    store.update_config({"lang": "hi"})
+    store.update({"ay": 2.0})
+
+    version, changes = store.changes_since(1)
+    assert version == 3
+    assert changes == {"lang": "hi", "ay": 2.0, "last_updated": store.get()["last_updated"]}
+
+    assert store.changes_since(3) == (3, {})
+    assert store.changes_since()[1]["ax"] == 1.0
@@ -0,0 +1,52 @@
+import os
+import sys
+
+# Add backend to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from services import dataset_cache
+from services.dataset_cache import DatasetCache
+
+
+def test_cache_hit_until_source_changes(tmp_path):
+    csv = tmp_path / "data.csv"
+    csv.write_text("1,2,3,4,0.1,0.2,0.3,HELLO\n5,6,7,8,0.4,0.5,0.6,I\n")
+    cache = DatasetCache(str(tmp_path / "cache"))
+
+    X, y, hit = cache.load(str(csv))
+    assert not hit and X.shape == (2, 7) and y.tolist() == ["HELLO", "I"]
+
+    X, y, hit = cache.load(str(csv))
+    assert hit and X[1].tolist() == [5, 6, 7, 8, 0.4, 0.5, 0.6]
+
+    # Appending samples (ML/add.py) invalidates the entry and replaces it
+    with open(csv, "a") as f:
+        f.write("1,1,1,1,0,0,1,AM\n")
+    X, y, hit = cache.load(str(csv))
+    assert not hit and y.tolist() == ["HELLO", "I", "AM"]
+    assert len(os.listdir(tmp_path / "cache")) == 1
+
+
+def test_header_row_and_corrupt_rows(tmp_path):
+    csv = tmp_path / "data.csv"
+    csv.write_text("f1,f2,f3,f4,ax,ay,az,label\n1,2,3,4,0.1,0.2,0.3,HELLO\n1,x,3,4,0.1,0.2,0.3,HELLO\n")
+
+    X, y, _ = DatasetCache(str(tmp_path / "cache")).load(str(csv))
+
+    assert X.tolist() == [[1, 2, 3, 4, 0.1, 0.2, 0.3]] and y.tolist() == ["HELLO"]
+
+
+def test_appended_rows_reuse_cached_prefix(tmp_path, monkeypatch):
+    csv = tmp_path / "data.csv"
+    csv.write_text("f1,f2,f3,f4,ax,ay,az,label\n1,2,3,4,0.1,0.2,0.3,HELLO\n")
+    cache = DatasetCache(str(tmp_path / "cache"))
+    cache.load(str(csv))
+
+    with open(csv, "a") as f:
+        f.write("5,6,7,8,0.4,0.5,0.6,I\n")
+    # Only the appended bytes may be parsed
+    monkeypatch.setattr(dataset_cache, "parse_dataset", None)
+    X, y, hit = cache.load(str(csv))
+
+    assert not hit and y.tolist() == ["HELLO", "I"] and X[1].tolist() == [5, 6, 7, 8, 0.4, 0.5, 0.6]
+    assert cache.load(str(csv))[2]
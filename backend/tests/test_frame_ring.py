@@ -0,0 +1,147 @@
+import os
+import sys
+import threading
+
+import numpy as np
+import pytest
+
+# Add backend to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from services.frame_ring import ACC, FEATURES, FLEX4, FLEX5, GYRO, FrameRing, FrameRings
+from services.ml_service import MLService
+from services.session_manager import session_manager
+
+
+def test_views_are_zero_copy_until_the_writer_laps_them():
+    ring = FrameRing(capacity=4)
+    try:
+        assert ring.latest() == (None, None)
+        seqs = [ring.write([i, 1, 2, 3], [0, 0, 9.8], t=100.0 + i) for i in range(3)]
+        assert seqs == [0, 1, 2] and ring.head == 3
+
+        row = ring.frame(1)
+        assert np.shares_memory(row, ring.frames)
+        assert row[FLEX4].tolist() == [1, 1, 2, 3] and np.isnan(row[GYRO]).all() and np.isnan(row[FLEX5])
+        assert np.allclose(row[FEATURES], [1, 1, 2, 3, 0, 0, 9.8])
+
+        # Four more frames overwrite seq 0..2
+        for i in range(3, 7):
+            ring.write([i, 1, 2, 3], [0, 0, 9.8], gyro=[1, 2, 3])
+        assert ring.frame(1) is None and ring.frame(6)[GYRO].tolist() == [1, 2, 3]
+        assert row[0] == 5  # The old view now shows seq 5, which reused its slot
+    finally:
+        row = None
+        ring.close()
+        ring.unlink()
+
+
+def test_readers_keep_their_own_cursor_and_count_lost_frames():
+    ring = FrameRing(capacity=4)
+    try:
+        for i in range(3):
+            ring.write([i, 0, 0, 0, 50 + i], [0, 0, 1])
+        fast = slow = 0
+
+        first, frames, times, lost = ring.read(fast)
+        assert (first, len(frames), lost) == (0, 3, 0) and frames[:, FLEX5].tolist() == [50, 51, 52]
+        fast = first + len(frames)
+
+        for i in range(3, 9):
+            ring.write([i, 0, 0, 0], [0, 0, 1])
+        # The slow reader was lapped; it gets what is left, split at the buffer end
+        first, frames, _, lost = ring.read(slow)
+        assert (first, lost) == (5, 5) and frames[:, 0].tolist() == [5, 6, 7]
+        first, frames, _, lost = ring.read(first + len(frames))
+        assert (first, lost) == (8, 0) and frames[:, 0].tolist() == [8]
+        assert ring.read(9)[1].shape == (0, 11)
+
+        first, frames, _, lost = ring.read(fast)
+        assert (first, lost) == (5, 2)
+        assert ring.values(ring.frame(8)) == {"flex": [8.0, 0.0, 0.0, 0.0], "ax": 0.0, "ay": 0.0, "az": 1.0,
+                                              "gx": 0, "gy": 0, "gz": 0}
+    finally:
+        frames = times = None
+        ring.close()
+        ring.unlink()
+
+
+def test_rings_are_shared_by_name_and_have_one_writer():
+    rings = FrameRings(capacity=16)
+    try:
+        ring = rings.get("glove-1")
+        assert rings.get("glove-1") is ring
+        ring.write([1, 2, 3, 4], [5, 6, 7])
+
+        reader = FrameRing.attach(rings.names()["glove-1"])
+        assert reader.capacity == 16 and reader.head == 1
+        assert reader.frame(0)[FEATURES].tolist() == [1, 2, 3, 4, 5, 6, 7]
+        ring.write([9, 9, 9, 9], [0, 0, 0])
+        assert reader.latest()[1][0] == 9
+        reader.close()
+
+        errors = []
+
+        def other_writer():
+            try:
+                ring.write([0, 0, 0, 0], [0, 0, 0])
+            except RuntimeError as e:
+                errors.append(e)
+
+        thread = threading.Thread(target=other_writer)
+        thread.start()
+        thread.join()
+        assert errors and ring.head == 2
+    finally:
+        rings.close()
+    with pytest.raises(FileNotFoundError):
+        FrameRing.attach(ring.name)
+
+
+def test_inference_skips_a_queued_frame_whose_row_was_reused():
+    ml = MLService(store_path="/nonexistent", workers=1, segment=False)
+    shard = ml.shards[0]
+    ring = FrameRing(capacity=2)
+    try:
+        seqs = [ring.write([i, 0, 0, 0], [0, 0, 1]) for i in range(3)]
+        row = ring.frame(seqs[2])
+        shard.process(session_manager.get("ring-glove"), row[FLEX4], row[ACC], None, (ring, seqs[0]))
+        assert shard.lapped == 1 and ml.stats()["lapped"] == 1
+        shard.process(session_manager.get("ring-glove"), row[FLEX4], row[ACC], None, (ring, seqs[2]))
+        assert shard.lapped == 1
+    finally:
+        row = None
+        ring.close()
+        ring.unlink()
+
+
+def test_inference_reads_a_copy_taken_before_the_check():
+    ml = MLService(store_path="/nonexistent", workers=1, segment=False)
+    shard = ml.shards[0]
+    seen = []
+    ml._process_frame = lambda shard, session, flex, acc, gyro=None: seen.append(flex.tolist())
+    ring = FrameRing(capacity=2)
+    try:
+        seq = ring.write([7, 0, 0, 0], [0, 0, 1])
+        row = ring.frame(seq)
+        check = ring.valid
+
+        def valid_then_lap(s):
+            ok = check(s)
+            for i in range(2):
+                ring.write([100 + i, 0, 0, 0], [0, 0, 1])  # The writer laps the row right after the check
+            return ok
+
+        ring.valid = valid_then_lap
+        shard.process(session_manager.get("ring-glove"), row[FLEX4], row[ACC], None, (ring, seq))
+        assert seen == [[7, 0, 0, 0]] and shard.lapped == 0
+
+        # A slot being rewritten is invalid until its stamp is set again
+        ring.valid = check
+        ring.stamps[seq % 2] = -1
+        shard.process(session_manager.get("ring-glove"), row[FLEX4], row[ACC], None, (ring, seq + 2))
+        assert shard.lapped == 1 and len(seen) == 1
+    finally:
+        row = None
+        ring.close()
+        ring.unlink()
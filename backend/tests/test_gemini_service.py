@@ -0,0 +1,149 @@
+import asyncio
+import json
+import os
+import re
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+# Add backend to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from services.gemini_service import GeminiService
+
+
+class StubGemini:
+    """Local stand-in for the generateContent REST endpoint."""
+
+    def __init__(self):
+        self.requests = []
+        self.delay = 0.0
+        self.status = 200
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                prompt = body["contents"][0]["parts"][0]["text"]
+                lines = re.findall(r"^\d+\. (.+)$", prompt, re.M)
+                stub.requests.append((self.path, lines))
+                time.sleep(stub.delay)
+
+                if stub.status != 200:
+                    out = json.dumps({"error": {"code": stub.status, "message": "boom", "status": "INTERNAL"}})
+                else:
+                    answer = json.dumps([f"AI {line}." for line in lines])
+                    out = json.dumps({"candidates": [{"content": {"role": "model", "parts": [{"text": answer}]}}]})
+                out = out.encode()
+                self.send_response(stub.status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(out)))
+                self.end_headers()
+                self.wfile.write(out)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def stub():
+    server = StubGemini()
+    yield server
+    server.close()
+
+
+def make_service(stub, **kwargs):
+    kwargs.setdefault("hedge_seconds", 5.0)
+    return GeminiService(api_key="test-key", base_url=stub.url, model="stub-model", **kwargs)
+
+
+def test_requests_are_batched_coalesced_and_cached(stub):
+    service = make_service(stub)
+
+    async def run():
+        first = await asyncio.gather(
+            service.build_sentence(["I", "YASH"]),
+            service.build_sentence("i yash"),
+            service.build_sentence(["WE", "TEAM_FSOCITY"]),
+        )
+        again = await service.build_sentence("I I YASH")
+        return first, again
+
+    first, again = asyncio.run(run())
+    assert first == ["AI I Yash.", "AI I Yash.", "AI we Team Fsociety."]
+    assert again == "AI I Yash."
+    assert stub.requests == [("/v1beta/models/stub-model:generateContent", ["I Yash", "we Team Fsociety"])]
+
+
+def test_slow_model_is_hedged_with_local_rules(stub):
+    stub.delay = 0.5
+    service = make_service(stub, hedge_seconds=0.05)
+
+    async def run():
+        start = time.perf_counter()
+        sentence = await service.build_sentence("I YASH")
+        waited = time.perf_counter() - start
+        assert len(service.sending) == 1  # The hedged request is still referenced
+        await asyncio.sleep(1.0)  # The late answer still lands in the cache
+        return sentence, waited, await service.build_sentence("I YASH")
+
+    sentence, waited, later = asyncio.run(run())
+    assert sentence == "I am Yash." and waited < 0.4
+    assert later == "AI I Yash." and not service.sending
+
+
+def test_overlapping_batches_stay_referenced(stub):
+    stub.delay = 0.2
+    service = make_service(stub, max_batch=1)
+
+    async def run():
+        first = asyncio.ensure_future(service.build_sentence("I YASH"))
+        await asyncio.sleep(0.05)  # First batch is in flight
+        second = asyncio.ensure_future(service.build_sentence("HELLO"))
+        await asyncio.sleep(0.05)
+        in_flight = set(service.sending)
+        sentences = await asyncio.gather(first, second)
+        await asyncio.sleep(0.01)  # Done callbacks
+        return in_flight, sentences
+
+    in_flight, sentences = asyncio.run(run())
+    assert len(in_flight) == 2 and all(task.done() for task in in_flight)
+    assert sentences == ["AI I Yash.", "AI hello."] and not service.sending
+
+
+def test_circuit_breaker_opens_and_recovers(stub):
+    stub.status = 400
+    service = make_service(stub, failure_threshold=2, cooldown_seconds=0.2)
+
+    async def run():
+        for word in ("HELLO", "WE"):
+            assert await service.build_sentence(word) == service._offline_correct(word)
+        assert service.circuit_open and len(stub.requests) == 2
+
+        assert await service.build_sentence("I YASH") == "I am Yash."
+        assert len(stub.requests) == 2  # Open: the API is not called
+
+        stub.status = 200
+        await asyncio.sleep(0.25)
+        assert await service.build_sentence("I YASH") == "AI I Yash."
+        assert not service.circuit_open
+
+    asyncio.run(run())
+
+
+def test_without_a_key_only_local_rules_are_used(monkeypatch):
+    monkeypatch.delenv("GEMINI_API_KEY", raising=False)
+    service = GeminiService()
+    assert service.client is None
+    assert asyncio.run(service.build_sentence(["I", "YASH"])) == "I am Yash."
@@ -0,0 +1,46 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+# Add backend to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from scripts import train_custom
+from services.model_store import ModelStore
+
+COLUMNS = ['f1', 'f2', 'f3', 'f4', 'ax', 'ay', 'az']
+POSES = {"HELLO": [3000, 3000, 3000, 3000, 0, 0, 9.8], "WE": [1000, 1000, 1000, 1000, 5, 5, 0],
+         "YASH": [2000, 500, 2000, 500, 0, 9.8, 0]}
+
+
+def write(csv, signs, rng, mode="w"):
+    frames = pd.concat([pd.DataFrame(rng.normal(POSES[s], 50.0, (50, 7)), columns=COLUMNS).assign(label=s)
+                        for s in signs])
+    frames.to_csv(csv, index=False, mode=mode, header=mode == "w")
+
+
+def test_incremental_update_measures_forgetting_on_the_stored_holdout(tmp_path, monkeypatch, capsys):
+    rng = np.random.default_rng(0)
+    csv = str(tmp_path / "signs.csv")
+    write(csv, ["HELLO", "WE"], rng)
+    store = ModelStore(str(tmp_path / "store"))
+    monkeypatch.setattr(train_custom, "STORE_PATH", store.root)
+    common = ["--data", csv, "--no-cache", "--jobs", "1", "--pickle", str(tmp_path / "model.pkl")]
+
+    train_custom.main(common + ["--trees", "5"])
+    holdout = store.load()[1]["metadata"]["holdout"]
+    assert len(holdout["signs.csv"]) == 20 and max(holdout["signs.csv"]) < 100
+
+    write(csv, ["YASH"], rng, mode="a")
+    capsys.readouterr()
+    train_custom.main(common + ["--incremental", "--trees", "5", "--replay", "30"])
+    out = capsys.readouterr().out
+    assert "(20 rows, held out)" in out and "training accuracy" not in out
+
+    forest, manifest = store.load()
+    assert "YASH" in forest.classes
+    stored = manifest["metadata"]["holdout"]["signs.csv"]
+    assert set(holdout["signs.csv"]) < set(stored) and len(stored) == 30  # Old split + 10 new rows
+    assert all(i >= 100 for i in set(stored) - set(holdout["signs.csv"]))
@@ -0,0 +1,77 @@
+import os
+import sys
+import warnings
+
+import numpy as np
+import pytest
+
+# Add backend to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from services.inference_engine import BatchInferenceEngine
+
+
+class Recorder:
+    """predict_fn / on_result pair that remembers what the engine did."""
+
+    def __init__(self):
+        self.batches = []   # (buffer view, rows) per predict call
+        self.results = []   # (label, tag) in dispatch order
+
+    def predict(self, X):
+        self.batches.append((X, X.copy()))
+        return X[:, 0].astype(int) * 10
+
+    def on_result(self, label, tag):
+        self.results.append((int(label), tag))
+
+
+def test_full_batches_classify_in_arrival_order_and_reuse_the_buffer():
+    rec = Recorder()
+    engine = BatchInferenceEngine(rec.predict, n_features=3, on_result=rec.on_result, batch_size=3, max_delay=10)
+
+    classified = [engine.submit([i, 0, 0], tag=f"glove-{i % 2}", now=0.0) for i in range(7)]
+    assert classified == [0, 0, 3, 0, 0, 3, 0] and engine.pending == 1
+
+    # Each session sees its own frames in order, even though batches mix them
+    assert rec.results == [(i * 10, f"glove-{i % 2}") for i in range(6)]
+    assert [rows[:, 0].tolist() for _, rows in rec.batches] == [[0, 1, 2], [3, 4, 5]]
+    assert all(np.shares_memory(view, engine.buffer) for view, _ in rec.batches)
+    assert engine.buffer.dtype == np.float32 and engine.tags == ["glove-0", None, None]  # Dispatched tags released
+
+
+def test_deadline_flushes_a_partial_batch():
+    rec = Recorder()
+    engine = BatchInferenceEngine(rec.predict, n_features=2, on_result=rec.on_result, batch_size=8, max_delay=0.04)
+
+    assert engine.submit([1, 0], "a", now=1.00) == 0
+    assert engine.poll(now=1.02) == 0
+    assert engine.submit([2, 0], "b", now=1.03) == 0
+    assert engine.poll(now=1.04) == 2  # The deadline follows the oldest frame
+    assert rec.results == [(10, "a"), (20, "b")]
+    assert engine.poll(now=5.0) == 0 and engine.flush() == 0
+
+    # A late frame on an empty engine flushes on submit
+    assert engine.submit([3, 0], "c", now=2.0) == 0 and engine.submit([4, 0], "c", now=2.05) == 2
+
+
+def test_failing_callback_does_not_replay_frames_and_buffer_is_checked():
+    calls = []
+
+    def on_result(label, tag):
+        calls.append(tag)
+        raise RuntimeError("listener failed")
+
+    engine = BatchInferenceEngine(lambda X: X[:, 0], n_features=1, on_result=on_result, batch_size=2)
+    engine.submit([1], "x", now=0.0)
+    with pytest.raises(RuntimeError):
+        engine.submit([2], "y", now=0.0)
+    assert engine.pending == 0 and engine.flush() == 0 and calls == ["x"]
+
+    with pytest.raises(ValueError):
+        BatchInferenceEngine(lambda X: X, n_features=3, on_result=on_result, batch_size=2,
+                             buffer=np.zeros((4, 3), dtype=np.float32))
+
+
+def test_feature_name_warning_is_not_silenced_process_wide():
+    assert not any(f[1] is not None and "valid feature names" in f[1].pattern for f in warnings.filters)
@@ -0,0 +1,89 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+
+# Add backend to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from services import ml_service as ml_module
+from services.compiled_forest import compile_forest
+from services.inference_pool import InferenceProcess
+from services.ml_service import MLService
+from services.model_store import ModelStore
+from services.session_manager import session_manager
+
+COLUMNS = ['f1', 'f2', 'f3', 'f4', 'ax', 'ay', 'az']
+
+
+def publish(store, n_classes, seed):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(300, 7))
+    y = np.array([f"W{i}" for i in range(n_classes)])[np.argmax(X[:, :n_classes], axis=1)]
+    model = RandomForestClassifier(n_estimators=5, random_state=seed).fit(X, y)
+    forest = compile_forest(model)
+    return store.publish(forest, COLUMNS), forest, X
+
+
+def test_worker_matches_in_process_forest_and_restarts(tmp_path):
+    store = ModelStore(str(tmp_path))
+    v1, forest1, X = publish(store, 3, 0)
+    worker = InferenceProcess(store.root, name="test-worker")
+    try:
+        inputs = worker.buffer(8, 7, forest1.n_classes)
+        inputs[:5] = X[:5]
+        assert np.array_equal(worker.predict_proba(inputs[:5], v1), forest1.predict_proba(X[:5]))
+
+        # A new version with more classes gets a new block
+        v2, forest2, X2 = publish(store, 5, 1)
+        worker.buffer(8, 7, forest2.n_classes)
+        assert np.array_equal(worker.predict_proba(X2[:8], v2), forest2.predict_proba(X2[:8]))
+
+        with pytest.raises(RuntimeError, match="No such file|not found|nope"):
+            worker.predict_proba(X2[:1], "nope")
+
+        worker.process.kill()
+        worker.process.join()
+        assert np.array_equal(worker.predict_proba(X2[:3], v2), forest2.predict_proba(X2[:3]))
+        assert worker.restarts == 1
+    finally:
+        worker.stop()
+    assert worker.process is None and worker.shm is None
+
+
+@pytest.mark.parametrize("decoder", ["beam", "stability"])
+def test_ml_service_words_are_the_same_in_worker_processes(tmp_path, monkeypatch, decoder):
+    monkeypatch.setattr(ml_module, "DEMO_MODE", False)
+
+    rng = np.random.default_rng(0)
+    centers = {"HELLO": [3000, 3000, 3000, 3000, 0, 0, 9.8], "WE": [1000, 1000, 1000, 1000, 5, 5, 0]}
+    X = np.vstack([rng.normal(c, 1.0, size=(40, 7)) for c in centers.values()])
+    y = np.repeat(list(centers), 40)
+    model = RandomForestClassifier(n_estimators=5, random_state=0).fit(X, y)
+    ModelStore(str(tmp_path)).publish(compile_forest(model), COLUMNS)
+
+    words = {}
+    for processes in (False, True):
+        ml = MLService(store_path=str(tmp_path), workers=2, batch_size=4, decoder=decoder,
+                       segment=False, processes=processes)
+        events = []
+        ml.register_callback(events.append)
+        for glove in ("pool-a", "pool-b"):
+            with session_manager.lock:
+                session_manager.sessions.pop(glove, None)
+        try:
+            for row in X[::2]:
+                for glove in ("pool-a", "pool-b"):
+                    ml.process_data(row[:4], row[4:], glove)
+            for shard in ml.shards:
+                if shard.engine:
+                    shard.engine.flush()
+        finally:
+            ml.stop()
+        words[processes] = [(e["device"], e["word"]) for e in events if not e.get("partial")]
+        assert bool(processes) == all(s.worker is not None for s in ml.shards)
+
+    assert words[True] == words[False]
+    assert sorted(w for d, w in words[True] if d == "pool-a") == ["HELLO", "WE"]
@@ -0,0 +1,51 @@
+import os
+import sys
+
+# Add backend to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from services.metrics import MetricsRegistry, metrics
+from services.session_manager import SessionManager
+
+
+def test_histograms_record_before_the_first_scrape():
+    registry = MetricsRegistry()
+    stage = registry.histogram("stage_seconds", "Stage latency", labels=("stage",), buckets=(0.001, 0.01))
+    parse = stage.labels("parse")
+
+    parse.observe(0.005)
+    parse.observe(0.5)
+    text = registry.render()
+    assert 'stage_seconds_bucket{stage="parse",le="0.001"} 0' in text
+    assert 'stage_seconds_bucket{stage="parse",le="0.01"} 1' in text
+    assert 'stage_seconds_bucket{stage="parse",le="+Inf"} 2' in text
+    assert 'stage_seconds_count{stage="parse"} 2' in text
+
+
+def test_counters_and_collectors():
+    registry = MetricsRegistry()
+    words = registry.counter("words_total", "Words emitted")
+    words.inc()
+    words.inc(2)
+    registry.collect("gauge", "queued", "Queued frames", lambda: 3)
+    registry.collect("counter", "lost_total", "Lost frames", lambda: {"glove-1": 4}, label="device")
+
+    text = registry.render()
+    assert "# TYPE words_total counter\nwords_total 3\n" in text
+    assert "# TYPE queued gauge\nqueued 3\n" in text
+    assert 'lost_total{device="glove-1"} 4' in text
+
+
+def test_lost_frames_outlive_their_session():
+    def lost():
+        line = [l for l in metrics.render().splitlines() if l.startswith('signspeak_frames_lost_total{device="glove-77"}')]
+        return int(line[0].split()[-1]) if line else 0
+
+    before = lost()
+    manager = SessionManager(idle_timeout=1.0)
+    for seq in (0, 3):
+        manager.get("glove-77").track_seq(seq)
+    manager.expire(now=manager.get("glove-77").last_seen + 2.0)
+
+    manager.get("glove-77").track_seq(10)  # A new session: no gap counted yet
+    assert lost() == before + 2
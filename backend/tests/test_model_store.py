@@ -0,0 +1,115 @@
+import os
+import sys
+import threading
+
+import joblib
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+
+# Add backend to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from scripts.train_custom import publish_pickle
+from services import ml_service as ml_module
+from services.compiled_forest import compile_forest
+from services.ml_service import MLService
+from services.model_store import LOCK_FILE, ModelStore
+
+COLUMNS = ['f1', 'f2', 'f3', 'f4', 'ax', 'ay', 'az']
+
+
+def fit(n_classes, seed=0):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(200, 7))
+    y = np.array([f"W{i}" for i in range(n_classes)])[np.argmax(X[:, :n_classes], axis=1)]
+    return RandomForestClassifier(n_estimators=3, random_state=seed).fit(X, y), X
+
+
+def test_publish_swaps_current_and_activate_rolls_back(tmp_path):
+    store = ModelStore(str(tmp_path))
+    assert store.versions() == [] and store.current_version() is None
+
+    model, X = fit(2)
+    v1 = store.publish(compile_forest(model), COLUMNS, {"note": "first"})
+    v2 = store.publish(compile_forest(fit(3, 1)[0]), COLUMNS, activate=False)
+    assert (v1, v2) == ("v0001", "v0002") and store.versions() == [v1, v2]
+    assert store.current_version() == v1  # Staged, not activated
+
+    forest, manifest = store.load()
+    assert manifest["version"] == v1 and manifest["metadata"] == {"note": "first"}
+    assert np.array_equal(forest.predict(X), model.predict(X))
+
+    store.activate(v2)
+    assert store.current_version() == v2 and store.load()[0].n_classes == 3
+    store.activate(v1)
+    assert store.current_version() == v1
+    with pytest.raises(FileNotFoundError):
+        store.activate("v0009")
+    assert not [f for f in os.listdir(tmp_path) if f.startswith(".")]  # No staging or lock left
+
+
+def test_publishers_in_separate_processes_never_share_a_version(tmp_path):
+    forest = compile_forest(fit(2)[0])
+    versions = []
+
+    def publish():
+        # One store object each: only the lock file serialises them
+        store = ModelStore(str(tmp_path))
+        for _ in range(4):
+            versions.append(store.publish(forest, COLUMNS))
+
+    threads = [threading.Thread(target=publish) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sorted(versions) == [f"v{i:04d}" for i in range(1, 13)]
+
+    # A lock held elsewhere times out; one left by a crashed publisher is broken
+    lock = os.path.join(str(tmp_path), LOCK_FILE)
+    open(lock, "w").close()
+    with pytest.raises(TimeoutError):
+        ModelStore(str(tmp_path), lock_timeout=0.1).publish(forest, COLUMNS)
+    os.utime(lock, (0, 0))
+    assert ModelStore(str(tmp_path)).publish(forest, COLUMNS) == "v0013"
+
+
+def test_hot_reload_and_rollback(tmp_path, monkeypatch):
+    monkeypatch.setattr(ml_module, "DEMO_MODE", False)
+    store = ModelStore(str(tmp_path))
+    v1 = store.publish(compile_forest(fit(2)[0]), COLUMNS)
+    ml = MLService(store_path=str(tmp_path), workers=1, segment=False)
+    assert ml.model_version == v1
+
+    def settle():
+        ml.check_for_update()
+        if ml._reload_thread:
+            ml._reload_thread.join()
+        ml.poll()  # Swaps the staged model in
+
+    v2 = store.publish(compile_forest(fit(3, 1)[0]), COLUMNS)
+    settle()
+    assert ml.model_version == v2 and ml.model.n_classes == 3
+
+    store.activate(v1)
+    settle()
+    assert ml.model_version == v1 and ml.model.n_classes == 2
+    generation = ml.generation
+    settle()
+    assert ml.generation == generation  # Nothing new to load
+
+
+def test_legacy_pickle_is_loaded_without_publishing(tmp_path):
+    model, X = fit(2)
+    joblib.dump(model, tmp_path / "legacy.pkl")
+    store = tmp_path / "store"
+
+    ml = MLService(model_path=str(tmp_path / "legacy.pkl"), store_path=str(store), workers=1)
+    assert ml.active and ml.model_version is None
+    assert np.array_equal(ml.model.predict(X), model.predict(X))
+    assert not store.exists()
+
+    # Publishing is the training CLI's job (train_custom.py --publish-pickle)
+    version = publish_pickle(str(tmp_path / "legacy.pkl"), str(store))
+    assert MLService(store_path=str(store), workers=1).model_version == version
@@ -0,0 +1,150 @@
+import os
+import sys
+
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+
+# Add backend to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from services import ml_service as ml_module
+from services.beam_decoder import label_bigrams
+from services.compiled_forest import compile_forest
+from services.ml_service import MLService
+from services.model_store import ModelStore
+from services.motion_segmenter import HOLD, MOVING, REST, MotionSegmenter
+from services.session_manager import session_manager
+
+COLUMNS = ['f1', 'f2', 'f3', 'f4', 'ax', 'ay', 'az']
+NOISE = [3, 3, 3, 3, 0.05, 0.05, 0.05]  # ADC counts, m/s^2
+
+
+def signing(poses, hold=30, move=8, rest=0, seed=0):
+    """(label, frame) pairs: each pose held, with smooth moves between them."""
+    rng = np.random.default_rng(seed)
+    out = []
+    for i, (label, pose) in enumerate(poses):
+        pose = np.asarray(pose, dtype=float)
+        if i:
+            prev = np.asarray(poses[i - 1][1], dtype=float)
+            for t in range(1, move + 1):
+                out.append(("move", prev + (pose - prev) * np.sin(t / move * np.pi / 2) + rng.normal(0, NOISE)))
+        count = hold + (rest if i == len(poses) - 1 else 0)
+        out += [(label, pose + rng.normal(0, NOISE)) for _ in range(count)]
+    return out
+
+
+class FrameClock:
+    """Clock for a segmenter that advances one frame period per reading (frames at `hz`)."""
+
+    def __init__(self, hz=33.0):
+        self.period = 1.0 / hz
+        self.t = 0.0
+
+    def __call__(self):
+        self.t += self.period
+        return self.t
+
+
+def replay_session(key):
+    """A fresh glove session whose segmenter runs on frame time."""
+    with session_manager.lock:
+        session_manager.sessions.pop(key, None)
+    session_manager.get(key).segmenter = MotionSegmenter(clock=FrameClock())
+
+
+POSES = [("A", [3000, 3000, 3000, 3000, 0, 0, 9.8]),
+         ("B", [2000, 3400, 1500, 2600, 2, -3, 8]),
+         ("C", [1000, 1000, 1000, 1000, 5, 5, 0])]
+
+
+def test_onset_hold_and_rest_events():
+    segmenter = MotionSegmenter(clock=FrameClock())
+    events = []
+    for t, (label, frame) in enumerate(signing(POSES, rest=140)):
+        segmenter.update(frame[:4], frame[4:])
+        if segmenter.event:
+            events.append((segmenter.event, t))
+
+    assert [e for e, _ in events] == ["hold", "onset", "hold", "onset", "hold", "rest"]
+    # Motion is seen on the first moving frame; a hold within a few frames of settling
+    assert [t for e, t in events if e == "onset"] == [30, 68]
+    holds = [t for e, t in events if e == "hold"]
+    assert holds[1] - 38 <= 6 and holds[2] - 76 <= 6
+    assert segmenter.state == REST and segmenter.onsets == 2 and segmenter.holds == 3
+    # The rest comes after rest_seconds of holding, not a frame count
+    assert 4.0 <= ([t for e, t in events if e == "rest"][0] - holds[2]) / 33.0 < 4.2
+
+
+def test_a_slowly_held_sign_is_not_a_rest():
+    segmenter = MotionSegmenter(clock=FrameClock())
+    states = [segmenter.update(frame[:4], frame[4:]) for _, frame in signing(POSES[:1], hold=100)]
+    assert segmenter.holds == 1 and REST not in states  # 3 s at 33 Hz
+
+
+def test_gyro_alone_starts_a_movement():
+    segmenter = MotionSegmenter()
+    rng = np.random.default_rng(1)
+    for _ in range(20):
+        segmenter.update(rng.normal(3000, 3, 4), rng.normal(0, 0.05, 3), rng.normal(0, 0.5, 3))
+    assert segmenter.state == HOLD
+
+    # A wrist turn in place: flex and accelerometer barely change
+    segmenter.update(rng.normal(3000, 3, 4), rng.normal(0, 0.05, 3), [40.0, 5.0, 0.0])
+    assert segmenter.event == "onset" and segmenter.state == MOVING
+
+
+def test_ml_service_classifies_only_holds(tmp_path, monkeypatch):
+    monkeypatch.setattr(ml_module, "DEMO_MODE", False)
+
+    rng = np.random.default_rng(0)
+    X = np.vstack([rng.normal(pose, NOISE, size=(40, 7)) for _, pose in POSES])
+    y = np.repeat([label for label, _ in POSES], 40)
+    model = RandomForestClassifier(n_estimators=5, random_state=0).fit(X, y)
+    ModelStore(str(tmp_path)).publish(compile_forest(model), COLUMNS, {"bigrams": label_bigrams(y)})
+
+    ml = MLService(store_path=str(tmp_path), workers=1, batch_size=1)
+    classified = []
+    decode = ml._decode
+    ml._decode = lambda lm, proba, session: (classified.append(current), decode(lm, proba, session))
+    events = []
+    ml.register_callback(events.append)
+    replay_session("segment-test")
+
+    stream = signing(POSES, rest=200)
+    for current, (label, frame) in enumerate(stream):
+        ml.process_data(frame[:4], frame[4:], "segment-test")
+
+    # No transition frame reaches the classifier, and the rest stops it too
+    assert classified and all(stream[i][0] != "move" for i in classified)
+    assert len(classified) < sum(label != "move" for label, _ in stream) - 50
+
+    words = [e["word"] for e in events if not e.get("partial") and not e["final"]]
+    assert words == ["A", "B", "C"]
+    # The rest ends the sentence without waiting for sentence_gap
+    assert events[-1]["final"] and events[-1]["words"] == ["A", "B", "C"]
+
+
+def test_same_sign_twice_is_two_words_after_an_onset(tmp_path, monkeypatch):
+    monkeypatch.setattr(ml_module, "DEMO_MODE", False)
+
+    rng = np.random.default_rng(0)
+    X = np.vstack([rng.normal(pose, NOISE, size=(40, 7)) for _, pose in POSES])
+    y = np.repeat([label for label, _ in POSES], 40)
+    model = RandomForestClassifier(n_estimators=5, random_state=0).fit(X, y)
+    ModelStore(str(tmp_path)).publish(compile_forest(model), COLUMNS, {"bigrams": label_bigrams(y)})
+
+    # Sign A, drop the hand away and back, sign A again, then rest
+    a, away = np.asarray(POSES[0][1]), np.asarray(POSES[2][1])
+    swing = [a + (away - a) * np.sin(t / 16 * np.pi) + rng.normal(0, NOISE) for t in range(1, 16)]
+    stream = [f for _, f in signing(POSES[:1])] + swing + [f for _, f in signing(POSES[:1], rest=140, seed=1)]
+
+    for decoder in ("beam", "stability"):
+        ml = MLService(store_path=str(tmp_path), workers=1, batch_size=1, decoder=decoder)
+        events = []
+        ml.register_callback(events.append)
+        replay_session("repeat-test")
+        for frame in stream:
+            ml.process_data(frame[:4], frame[4:], "repeat-test")
+        words = [e["word"] for e in events if not e.get("partial") and not e.get("final")]
+        assert words == ["A", "A"], decoder
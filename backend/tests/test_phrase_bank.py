@@ -0,0 +1,65 @@
+import os
+import sys
+
+import numpy as np
+
+# Add backend to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from services.phrase_bank import PhraseBank, normalize, to_format, write_pack
+
+RATE = 1000
+
+
+def tone(seconds, value, silence=0.1):
+    pad = np.zeros(int(silence * RATE), dtype=np.int16)
+    return np.concatenate([pad, np.full(int(seconds * RATE), value, dtype=np.int16), pad])
+
+
+def make_bank(tmp_path):
+    path = tmp_path / "bank" / "phrases.pack"
+    write_pack(str(path), {
+        ("en", "Hello, I am Yash."): tone(1.0, 1000),
+        ("en", "hello"): tone(0.2, 2000),
+        ("en", "team"): tone(0.3, 3000),
+        ("en", "TEAM_FSOCITY"): tone(0.5, 4000),
+        ("hi", "नमस्ते"): tone(0.4, 5000),
+    }, RATE)
+    return PhraseBank(str(path), crossfade_ms=20, pad_ms=10)
+
+
+def test_normalize_keeps_marks_and_drops_punctuation():
+    assert normalize("Hello,  I am Yash.") == "hello i am yash"
+    assert normalize("TEAM_FSOCITY") == "team fsocity"
+    assert normalize("नमस्ते।") == "नमस्ते"
+
+
+def test_whole_phrases_are_views_into_the_pack(tmp_path):
+    bank = make_bank(tmp_path)
+    clip = bank.clip("hello i am YASH!", "en")
+    assert clip is not None and not clip.flags.owndata
+    assert np.array_equal(clip, tone(1.0, 1000))
+    assert np.array_equal(bank.render("नमस्ते", "hi"), tone(0.4, 5000))
+    assert bank.clip("hello", "hi") is None
+    bank.close()
+
+
+def test_render_stitches_longest_phrases_with_crossfades(tmp_path):
+    bank = make_bank(tmp_path)
+    assert bank.plan("Hello team fsocity team", "en") == ["hello", "team fsocity", "team"]
+    assert not bank.covers("hello world", "en")
+    assert bank.render("hello world", "en") is None
+
+    pcm = bank.render("hello team", "en")
+    # Trimmed to speech + 10ms pad each, overlapped by one 20ms crossfade
+    assert len(pcm) == (200 + 20) + (300 + 20) - 20
+    assert pcm[15] == 2000 and pcm[-15] == 3000
+    assert 0 < pcm[201:219].min() and pcm[201:219].max() < 3000
+
+
+def test_to_format_resamples_and_mixes():
+    mono = np.arange(0, 1000, 10, dtype=np.int16)
+    stereo = to_format(mono, RATE, 1, 2 * RATE, 2)
+    assert len(stereo) == 2 * 2 * len(mono)
+    assert np.array_equal(stereo[0::2], stereo[1::2])
+    assert np.array_equal(to_format(stereo, 2 * RATE, 2, RATE, 1)[:5], mono[:5])
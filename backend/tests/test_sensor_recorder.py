@@ -0,0 +1,76 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+# Add backend to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from services.sensor_recorder import SensorRecorder, load_recording
+from services.wire_protocol import TCP_CSV_LAYOUTS, FrameDecoder, encode_frame
+
+
+def test_recording_round_trip_with_rotation(tmp_path):
+    recorder = SensorRecorder(str(tmp_path), chunk_frames=4, max_segment_bytes=1)
+    decoder = FrameDecoder()
+
+    path = recorder.start("session", label="HELLO")
+    for i in range(10):
+        device = f"glove-{i % 2}"
+        if i == 6:
+            recorder.set_label("I", device="glove-1")
+        recorder.record(device, decoder.decode(encode_frame([i, 0, 0, 0], [0, 0, 1], device_id=i % 2, seq=i)), t=100.0 + i)
+    recorder.record("default", FrameDecoder(TCP_CSV_LAYOUTS).decode("1,2,3,0.1,0.2,0.3,4,5,6"), t=200.0)
+    stats = recorder.stop()
+
+    assert stats["recorded"] == stats["written"] == 11 and stats["dropped"] == 0
+    assert len(os.listdir(path)) == 3  # 4 + 4 + 3 frames, one block per segment
+
+    rec = load_recording(path)
+    assert rec["flex"][:10, 0].tolist() == list(range(10))
+    assert rec["seq"].tolist() == list(range(10)) + [-1]
+    assert rec["device"][:3].tolist() == ["glove-0", "glove-1", "glove-0"]
+    assert rec["label"].tolist() == ["HELLO"] * 7 + ["I", "HELLO", "I", "HELLO"]
+
+    # Text frame with 3 flex + gyro; binary frames carry no gyro
+    assert rec["flex"][10, :3].tolist() == [1, 2, 3] and np.isnan(rec["flex"][10, 3:]).all()
+    assert np.allclose(rec["gyro"][10], [4, 5, 6]) and np.isnan(rec["gyro"][0]).all()
+
+
+def test_torn_tail_block_is_skipped(tmp_path):
+    recorder = SensorRecorder(str(tmp_path), chunk_frames=2)
+    decoder = FrameDecoder()
+
+    path = recorder.start("torn")
+    for i in range(4):
+        recorder.record("default", decoder.decode(encode_frame([i, 0, 0, 0], [0, 0, 1])))
+    recorder.stop()
+
+    segment = os.path.join(path, os.listdir(path)[0])
+    with open(segment, "r+b") as f:
+        f.truncate(os.path.getsize(segment) - 5)
+
+    assert load_recording(path)["flex"][:, 0].tolist() == [0, 1]
+
+
+def test_names_must_stay_inside_the_root_and_a_dead_writer_ends_the_recording(tmp_path):
+    recorder = SensorRecorder(str(tmp_path / "recordings"), chunk_frames=1)
+    for name in ("../escape", "a/b", str(tmp_path / "abs"), "..", ".hidden"):
+        with pytest.raises(ValueError):
+            recorder.start(name)
+    assert not recorder.active and not os.path.exists(tmp_path / "escape")
+
+    def fail(chunk):
+        raise OSError("disk full")
+
+    recorder._write = fail
+    recorder.start("broken")
+    recorder.record("default", FrameDecoder().decode(encode_frame([0, 0, 0, 0], [0, 0, 1])))
+    thread = recorder.thread
+    thread.join(timeout=5)
+    assert not recorder.stats()["active"]
+
+    stats = recorder.stop()
+    assert stats["error"] == "OSError('disk full')" and recorder.thread is None and not thread.is_alive()
+    assert recorder.stop()["error"] == stats["error"]  # Still reported, nothing left to join
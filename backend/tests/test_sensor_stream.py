@@ -0,0 +1,88 @@
+import asyncio
+import os
+import sys
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+
+# Add backend to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from api.routes import sensors
+from services.data_store import DataStore
+from services.sensor_stream import SensorStream
+from services.session_manager import session_manager
+
+
+def test_first_message_is_snapshot_then_deltas():
+    async def run():
+        store = DataStore()
+        deltas = SensorStream(store, max_hz=100).deltas()
+
+        first = await deltas.__anext__()
+        store.update({"ax": 1.5})
+        second = await deltas.__anext__()
+        await deltas.aclose()
+        return store, first, second
+
+    store, first, second = asyncio.run(run())
+
+    assert first["ax"] == 0.0 and first["lang"] == "en"
+    assert set(second) == {"ax", "last_updated", "version"} and second["ax"] == 1.5
+    assert store.listeners == ()
+
+
+def test_bursts_are_coalesced_under_rate_limit():
+    async def run():
+        store = DataStore()
+        deltas = SensorStream(store, max_hz=5).deltas()
+        await deltas.__anext__()
+
+        for i in range(50):
+            store.update({"ax": float(i)})
+        store.update_config({"lang": "hi"})
+        delta = await deltas.__anext__()
+        await deltas.aclose()
+        return delta
+
+    delta = asyncio.run(run())
+
+    assert delta["ax"] == 49.0 and delta["lang"] == "hi"
+
+
+def test_websocket_answers_pings_and_notices_a_close(monkeypatch):
+    store = DataStore()
+    monkeypatch.setattr(sensors, "data_store", store)
+    app = FastAPI()
+    app.include_router(sensors.router)
+
+    with TestClient(app).websocket_connect("/ws/sensors?max_hz=100") as ws:
+        assert "version" in ws.receive_json()
+        ws.send_text("not json")
+        ws.send_json({"ping": 1234.5})
+        assert ws.receive_json() == {"pong": 1234.5}
+        store.update({"ax": 2.0})
+        assert ws.receive_json()["ax"] == 2.0
+
+        # The server's read sees the close and drops its subscription
+        ws.close()
+        deadline = time.monotonic() + 2.0
+        while store.listeners and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert store.listeners == ()
+
+
+def test_unknown_devices_are_not_created_by_readers():
+    app = FastAPI()
+    app.include_router(sensors.router)
+    client = TestClient(app)
+
+    assert client.get("/sensors/stream?device=nobody-1").status_code == 404
+    with pytest.raises(WebSocketDisconnect) as closed:
+        with client.websocket_connect("/ws/sensors?device=nobody-2"):
+            pass
+    assert closed.value.code == 1008
+    assert session_manager.find("nobody-1") is None and session_manager.find("nobody-2") is None
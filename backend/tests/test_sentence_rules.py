@@ -0,0 +1,49 @@
+import os
+import sys
+import time
+
+# Add backend to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from services.gemini_service import RULES_FILE
+from services.sentence_rules import SentenceRules
+
+
+def test_shipped_rules_build_the_demo_sentence():
+    rules = SentenceRules.load(RULES_FILE)
+    assert rules.correct("HELLO I YASH WE TEAM_FSOCITY") == "Hello, I am Yash. We are Team Fsociety."
+    assert rules.correct("i i yash yash we teamfsociety") == "I am Yash. We are Team Fsociety."
+    assert rules.correct("hello we") == "Hello, we."
+    assert rules.correct("  ") == ""
+
+
+def test_longest_match_tags_and_rule_order():
+    rules = SentenceRules(
+        labels=[{"phrase": "new york", "text": "New York", "tag": "place"},
+                {"phrase": "new york city", "text": "New York City", "tag": "place"}],
+        templates=[{"pattern": "i *", "output": "I am {1}."},
+                   {"pattern": "i live <place>", "output": "I live in {2}."},
+                   {"pattern": "i live *", "output": "I live near {2}."},
+                   {"pattern": "i *", "output": "shadowed"}],
+    )
+    assert [u.text for u in rules.units("i live new york city")] == ["i", "live", "New York City"]
+    assert rules.correct("I live NEW_YORK") == "I live in New York."
+    assert rules.correct("i live there") == "I live near there."
+    assert rules.correct("i sing") == "I am sing."
+    assert rules.correct("hello world") == "Hello world."
+
+
+def test_many_rules_long_stream_is_memoized():
+    labels = [{"phrase": f"sign {n}", "text": f"Sign{n}", "tag": "name"} for n in range(2000)]
+    templates = [{"pattern": f"word{n} *", "output": f"W{n} {{1}}."} for n in range(2000)]
+    rules = SentenceRules(labels, templates)
+
+    text = " ".join(f"word{n % 2000} sign {n}" for n in range(0, 4000, 7))
+    start = time.perf_counter()
+    first = rules.correct(text)
+    elapsed = time.perf_counter() - start
+    assert first.startswith("W0 Sign0. W7 Sign7.")
+    assert elapsed < 1.0
+
+    assert rules.correct(text) is first
+    assert rules.correct.cache_info().hits == 1
@@ -0,0 +1,60 @@
+import os
+import sys
+import time
+
+# Add backend to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from services.ml_service import MLService
+from services.session_manager import DEFAULT_DEVICE, SessionManager, session_manager
+
+
+class _Frame:
+    def __init__(self, device_id, binary=True):
+        self.device_id = device_id
+        self.binary = binary
+
+
+def test_sessions_are_keyed_by_device_or_address():
+    manager = SessionManager()
+
+    assert manager.key_for(_Frame(3), ("10.0.0.5", 4000)) == "glove-3"
+    assert manager.key_for(_Frame(0, binary=False), ("10.0.0.5", 4000)) == "10.0.0.5"
+    assert manager.key_for(None) == DEFAULT_DEVICE
+
+    a, b = manager.get("glove-1"), manager.get("glove-2")
+    a.update({"ax": 1.0})
+    b.update({"ax": 2.0})
+
+    assert manager.get("glove-1") is a
+    assert manager.snapshot()["glove-1"]["ax"] == 1.0
+    assert manager.snapshot()["glove-2"]["ax"] == 2.0
+
+
+def test_lost_frames_are_counted_across_wraparound():
+    session = SessionManager().get("glove-1")
+
+    for seq in (0xFFFFFFFE, 0xFFFFFFFF, 2, 1, 3):
+        session.track_seq(seq)
+
+    assert session.lost == 2  # 0 and 1 missing when 2 arrives; late 1 is ignored
+
+
+def test_idle_sessions_expire():
+    manager = SessionManager(idle_timeout=10.0)
+    manager.get("glove-1").last_seen = 100.0
+    manager.get("glove-2").last_seen = 105.0
+
+    assert manager.expire(now=112.0) == ["glove-1"]
+    assert list(manager.sessions) == ["glove-2"]
+
+
+def test_frames_without_a_device_keep_the_default_session_alive():
+    ml = MLService(store_path="/nonexistent", workers=1, segment=False)
+    session = session_manager.get()
+    session.last_seen = time.time() - 2 * session_manager.idle_timeout
+
+    for _ in range(3):
+        ml.process_data([1, 2, 3, 4], [0, 0, 9.8])  # Serial / TCP / polling
+        assert DEFAULT_DEVICE not in session_manager.expire()
+    assert session_manager.get() is session
@@ -0,0 +1,37 @@
+import os
+import sys
+
+# Add backend to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from services.tts_cache import TTSCache, cache_key
+
+
+def test_cache_hit_after_put_and_across_restarts(tmp_path):
+    root = str(tmp_path / "tts")
+    key = cache_key("Hello,  I am Yash.", "en", "en-US-AriaNeural")
+    assert key == cache_key(" Hello, I am Yash. ", "en", "en-US-AriaNeural")
+    assert key != cache_key("Hello, I am Yash.", "hi", "hi-IN-SwaraNeural")
+
+    cache = TTSCache(root)
+    assert cache.get(key) is None
+    cache.put(key, b"mp3-bytes")
+    assert cache.get(key) == b"mp3-bytes"
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    # A new process finds the clip on disk
+    reopened = TTSCache(root)
+    assert key in reopened and reopened.get(key) == b"mp3-bytes"
+    assert os.listdir(root) == [f"{key}.mp3"]
+
+
+def test_memory_and_disk_caps_evict_least_recently_used(tmp_path):
+    cache = TTSCache(str(tmp_path / "tts"), max_memory_bytes=20, max_disk_bytes=25)
+    cache.put("a", b"x" * 10)
+    cache.put("b", b"y" * 10)
+    cache.get("a")               # "b" is now least recently used
+    cache.put("c", b"z" * 10)
+
+    assert "b" not in cache and "a" in cache and "c" in cache
+    assert cache.disk_bytes == 20 and cache.memory_bytes == 20
+    assert sorted(os.listdir(tmp_path / "tts")) == ["a.mp3", "c.mp3"]
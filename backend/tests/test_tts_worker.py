@@ -0,0 +1,102 @@
+import asyncio
+import os
+import sys
+import threading
+
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+# Add backend to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from services.tts_service import PRIORITY_SENTENCE, TTSService
+
+
+class FakeEdge:
+    """Stands in for _speak_edge: records texts, blocks until released."""
+
+    def __init__(self):
+        self.spoken = []
+        self.started = threading.Event()
+        self.release = threading.Event()
+        self.done = threading.Event()
+
+    async def __call__(self, text, lang, play, output_file):
+        self.started.set()
+        try:
+            while not self.release.is_set():
+                await asyncio.sleep(0.005)
+            self.spoken.append(text)
+        finally:
+            self.done.set()
+
+
+def make_service(tmp_path, monkeypatch, **kwargs):
+    service = TTSService(cache_dir=str(tmp_path / "cache"), **kwargs)
+    edge = FakeEdge()
+    monkeypatch.setattr(service, "_speak_edge", edge)
+    monkeypatch.setattr(service, "_speak_fallback", lambda text: None)
+    return service, edge
+
+
+def drain(service, edge):
+    edge.release.set()
+    for _ in range(400):
+        with service.lock:
+            if not service.queue and service.current is None:
+                return
+        threading.Event().wait(0.005)
+    raise AssertionError("TTS worker did not drain")
+
+
+def test_priority_supersede_and_coalesce(tmp_path, monkeypatch):
+    service, edge = make_service(tmp_path, monkeypatch)
+    try:
+        service.speak("busy")
+        assert edge.started.wait(2)
+
+        service.speak("word one")
+        assert service.speak("word one") is False  # Coalesced
+        service.speak("old sentence", priority=PRIORITY_SENTENCE, key="sentence:a")
+        service.speak("new sentence", priority=PRIORITY_SENTENCE, key="sentence:a")
+        assert service.superseded == 1 and service.queued() == 2
+
+        drain(service, edge)
+        assert edge.spoken == ["busy", "new sentence", "word one"]
+    finally:
+        service.shutdown()
+
+
+def test_queue_is_bounded(tmp_path, monkeypatch):
+    service, edge = make_service(tmp_path, monkeypatch, max_queue=2)
+    try:
+        service.speak("busy")
+        assert edge.started.wait(2)
+        for text in ("a", "b", "c"):
+            service.speak(text)
+        service.speak("urgent", priority=PRIORITY_SENTENCE)
+
+        assert service.queued() == 2 and service.dropped == 2
+        drain(service, edge)
+        assert edge.spoken == ["busy", "urgent", "c"]
+    finally:
+        service.shutdown()
+
+
+def test_stop_cancels_current_and_queued(tmp_path, monkeypatch):
+    service, edge = make_service(tmp_path, monkeypatch)
+    try:
+        service.speak("long")
+        assert edge.started.wait(2)
+        service.speak("queued")
+
+        service.stop()
+        assert edge.done.wait(2)
+        assert service.queued() == 0 and edge.spoken == []
+
+        # The worker keeps serving after a stop
+        edge.release.set()
+        service.speak("after")
+        drain(service, edge)
+        assert edge.spoken == ["after"]
+    finally:
+        service.shutdown()
@@ -0,0 +1,76 @@
+import asyncio
+import os
+import socket
+import sys
+import time
+
+# Add backend to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from services.frame_ring import FrameRings
+from services.session_manager import session_manager
+from services.udp_service import UDPService
+from services.wire_protocol import encode_frame
+
+
+def test_datagrams_reach_callback_in_order():
+    received = []
+
+    async def run():
+        service = UDPService(host="127.0.0.1", port=0)
+        service.register_callback(lambda flex, acc, device, gyro, frame: received.append((device, flex[0])))
+        await service.start()
+        port = service.sock.getsockname()[1]
+
+        sender = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        for i in range(5):
+            sender.sendto(encode_frame([i, 0, 0, 0], [0, 0, 1], device_id=i % 2, seq=i), ("127.0.0.1", port))
+        sender.sendto(b"garbage", ("127.0.0.1", port))
+        sender.close()
+
+        for _ in range(100):
+            if service.received == 6 and service.queue.empty():
+                break
+            await asyncio.sleep(0.01)
+        await asyncio.sleep(0)
+        service.stop()
+        return service.stats()
+
+    stats = asyncio.run(run())
+
+    assert received == [("glove-0", 0), ("glove-1", 1), ("glove-0", 2), ("glove-1", 3), ("glove-0", 4)]
+    assert stats["corrupt"] == 1 and stats["processed"] == 5 and stats["dropped"] == 0
+
+
+def test_full_queue_drops_oldest_frame():
+    async def run():
+        service = UDPService(queue_size=2, rings=FrameRings(capacity=8))
+        service.on_data_callback = lambda flex, acc, device, gyro, frame: None
+        service.queue = asyncio.Queue(maxsize=2)
+        for i in range(4):
+            service._handle(f"{i},0,0,0,0,0,1")
+        queued = [service.queue.get_nowait() for _ in range(2)]
+        return service, [service.rings.get(device).frame(seq)[0] for device, seq, _ in queued]
+
+    service, queued = asyncio.run(run())
+    service.rings.close()
+
+    assert queued == [2, 3]
+    assert service.dropped == 2
+
+
+def test_expired_sessions_are_forgotten():
+    async def run():
+        service = UDPService(host="127.0.0.1", port=0, rings=FrameRings(capacity=8))
+        await service.start()
+        assert service.loop is not None and service.transport is None  # Drained via add_reader
+        service._handle("1,0,0,0,0,0,1", ("10.9.8.7", 5005))
+        assert "10.9.8.7" in service.published and "10.9.8.7" in service.rings.names()
+        session_manager.expire(now=time.time() + 3600)
+        assert "10.9.8.7" not in service.rings.names()  # Shared memory released
+        published = dict(service.published)
+        service.stop()
+        service.rings.close()
+        return published
+
+    assert "10.9.8.7" not in asyncio.run(run())
@@ -0,0 +1,74 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+# Add backend to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from scripts import train_custom
+from services import ml_service as ml_module
+from services.ml_service import MLService
+from services.model_store import ModelStore
+from services.session_manager import session_manager
+from services.window_features import RollingWindow, window_columns, window_features
+
+COLUMNS = ['f1', 'f2', 'f3', 'f4', 'ax', 'ay', 'az']
+
+
+def test_rolling_window_matches_the_vectorised_features():
+    X = np.random.default_rng(0).normal(size=(60, 7)) * [3000, 3000, 3000, 3000, 9.8, 9.8, 9.8]
+    for size in (3, 5, 12):
+        expected = window_features(X, size)
+        window = RollingWindow(7, size)
+        for _ in range(2):  # Again after a reset (new sign onset)
+            # push() returns a view that the next push overwrites
+            streamed = [None if f is None else f.copy() for f in map(window.push, X)]
+            assert all(f is None for f in streamed[:size - 1])
+            streamed = np.array(streamed[size - 1:])
+            assert streamed.shape == expected.shape == (len(X) - size + 1, len(window_columns(COLUMNS)))
+            assert np.allclose(streamed, expected, rtol=1e-7, atol=1e-6)
+            window.reset()
+
+
+def test_windowed_split_holds_out_the_tail_of_each_recording():
+    X = np.arange(40, dtype=float).repeat(7).reshape(40, 7)
+    y = np.array(["A"] * 25 + ["B"] * 15)
+    X_train, X_test, y_train, y_test = train_custom.build_windowed(X, y, 5)
+
+    # 21 + 11 windows, split 16/5 and 8/3; windows never cross a label change
+    assert (len(X_train), len(X_test)) == (24, 8)
+    assert X_train[y_train == "A", 0].max() < X_test[y_test == "A", 0].min()
+    assert X_test[y_test == "A", 0].max() == 24 and X_train[y_train == "B", 0].min() == 29
+
+
+def test_windowed_training_round_trips_its_window_through_the_store(tmp_path, monkeypatch):
+    rng = np.random.default_rng(1)
+    poses = {"HELLO": [3000, 3000, 3000, 3000, 0, 0, 9.8], "WE": [1000, 1000, 1000, 1000, 5, 5, 0]}
+    frames = pd.concat([pd.DataFrame(rng.normal(pose, 1.0, (80, 7)), columns=COLUMNS).assign(label=sign)
+                        for sign, pose in poses.items()])
+    csv = tmp_path / "signs.csv"
+    frames.to_csv(csv, index=False)
+
+    store = tmp_path / "store"
+    monkeypatch.setattr(train_custom, "STORE_PATH", str(store))
+    train_custom.main(["--data", str(csv), "--window", "5", "--stability", "2", "--trees", "5",
+                       "--jobs", "1", "--no-cache", "--pickle", str(tmp_path / "unused.pkl")])
+    assert not (tmp_path / "unused.pkl").exists()  # The pickle is per-frame only
+
+    _, manifest = ModelStore(str(store)).load()
+    assert manifest["columns"] == window_columns(COLUMNS)
+    assert manifest["metadata"]["window"] == 5 and manifest["metadata"]["required_stability"] == 2
+
+    monkeypatch.setattr(ml_module, "DEMO_MODE", False)
+    ml = MLService(store_path=str(store), workers=1, batch_size=1, decoder="stability", segment=False)
+    assert ml.active[3] == 5 and ml.active_stability == 2
+    events = []
+    ml.register_callback(events.append)
+    with session_manager.lock:
+        session_manager.sessions.pop("window-glove", None)
+    for sign, pose in poses.items():
+        for row in rng.normal(pose, 1.0, (10, 7)):
+            ml.process_data(row[:4], row[4:], "window-glove")
+    assert [e["word"] for e in events if e["device"] == "window-glove"] == ["HELLO", "WE"]
@@ -0,0 +1,84 @@
+import os
+import sys
+
+# Add backend to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from services.polling_service import PollingService
+from services.wire_protocol import TCP_CSV_LAYOUTS, FrameDecoder, encode_frame
+
+
+def test_int16_frame_round_trip():
+    decoder = FrameDecoder()
+    packet = encode_frame([2100, 1987, 2222, 2345], [0.15, -0.21, 9.81], device_id=7, seq=42, timestamp_ms=1234)
+
+    frame = decoder.decode(packet)
+
+    assert len(packet) == 28
+    assert frame.binary and frame.device_id == 7 and frame.seq == 42 and frame.timestamp_ms == 1234
+    assert frame.flex.tolist() == [2100, 1987, 2222, 2345]
+    assert frame.acc.tolist() == [0.15, -0.21, 9.81]
+    assert not frame.has_gyro
+
+
+def test_float32_frame_with_gyro():
+    decoder = FrameDecoder()
+    packet = encode_frame([0.25, 1.0, 0.5, 0.125], [0.5, -0.25, 1.0], gyro=[0.0, 0.5, -1.5], float32=True)
+
+    frame = decoder.decode(memoryview(bytearray(packet)))
+
+    assert frame.flex.tolist() == [0.25, 1.0, 0.5, 0.125]
+    assert frame.gyro.tolist() == [0.0, 0.5, -1.5]
+
+
+def test_csv_formats_are_auto_detected():
+    decoder = FrameDecoder()
+
+    frame = decoder.decode(b"0.206,1.000,0.109,0.109,0.158,-0.212,0.998\n")
+    assert not frame.binary
+    assert frame.flex.tolist() == [0.206, 1.0, 0.109, 0.109]
+    assert frame.acc.tolist() == [0.158, -0.212, 0.998]
+
+    frame = decoder.decode("1,2,3,4,0.1,0.2,0.3,7,8,9")
+    assert frame.flex.tolist() == [1, 2, 3, 4] and frame.gyro.tolist() == [7, 8, 9]
+
+    frame = decoder.decode("FLEX:1,2,3,4 | ACC:0.1,0.2,0.3 | GYR:7,8,9")
+    assert frame.flex.tolist() == [1, 2, 3, 4] and frame.gyro.tolist() == [7, 8, 9]
+
+
+def test_nine_field_lines_depend_on_the_transport():
+    line = "1,2,3,4,0.1,0.2,0.3,5,6"
+
+    # UDP / Serial: 4 flex + 3 accel, trailing fields ignored
+    frame = FrameDecoder().decode(line)
+    assert frame.flex.tolist() == [1, 2, 3, 4] and frame.acc.tolist() == [0.1, 0.2, 0.3]
+    assert not frame.has_gyro
+
+    # TCP firmware: 3 flex + 3 accel + 3 gyro (and 5 flex at 11 fields)
+    decoder = FrameDecoder(TCP_CSV_LAYOUTS)
+    frame = decoder.decode(line)
+    assert frame.flex.tolist() == [1, 2, 3] and frame.acc.tolist() == [4, 0.1, 0.2]
+    assert frame.gyro.tolist() == [0.3, 5, 6]
+    assert decoder.decode("1,2,3,4,5,0.1,0.2,0.3,7,8,9").flex.tolist() == [1, 2, 3, 4, 5]
+
+
+def test_polling_accepts_lines_longer_than_ten_fields():
+    polling = PollingService()
+    frames = []
+    polling.register_callback(lambda flex, acc: frames.append(flex + acc))
+
+    polling._process_data(b"1,2,3,4,0.1,0.2,0.3,7,8,9,55,66")
+    assert frames == [[1, 2, 3, 4, 0.1, 0.2, 0.3]]
+    assert polling.decoder.frame.gyro.tolist() == [7, 8, 9]
+
+    polling._process_data(b"1,2,3,4,0.1,0.2,0.3,7,8")  # Too short for gyro
+    assert len(frames) == 1
+
+
+def test_corrupt_packets_are_rejected():
+    decoder = FrameDecoder()
+
+    assert decoder.decode(b"") is None
+    assert decoder.decode(b"hello") is None
+    assert decoder.decode(b"1,2,x,4,5,6,7") is None
+    assert decoder.decode(encode_frame([1, 2, 3, 4], [5, 6, 7])[:20]) is None
@@ -12,6 +12,29 @@ const char* WIFI_PASS = "12345678";
 const char* SERVER_IP = "192.168.137.1";   // Laptop Hotspot Default IP
 const int SERVER_PORT = 5005;
 
+// ================= WIRE FORMAT =================
+// 1 = compact binary frames (see backend/services/wire_protocol.py)
+// 0 = legacy ASCII CSV. The backend auto-detects either format.
+#define WIRE_BINARY 1
+
+const uint8_t FRAME_VERSION = 1;
+const uint8_t FLAG_FLOAT32 = 0x01;
+const uint8_t FLAG_GYRO = 0x02;
+
+// 14-byte header + 7 int16 channels = 28 bytes
+struct __attribute__((packed)) GloveFrame {
+  char magic[2];          // 'S', 'G'
+  uint8_t version;
+  uint8_t flags;
+  uint16_t deviceId;
+  uint32_t seq;
+  uint32_t timestampMs;
+  int16_t ch[7];          // f1..f4 (raw ADC), ax, ay, az (m/s^2 * 100)
+};
+
+GloveFrame frame;
+uint32_t frameSeq = 0;
+
 // ================= SENSORS =================
 Adafruit_MPU6050 mpu;
 WiFiUDP udp;
@@ -76,6 +99,13 @@ void setup() {
   // ---- WIFI ----
   connectWiFi();
   udp.begin(SERVER_PORT);
+
+  // ---- FRAME HEADER (constant part) ----
+  frame.magic[0] = 'S';
+  frame.magic[1] = 'G';
+  frame.version = FRAME_VERSION;
+  frame.flags = 0;  // int16 channels, no gyro
+  frame.deviceId = (uint16_t)(ESP.getEfuseMac() & 0xFFFF);
 }
 
 // ================= LOOP =================
@@ -94,6 +124,26 @@ void loop() {
   int f3 = getSmoothFlex(2);
   int f4 = getSmoothFlex(3);
 
+#if WIRE_BINARY
+  // Binary packet for backend (little-endian, same as the ESP32)
+  frame.seq = frameSeq++;
+  frame.timestampMs = millis();
+  frame.ch[0] = f1;
+  frame.ch[1] = f2;
+  frame.ch[2] = f3;
+  frame.ch[3] = f4;
+  frame.ch[4] = (int16_t)lroundf(a.acceleration.x * 100.0f);
+  frame.ch[5] = (int16_t)lroundf(a.acceleration.y * 100.0f);
+  frame.ch[6] = (int16_t)lroundf(a.acceleration.z * 100.0f);
+
+  udp.beginPacket(SERVER_IP, SERVER_PORT);
+  udp.write((const uint8_t*)&frame, sizeof(frame));
+  udp.endPacket();
+
+  // Serial (debug / wired mode) stays CSV
+  Serial.printf("%d,%d,%d,%d,%.2f,%.2f,%.2f\n", f1, f2, f3, f4,
+                a.acceleration.x, a.acceleration.y, a.acceleration.z);
+#else
   // CSV packet for backend (Precise format from Code 1)
   String packet =
     String(f1) + "," +
@@ -111,6 +161,7 @@ void loop() {
   udp.beginPacket(SERVER_IP, SERVER_PORT);
   udp.print(packet);
   udp.endPacket();
+#endif
 
   writeIdx = (writeIdx + 1) % WINDOW_SIZE;
   delay(30);   // ~33 Hz
@@ -33,77 +33,108 @@ function App() {
     setLogs(prev => [{ time: timestamp, message, id: Date.now() }, ...prev].slice(0, 50));
   };
 
-  // ---------------- BACKEND POLLING ----------------
-  const BACKEND_URL = `http://${backendIP}:8000/sensors`;
+  // ---------------- BACKEND PUSH CHANNEL ----------------
+  const BACKEND_HTTP = `http://${backendIP}:8000`;
+  const BACKEND_WS = `ws://${backendIP}:8000/ws/sensors?max_hz=10`;
+
+  const gestureRef = useRef(gesture);
+  const sentenceRef = useRef(sentence);
+
+  // Config is written once per change instead of on every poll
+  useEffect(() => {
+    fetch(`${BACKEND_HTTP}/config`, {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify({ use_gemini: useGemini, lang: language, auto_speak: autoSpeak })
+    }).catch((e) => console.warn("Config update failed:", e));
+  }, [BACKEND_HTTP, useGemini, language, autoSpeak]);
 
   useEffect(() => {
+    if (!isSystemOn) return;
+
     let isMounted = true;
-    const controller = new AbortController();
-    const { signal } = controller;
-
-    const pollInterval = setInterval(() => {
-      if (!isSystemOn) return;
-      const startTime = performance.now();
-
-      fetch(`${BACKEND_URL}?use_gemini=${useGemini}&lang=${language}&auto_speak=${autoSpeak}`, { signal })
-        .then(res => {
-          if (!res.ok) throw new Error('Network response was not ok');
-          return res.json();
-        })
-        .then(data => {
-          if (!isMounted) return;
-          const endTime = performance.now();
-          setLatency(Math.round(endTime - startTime));
-
-          if (!isConnected) {
-            setIsConnected(true);
-            setDeviceStatus('CONNECTED');
-            addLog(`Connected: ${latency}ms`);
-          }
+    let retryTimer = null;
+    let socket = null;
+
+    let pingTimer = null;
+
+    const handleUpdate = (data) => {
+      // Round trip on this clock only (the server's clock may differ)
+      if ('pong' in data) {
+        setLatency(Math.round(performance.now() - data.pong));
+        return;
+      }
+
+      if ('gesture' in data) {
+        const g = data.gesture || 'WAITING';
+        if (g !== 'WAITING' && g !== gestureRef.current) {
+          gestureRef.current = g;
+          setGesture(g);
+          addLog(`Detected: ${g}`);
+
+          // Icon Map
+          const icons = {
+            HELLO: 'fas fa-hand-peace',
+            YES: 'fas fa-thumbs-up',
+            NO: 'fas fa-thumbs-down',
+            STOP: 'fas fa-hand-paper'
+          };
+          setGestureIcon(icons[g] || 'fas fa-hand-paper');
+        }
+        if (g === 'WAITING') {
+          gestureRef.current = 'WAITING';
+          setGesture('WAITING');
+          lastSpokenGesture.current = null;
+        }
+      }
+
+      // Always update sentence if it changes (Decoupled from gesture)
+      if (data.sentence && data.sentence !== sentenceRef.current) {
+        sentenceRef.current = data.sentence;
+        setSentence(data.sentence);
+        if (autoSpeakRef.current && data.sentence !== 'Processing...' && data.sentence !== 'Waiting for gesture...') {
+          speakSentence(data.sentence);
+        }
+      }
+    };
 
-          const g = data.gesture || 'WAITING';
-          if (g !== 'WAITING' && g !== gesture) {
-            setGesture(g);
-            addLog(`Detected: ${g}`);
-
-            // Icon Map
-            const icons = {
-              HELLO: 'fas fa-hand-peace',
-              YES: 'fas fa-thumbs-up',
-              NO: 'fas fa-thumbs-down',
-              STOP: 'fas fa-hand-paper'
-            };
-            setGestureIcon(icons[g] || 'fas fa-hand-paper');
+    const connect = () => {
+      socket = new WebSocket(BACKEND_WS);
+
+      socket.onopen = () => {
+        if (!isMounted) return;
+        setIsConnected(true);
+        setDeviceStatus('CONNECTED');
+        addLog('Connected (live)');
+        pingTimer = setInterval(() => {
+          if (socket.readyState === WebSocket.OPEN) {
+            socket.send(JSON.stringify({ ping: performance.now() }));
           }
+        }, 2000);
+      };
+
+      // Messages are deltas: only the keys that changed since the last one
+      socket.onmessage = (event) => {
+        if (isMounted) handleUpdate(JSON.parse(event.data));
+      };
+
+      socket.onclose = () => {
+        clearInterval(pingTimer);
+        if (!isMounted) return;
+        console.warn("Live channel closed, reconnecting...");
+        retryTimer = setTimeout(connect, 1000);
+      };
+    };
 
-          // Always update sentence if it changes (Decoupled from gesture)
-          if (data.sentence && data.sentence !== sentence) {
-            setSentence(data.sentence);
-            if (autoSpeakRef.current && data.sentence !== 'Processing...' && data.sentence !== 'Waiting for gesture...') {
-              speakSentence(data.sentence);
-            }
-          }
-          if (g === 'WAITING') {
-            setGesture('WAITING');
-            lastSpokenGesture.current = null;
-          }
-        })
-        .catch((e) => {
-          if (!isMounted || e.name === 'AbortError') return;
-          // Only disconnect if it's a real error and we were connected
-          // To prevent flickering, maybe we should have a retry count?
-          // For now, let's just log it and NOT aggressively disconnect on single failure
-          console.warn("Polling error:", e);
-          // if (isConnected) setIsConnected(false); // DISABLED aggressive disconnect
-        });
-    }, 100);
+    connect();
 
     return () => {
       isMounted = false;
-      controller.abort();
-      clearInterval(pollInterval);
+      clearTimeout(retryTimer);
+      clearInterval(pingTimer);
+      if (socket) socket.close();
     };
-  }, [useGemini, gesture, backendIP, language, isSystemOn]);
+  }, [BACKEND_WS, isSystemOn]);
 
   // ---------------- TTS ----------------
   const speakSentence = async (text) => {
@@ -207,7 +238,7 @@ function App() {
                 <div className="card-title">
                   <span style={{ color: 'white' }}>AI Sentence</span>
                   <div className="card-actions">
-                    <i className="fas fa-sync-alt" onClick={() => { setSentence('Waiting for gesture...'); setGesture('WAITING'); }}></i>
+                    <i className="fas fa-sync-alt" onClick={() => { setSentence('Waiting for gesture...'); setGesture('WAITING'); sentenceRef.current = 'Waiting for gesture...'; gestureRef.current = 'WAITING'; }}></i>
                     <i className="fas fa-brain" style={{ color: '#BEE8D0' }}></i>
                   </div>
                 </div>